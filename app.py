@@ -1,15 +1,15 @@
-import os
-import json
 import streamlit as st
 
 # --- Components (same as your original) ---
 from components.profile_view import show_profile_page
-from components.job_feed import show_job_cards, load_saved_jobs
+from components.job_feed import show_job_cards
 from components.prompt_editor import show_prompt_editor
 from components.add_job import add_job
 from components.view_job import show_view_job
 from components.settings_editor import show_settings_editor
 from utils.config.settings import load_settings, save_settings
+from utils.file_utils import load_profile
+from utils.config.credit_ledger import get_balance
 
 # =========================
 # 1) Page config FIRST
@@ -38,13 +38,6 @@ if "view_job_path" not in st.session_state:
 # =========================
 # 3) Helpers
 # =========================
-def load_profile():
-    path = "data/profile.json"
-    if os.path.exists(path):
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
-
 def goto(page_name: str):
     st.session_state["selected_page"] = page_name
     if page_name != "View Job":
@@ -150,9 +143,8 @@ with st.sidebar:
     st.write("🟢 Dev mode ON" if dev_on else "⚪ Dev mode OFF")
 
     # --- Live credit balance controls ---
-    # Always fetch the latest from disk to reflect deductions done by call_gpt
-    _live_settings = load_settings()
-    live_balance = float(_live_settings.get("credit_balance", 0.0))
+    # The ledger reflects deductions done by call_gpt (cheap single query)
+    live_balance = get_balance()
 
     # Compact badge at the top of Settings
     st.markdown(f"**💳 Credit balance:** ${live_balance:,.2f}")
@@ -173,8 +165,7 @@ if page == "Add Job":
     add_job(profile)
 
 elif page == "Saved Jobs":
-    jobs = load_saved_jobs()
-    show_job_cards(jobs)
+    show_job_cards()
 
 elif page == "Profile":
     show_profile_page(profile)
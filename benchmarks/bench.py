@@ -0,0 +1,355 @@
+# benchmarks/bench.py
+"""
+Benchmarks for the ingest-to-score pipeline, offline and deterministic.
+
+Run from the repo root:
+
+    python -m benchmarks.bench                      # everything, job index at 1k / 10k / 100k
+    python -m benchmarks.bench --quick              # fewer repetitions, 1k jobs only
+    python -m benchmarks.bench --sizes 1000 50000 --llm-latency-ms 800
+    python -m benchmarks.bench --baseline last      # flag regressions vs the previous results file
+
+Everything runs in a throwaway workspace (its own data/ folder), so your jobs, caches
+and settings are not touched. The OpenAI client is replaced by benchmarks/mocks.MockLLM
+(simulated latency, replies built from the prompt), and HTTP by FixtureSession serving
+the pages in benchmarks/fixtures/. Synthetic saved jobs are generated from
+mock_data/sample_jobs.json.
+
+Results go to benchmarks/results/bench-<timestamp>.json:
+    {"meta": {...}, "cases": {name: {"n", "mean_ms", "p50_ms", "p95_ms", "min_ms", "ops_per_s", ...}},
+     "pipeline": {...}, "stages": [...]}
+With --baseline, each case's p50 is compared to the baseline's and anything slower by
+more than --threshold is reported as a regression (exit code 1).
+"""
+import argparse, contextlib, glob, io, json, os, platform, random, shutil, statistics, subprocess, sys, tempfile, time
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+SAMPLE_JOBS = os.path.join(ROOT, "mock_data", "sample_jobs.json")
+PROFILE_PATH = os.path.join(ROOT, "profile.template.json")
+
+# the workspace moves cwd, so the repo must be importable by absolute path
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+os.environ.setdefault("OPENAI_API_KEY", "bench-mock")
+
+BENCH_SETTINGS = {
+    "llm_cache": {"enabled": False},       # every pipeline run pays for its LLM calls
+    "semantic_search": {"enabled": False},  # no embedding calls
+    "tracing": {"enabled": True, "keep_runs": 10000},
+}
+
+# ---------- timing ----------
+def _stats(times_s: List[float], **extra) -> Dict[str, Any]:
+    ms = sorted(t * 1000.0 for t in times_s)
+    total = sum(times_s)
+    out = {
+        "n": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 4),
+        "p50_ms": round(ms[len(ms) // 2], 4),
+        "p95_ms": round(ms[min(len(ms) - 1, int(0.95 * len(ms)))], 4),
+        "min_ms": round(ms[0], 4),
+        "ops_per_s": round(len(ms) / total, 2) if total else None,
+    }
+    out.update(extra)
+    return out
+
+def measure(fn: Callable[[Any], Any], items: List[Any], reps: int, warmup: int = 1, **extra) -> Dict[str, Any]:
+    """Time fn(item) for every item, `reps` times over; one call per sample."""
+    for item in items[:warmup]:
+        fn(item)
+    times = []
+    for _ in range(reps):
+        for item in items:
+            t0 = time.perf_counter()
+            fn(item)
+            times.append(time.perf_counter() - t0)
+    return _stats(times, **extra)
+
+@contextlib.contextmanager
+def quiet(enabled: bool = True):
+    """Swallow the pipeline's [Tag] prints while timing (they would dominate small cases)."""
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+# ---------- inputs ----------
+def synthetic_jobs(n: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """n saved-job dicts shaped like data/jobs/*.json, varied from mock_data/sample_jobs.json."""
+    from benchmarks.mocks import VOCAB
+
+    with open(SAMPLE_JOBS, "r", encoding="utf-8") as f:
+        samples = json.load(f)
+    rng = random.Random(seed)
+    levels = ("Junior", "Intermediate", "Senior", "Lead")
+    t0 = time.mktime((2024, 1, 1, 9, 0, 0, 0, 0, -1))
+    jobs = []
+    for i in range(n):
+        s = samples[i % len(samples)]
+        skills = rng.sample(VOCAB, 10)
+        score = rng.randint(20, 95)
+        jobs.append({
+            "job_title": f"{rng.choice(levels)} {s['title']}",
+            "company": f"{s['company']} {i // len(samples)}",
+            "location": s["location"],
+            "work_location": rng.choice(("Remote", "Hybrid", "On-site")),
+            "job_type": "Full-time",
+            "salary": f"${rng.randint(70, 160)}k",
+            "summary": s["summary"],
+            "url": f"{s['url']}?n={i}",
+            "required_skills": skills[:6],
+            "nice_to_have_skills": skills[6:],
+            "qualifications": [f"{rng.randint(1, 8)}+ years of experience with {skills[0]}", "Bachelor's degree or equivalent"],
+            "responsibilities": [f"Build and maintain services in {k}" for k in skills[:4]],
+            "date_added": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t0 + i * 600)),
+            "date_applied": "" if i % 5 else time.strftime("%Y-%m-%d", time.localtime(t0 + i * 600 + 86400)),
+            "match": {"scores": {"skill_score": score, "preference_score": 100, "overall_score": score}},
+        })
+    return jobs
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10)
+        return out.stdout.strip()
+    except Exception:
+        return ""
+
+def _workspace() -> str:
+    ws = tempfile.mkdtemp(prefix="jobhunter-bench-")
+    os.makedirs(os.path.join(ws, "data"), exist_ok=True)
+    with open(os.path.join(ws, "data", "settings.json"), "w", encoding="utf-8") as f:
+        json.dump(BENCH_SETTINGS, f, indent=2)
+    shutil.copy(PROFILE_PATH, os.path.join(ws, "profile.json"))
+    return ws
+
+# ---------- cases ----------
+def bench_parsing(fixtures: List[Dict[str, str]], reps: int) -> Dict[str, Any]:
+    from services.job_extraction_agent.preclean import heuristic_preclean
+    from services.job_extraction_agent.html_extract import extract
+    from services.job_parser import fetch_job_text
+
+    kb = sum(len(f["html"]) for f in fixtures) / 1024.0 / len(fixtures)
+    out = {
+        "heuristic_preclean": measure(lambda f: heuristic_preclean(f["html"]), fixtures, reps, mean_kb=round(kb, 1)),
+        "html_extract": measure(lambda f: extract(f["html"], f["url"]), fixtures, reps, mean_kb=round(kb, 1)),
+    }
+    # through the page cache: force=True re-downloads (mock) and re-parses, then cache hits
+    out["fetch_job_text_cold"] = measure(lambda f: fetch_job_text(f["url"], force=True), fixtures, reps)
+    out["fetch_job_text_warm"] = measure(lambda f: fetch_job_text(f["url"]), fixtures, reps)
+    for f in fixtures:
+        out[f"heuristic_preclean[{f['kind']}:{f['file']}]"] = measure(lambda x: heuristic_preclean(x["html"]), [f], reps, warmup=1)
+    return out
+
+def bench_scoring(profile: Dict[str, Any], n: int, reps: int) -> Dict[str, Any]:
+    from benchmarks.mocks import fit_result
+    from services.skill_matching_agent.skill_match_utils import prepare_fit_payload, compute_scores_from_matches
+
+    jobs = synthetic_jobs(n)
+    payloads = [prepare_fit_payload(j, profile, None) for j in jobs]
+    results = [fit_result(p) for p in payloads]
+    return {
+        "prepare_fit_payload": measure(lambda j: prepare_fit_payload(j, profile, None), jobs, reps),
+        "compute_scores_from_matches": measure(lambda r: compute_scores_from_matches(r, None), results, reps),
+    }
+
+def _fill_index(jobs: List[Dict[str, Any]], start: int) -> float:
+    """Insert index rows directly (as rebuild_index would), without writing job files."""
+    from services import job_store
+
+    job_store.ensure_index()
+    t0 = time.perf_counter()
+    with job_store._connect() as conn:
+        for i, job in enumerate(jobs, start=start):
+            path = os.path.join(job_store.JOB_DIR, job["date_added"][:10].replace("-", ""), f"bench_{i:07d}.json")
+            job_store._upsert(conn, job_store._summary_row(path, job), job_store._fts_doc(job))
+    return time.perf_counter() - t0
+
+def bench_job_index(sizes: List[int], reps: int) -> Dict[str, Any]:
+    from components.job_feed import load_saved_jobs
+    from services import job_store
+
+    out: Dict[str, Any] = {}
+    have = job_store.count_jobs()
+    for size in sorted(sizes):
+        if size > have:
+            print(f"[Bench] indexing {size - have} synthetic jobs…")
+            secs = _fill_index(synthetic_jobs(size)[have:], have)
+            out[f"index_insert@{have}-{size}"] = _stats([secs], rows=size - have, rows_per_s=round((size - have) / secs, 1))
+            have = size
+        r = max(3, min(reps * 4, 200_000 // size))
+        out[f"load_saved_jobs@{size}"] = measure(lambda _: load_saved_jobs(), [None], r)
+        out[f"list_jobs_page@{size}"] = measure(
+            lambda _: (job_store.list_jobs(limit=10, offset=20), job_store.count_jobs()), [None], r * 5)
+        out[f"list_jobs_search@{size}"] = measure(
+            lambda q: job_store.list_jobs(search=q, limit=10, by_relevance=True), ["backend", "python etl", "react"], r)
+    return out
+
+def bench_pipeline(fixtures: List[Dict[str, str]], profile: Dict[str, Any], workers: int, llm) -> Dict[str, Any]:
+    from services.batch_ingest import ingest_urls
+
+    urls = [f["url"] for f in fixtures]
+    t0 = time.perf_counter()
+    rows = list(ingest_urls(urls, profile, max_workers=workers, per_host_interval_s=0.0))
+    wall = time.perf_counter() - t0
+    saved = [r for r in rows if r["status"] == "saved"]
+    statuses: Dict[str, int] = {}
+    for r in rows:
+        statuses[r["status"]] = statuses.get(r["status"], 0) + 1
+    per_url = _stats([r.get("elapsed_s") or 0.0 for r in rows]) if rows else {}
+    return {
+        "urls": len(urls),
+        "workers": workers,
+        "wall_s": round(wall, 3),
+        "jobs_per_min": round(len(saved) / wall * 60.0, 2) if wall else None,
+        "per_url": per_url,
+        "statuses": statuses,
+        "errors": [r["error"] for r in rows if r["status"] not in ("saved", "duplicate")],
+        "llm_calls": dict(llm.calls),
+    }
+
+# ---------- results ----------
+def _resolve_baseline(arg: Optional[str], exclude: str = "") -> Optional[str]:
+    if not arg:
+        return None
+    if arg != "last":
+        return arg
+    files = sorted(p for p in glob.glob(os.path.join(RESULTS_DIR, "bench-*.json")) if p != exclude)
+    return files[-1] if files else None
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float, min_delta_ms: float = 0.05) -> List[Dict[str, Any]]:
+    """
+    Cases whose p50 got slower than baseline by more than `threshold` (0.2 = 20%) and by
+    more than `min_delta_ms` in absolute terms (sub-millisecond cases are noisy).
+    """
+    regressions = []
+    for name, cur in current["cases"].items():
+        base = (baseline.get("cases") or {}).get(name)
+        if not base or not base.get("p50_ms") or name.startswith("index_insert"):
+            continue
+        ratio = cur["p50_ms"] / base["p50_ms"]
+        if ratio > 1.0 + threshold and cur["p50_ms"] - base["p50_ms"] > min_delta_ms:
+            regressions.append({"case": name, "baseline_p50_ms": base["p50_ms"], "p50_ms": cur["p50_ms"], "ratio": round(ratio, 2)})
+    b_wall, c_wall = (baseline.get("pipeline") or {}).get("wall_s"), (current.get("pipeline") or {}).get("wall_s")
+    if b_wall and c_wall and c_wall / b_wall > 1.0 + threshold:
+        regressions.append({"case": "pipeline.wall_s", "baseline_p50_ms": b_wall * 1000, "p50_ms": c_wall * 1000, "ratio": round(c_wall / b_wall, 2)})
+    return regressions
+
+def _print_report(results: Dict[str, Any]) -> None:
+    print(f"\n{'case':58} {'n':>6} {'p50 ms':>10} {'p95 ms':>10} {'ops/s':>10}")
+    for name, s in results["cases"].items():
+        ops = s.get("rows_per_s") or s.get("ops_per_s")
+        print(f"{name[:58]:58} {s['n']:>6} {s['p50_ms']:>10.3f} {s['p95_ms']:>10.3f} {ops if ops is not None else '':>10}")
+    p = results.get("pipeline")
+    if p:
+        print(f"\n[Bench] pipeline: {p['urls']} URLs in {p['wall_s']}s on {p['workers']} workers "
+              f"({p['jobs_per_min']} jobs/min), per URL p50 {p['per_url'].get('p50_ms', 0) / 1000:.2f}s "
+              f"p95 {p['per_url'].get('p95_ms', 0) / 1000:.2f}s, statuses {p['statuses']}, LLM calls {p['llm_calls']}")
+        for e in p["errors"]:
+            print(f"[Bench]   error: {e}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.bench", description="Offline benchmarks for the ingest-to-score pipeline.")
+    ap.add_argument("--quick", action="store_true", help="fewer repetitions, 1k-job index only")
+    ap.add_argument("--sizes", type=int, nargs="+", default=None, help="job index sizes (default 1000 10000 100000)")
+    ap.add_argument("--reps", type=int, default=None, help="repetitions per case (default 20, 3 with --quick)")
+    ap.add_argument("--llm-latency-ms", type=float, default=None, help="simulated base latency per LLM call (default 400, 50 with --quick)")
+    ap.add_argument("--llm-ms-per-token", type=float, default=2.0, help="simulated generation time per completion token")
+    ap.add_argument("--http-latency-ms", type=float, default=80.0, help="simulated latency per page download")
+    ap.add_argument("--workers", type=int, default=4, help="pipeline threads (batch ingest workers)")
+    ap.add_argument("--skip", nargs="+", default=[], choices=["parsing", "scoring", "index", "pipeline"], help="sections to skip")
+    ap.add_argument("--out", default=None, help="results file (default benchmarks/results/bench-<timestamp>.json)")
+    ap.add_argument("--baseline", default=None, help="results file to compare against, or 'last' for the newest one")
+    ap.add_argument("--threshold", type=float, default=0.2, help="p50 slowdown that counts as a regression (default 0.2 = 20%%)")
+    ap.add_argument("--min-delta-ms", type=float, default=0.05, help="ignore slowdowns smaller than this (default 0.05ms)")
+    ap.add_argument("--verbose", action="store_true", help="show the pipeline's own log lines")
+    ap.add_argument("--keep-workspace", action="store_true", help="leave the temp data/ folder for inspection")
+    args = ap.parse_args(argv)
+
+    reps = args.reps or (3 if args.quick else 20)
+    sizes = args.sizes or ([1000] if args.quick else [1000, 10_000, 100_000])
+    latency = args.llm_latency_ms if args.llm_latency_ms is not None else (50.0 if args.quick else 400.0)
+    out_path = args.out or os.path.join(RESULTS_DIR, time.strftime("bench-%Y%m%d-%H%M%S.json"))
+    baseline_path = _resolve_baseline(args.baseline)
+
+    from benchmarks.mocks import FixtureSession, MockLLM, load_fixtures
+    from services import http_fetch
+    from utils import prompt_loader
+
+    fixtures = load_fixtures(FIXTURES)
+    with open(PROFILE_PATH, "r", encoding="utf-8") as f:
+        profile = json.load(f)
+
+    prev_cwd, prev_base = os.getcwd(), prompt_loader.BASE
+    ws = _workspace()
+    os.chdir(ws)
+    prompt_loader.BASE = os.path.join(ROOT, "services")
+    http_fetch._session = FixtureSession({f["url"]: f["html"] for f in fixtures}, latency_ms=args.http_latency_ms)
+    llm = MockLLM(latency_ms=latency, per_token_ms=args.llm_ms_per_token).install()
+    print(f"[Bench] workspace {ws}; LLM latency {latency:.0f}ms + {args.llm_ms_per_token}ms/token; reps {reps}")
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "started_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": vars(args),
+            "fixtures": [{"file": f["file"], "kind": f["kind"], "kb": round(len(f["html"]) / 1024, 1)} for f in fixtures],
+        },
+        "cases": {},
+    }
+    try:
+        with quiet(not args.verbose):
+            # pipeline first: the duplicate check would otherwise compare against the synthetic index
+            if "pipeline" not in args.skip:
+                print("[Bench] full pipeline…", file=sys.stderr)
+                results["pipeline"] = bench_pipeline(fixtures, profile, args.workers, llm)
+            if "parsing" not in args.skip:
+                print("[Bench] parsing…", file=sys.stderr)
+                results["cases"].update(bench_parsing(fixtures, reps))
+            if "scoring" not in args.skip:
+                print("[Bench] scoring…", file=sys.stderr)
+                results["cases"].update(bench_scoring(profile, 200, reps))
+            if "index" not in args.skip:
+                print(f"[Bench] job index at {sizes}…", file=sys.stderr)
+                with contextlib.redirect_stdout(sys.stderr):
+                    results["cases"].update(bench_job_index(sizes, reps))
+        from utils import tracing
+        results["stages"] = tracing.stage_summary(10000)
+    finally:
+        llm.uninstall()
+        http_fetch._session = None
+        prompt_loader.BASE = prev_base
+        os.chdir(prev_cwd)
+        if not args.keep_workspace:
+            shutil.rmtree(ws, ignore_errors=True)
+
+    _print_report(results)
+    status = 0
+    if baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        results["baseline"] = {"path": os.path.relpath(baseline_path, ROOT), "commit": baseline.get("meta", {}).get("commit"), "regressions": regressions}
+        print(f"\n[Bench] vs {os.path.relpath(baseline_path, ROOT)} ({baseline.get('meta', {}).get('commit') or '?'}):")
+        for r in regressions:
+            print(f"[Bench]   REGRESSION {r['case']}: {r['baseline_p50_ms']:.3f}ms -> {r['p50_ms']:.3f}ms (x{r['ratio']})")
+        if not regressions:
+            print(f"[Bench]   no case slower by more than {args.threshold:.0%}")
+        status = 1 if regressions else 0
+    elif args.baseline:
+        print("[Bench] no baseline results file found; this run becomes the first one.")
+
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, default=str)
+    print(f"[Bench] results written to {os.path.relpath(out_path, ROOT)}")
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+# benchmarks/mocks.py
+"""
+Deterministic local stand-ins for the network: the OpenAI client under call_gpt /
+acall_gpt, and the HTTP session under services/http_fetch.py.
+
+MockLLM replaces the client object rather than call_gpt itself, so everything call_gpt
+does around the request (model routing, response cache, credit ledger, cost log,
+tracing) is still measured. Each agent's prompt is recognised from its template, and
+the reply is built from the prompt: same input, same output, same simulated latency.
+"""
+import asyncio, hashlib, json, os, re, time, types
+from typing import Any, Dict, List, Optional
+
+from utils.ai import openai_client
+from utils.prompt_loader import load_prompt
+
+# Skills the fake extractor "recognises" in posting text
+VOCAB = (
+    "Python", "SQL", "ETL", "Airflow", "PostgreSQL", "Pandas", "Spark", "dbt", "Snowflake", "AWS Glue",
+    "C#", ".NET Core", ".NET", "Azure", "REST APIs", "SQL Server", "Entity Framework", "Docker",
+    "Kubernetes", "Terraform", "RabbitMQ", "JavaScript", "TypeScript", "React", "Git", "GraphQL", "Jest",
+    "Azure DevOps",
+)
+RESP_VERBS = ("Design", "Write", "Work", "Improve", "Own", "Document", "Optimize", "Automate")
+
+def _template_regex(agent: str, filename: str) -> re.Pattern:
+    """Regex matching a filled-in prompt template; each {placeholder} becomes a named group."""
+    tmpl = load_prompt(agent, filename)
+    parts = re.split(r"\{([a-z_]+)\}", tmpl)
+    out, seen = [], set()
+    for i, p in enumerate(parts):
+        if i % 2 == 0:
+            out.append(re.escape(p))
+        elif p in seen:
+            out.append(f"(?P={p})")
+        else:
+            seen.add(p)
+            out.append(f"(?P<{p}>.*?)")
+    return re.compile("".join(out) + r"\Z", re.DOTALL)
+
+def _usage(prompt: str, completion: str) -> types.SimpleNamespace:
+    p, c = len(prompt) // 4, len(completion) // 4
+    return types.SimpleNamespace(
+        prompt_tokens=p, completion_tokens=c, total_tokens=p + c,
+        prompt_tokens_details=types.SimpleNamespace(cached_tokens=0),
+    )
+
+def _lines(text: str) -> List[str]:
+    return [l.strip(" -•*\t") for l in (text or "").splitlines() if l.strip()]
+
+def fit_result(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """A skill_match reply for a prepare_fit_payload() payload: exact (case-insensitive) skill overlap."""
+    job, prof = payload.get("JOB_DATA") or {}, payload.get("PROFILE") or {}
+    have = {s.lower() for s in (prof.get("skills") or []) + (prof.get("qualifications") or [])}
+
+    def split(items):
+        items = list(items or [])
+        return {"matched": [s for s in items if s.lower() in have], "missing": [s for s in items if s.lower() not in have], "score": 0}
+
+    return {
+        "fit": {"skills": {"required": split(job.get("required_skills")), "nice_to_have": split(job.get("nice_to_have_skills"))},
+                "qualifications": split(job.get("qualifications"))},
+        "preferences": {"location_ok": True, "work_mode_ok": True, "salary_ok": "unknown", "notes": ""},
+    }
+
+class MockLLM:
+    """
+    Fake chat.completions client. Latency per call:
+        latency_ms + per_token_ms * completion_tokens, +/- jitter (derived from the prompt hash)
+    """
+
+    def __init__(self, latency_ms: float = 300.0, per_token_ms: float = 0.0, jitter: float = 0.2):
+        self.latency_ms = latency_ms
+        self.per_token_ms = per_token_ms
+        self.jitter = jitter
+        self.calls: Dict[str, int] = {}
+        self._templates = {
+            "clean_job_text": _template_regex("job_extraction_agent", "cleaner_prompt.txt"),
+            "extract": _template_regex("job_extraction_agent", "job_extractor_prompt.txt"),
+            "extract_partial": _template_regex("job_extraction_agent", "partial_extractor_prompt.txt"),
+            "review_extracted_job": _template_regex("job_extraction_agent", "field_followup_prompt.txt"),
+        }
+        self._systems = {
+            "skill_match": load_prompt("skill_matching_agent", "skill_match_prompt.txt").splitlines()[0],
+            "analysis": load_prompt("analysis_agent", "run_analysis_prompt.txt").splitlines()[0],
+        }
+        self._saved: Optional[tuple] = None
+
+    # ---------- install / uninstall ----------
+    def install(self) -> "MockLLM":
+        self._saved = (openai_client._client, openai_client._get_async_client)
+        completions = types.SimpleNamespace(create=self._create)
+        openai_client._client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+        async_client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=self._acreate)))
+        openai_client._get_async_client = lambda: async_client
+        return self
+
+    def uninstall(self) -> None:
+        if self._saved:
+            openai_client._client, openai_client._get_async_client = self._saved
+            self._saved = None
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, *exc):
+        self.uninstall()
+
+    # ---------- replies ----------
+    def _classify(self, messages: List[Dict[str, str]]) -> tuple:
+        first = str(messages[0].get("content") or "")
+        if messages[0].get("role") == "system":
+            for task, head in self._systems.items():
+                if first.startswith(head):
+                    return task, {}
+            return ("resume" if "resume" in first[:400].lower() else "cover_letter"), {}
+        for task, rx in self._templates.items():
+            m = rx.match(first)
+            if m:
+                return task, m.groupdict()
+        return "generic", {}
+
+    def reply(self, messages: List[Dict[str, str]]) -> tuple:
+        """(task, reply text) for a request."""
+        task, fields = self._classify(messages)
+        self.calls[task] = self.calls.get(task, 0) + 1
+
+        if task == "clean_job_text":
+            return task, "\n".join(_lines(fields["raw_text"]))
+        if task in ("extract", "extract_partial"):
+            return task, json.dumps(self._extract(fields["clean_text"], fields.get("job_url", "")))
+        if task == "review_extracted_job":
+            found = self._extract(fields["excerpts"], "")
+            return task, json.dumps({f: found.get(f, "") for f in fields["fields"].split(", ")})
+        if task == "skill_match":
+            return task, json.dumps(self._fit(messages))
+        if task == "analysis":
+            return task, json.dumps({
+                "summary": "Solid overlap on the core stack; some gaps on the nice-to-haves.",
+                "responsibilities": {"evidence": [], "confidence": 60},
+                "strengths": ["Backend APIs", "SQL"], "gaps": ["Kubernetes"],
+                "fast_upskill_suggestions": ["Deploy a service on a managed Kubernetes cluster"],
+                "doc_recommendations": {
+                    "cover_letter": {"highlights": ["API design"], "address_gaps": ["Kubernetes"], "tone": "impact-focused"},
+                    "resume": {"reorder_suggestions": [], "keywords_to_include": ["REST"], "bullets_to_add": []},
+                },
+            })
+        if task in ("cover_letter", "resume"):
+            words = " ".join(["Experienced developer with a record of shipping reliable backend services."] * 30)
+            return task, f"# {task.replace('_', ' ').title()}\n\n{words}\n"
+        return task, "{}"
+
+    def _extract(self, text: str, url: str) -> Dict[str, Any]:
+        lines = _lines(text)
+        low = (text or "").lower()
+        skills = [s for s in VOCAB if s.lower() in low]
+        return {
+            "job_title": lines[0] if lines else "",
+            "company": lines[1] if len(lines) > 1 else "",
+            "location": "Remote",
+            "work_location": "Remote",
+            "job_type": "Full-time",
+            "salary": "",
+            "summary": " ".join(lines[2:4])[:300],
+            "required_skills": skills[:8],
+            "nice_to_have_skills": skills[8:12],
+            "responsibilities": [l for l in lines if l.startswith(RESP_VERBS)][:8],
+            "qualifications": [l for l in lines if "experience" in l.lower()][:5],
+            "url": url,
+        }
+
+    def _fit(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        for m in messages[1:]:
+            try:
+                data.update(json.loads(m["content"]))
+            except (ValueError, TypeError):
+                pass
+        return fit_result(data)
+
+    def _latency_s(self, messages: List[Dict[str, str]], completion: str) -> float:
+        h = int(hashlib.md5(json.dumps(messages, sort_keys=True).encode("utf-8")).hexdigest()[:8], 16)
+        jitter = 1.0 + self.jitter * ((h % 2001) / 1000.0 - 1.0)
+        return max(0.0, (self.latency_ms + self.per_token_ms * len(completion) / 4) * jitter / 1000.0)
+
+    def _response(self, messages):
+        task, text = self.reply(messages)
+        prompt = "".join(str(m.get("content") or "") for m in messages)
+        return text, _usage(prompt, text), self._latency_s(messages, text)
+
+    def _create(self, model: str, messages: List[Dict[str, str]], stream: bool = False, **kwargs):
+        text, usage, delay = self._response(messages)
+        if stream:
+            return self._chunks(text, usage, delay)
+        time.sleep(delay)
+        msg = types.SimpleNamespace(content=text)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=msg)], usage=usage)
+
+    async def _acreate(self, model: str, messages: List[Dict[str, str]], **kwargs):
+        text, usage, delay = self._response(messages)
+        await asyncio.sleep(delay)
+        msg = types.SimpleNamespace(content=text)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=msg)], usage=usage)
+
+    def _chunks(self, text: str, usage, delay: float):
+        pieces = re.findall(r"\S+\s*", text) or [text]
+        step = delay / max(1, len(pieces))
+        for p in pieces:
+            time.sleep(step)
+            yield types.SimpleNamespace(usage=None, choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content=p))])
+        yield types.SimpleNamespace(usage=usage, choices=[])
+
+class FixtureSession:
+    """requests.Session stand-in serving HTML fixtures by URL, with a simulated network delay."""
+
+    def __init__(self, pages: Dict[str, str], latency_ms: float = 0.0):
+        self.pages = pages
+        self.latency_ms = latency_ms
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Any = None):
+        time.sleep(self.latency_ms / 1000.0)
+        html = self.pages.get(url)
+        status = 200 if html is not None else 404
+
+        def raise_for_status():
+            if status >= 400:
+                raise RuntimeError(f"{status} for {url}")
+
+        body = html or ""
+        return types.SimpleNamespace(
+            status_code=status, text=body, content=body.encode("utf-8"), url=url,
+            headers={"ETag": f'"{hashlib.md5(body.encode("utf-8")).hexdigest()}"'},
+            raise_for_status=raise_for_status,
+        )
+
+def load_fixtures(folder: str) -> List[Dict[str, str]]:
+    """benchmarks/fixtures/index.json entries with their HTML loaded."""
+    with open(os.path.join(folder, "index.json"), "r", encoding="utf-8") as f:
+        index = json.load(f)
+    for entry in index:
+        with open(os.path.join(folder, entry["file"]), "r", encoding="utf-8") as f:
+            entry["html"] = f.read()
+    return index
@@ -1,14 +1,18 @@
 # add_job.py
 import os
+import time
 import streamlit as st
-from services.job_parser import fetch_job_text
 from services.save_job import save_job
-from services.job_extraction_agent.run_chain import run_job_extraction_chain
-from services.skill_matching_agent.score_job_fit import score_job_fit
+from services.batch_ingest import parse_url_list, DEFAULT_WORKERS, DEFAULT_HOST_INTERVAL_S
+from services.duplicate_index import reuse_extraction
+from services.job_store import read_job
+from services.skill_matching_agent.skill_match_utils import profile_hash
+from services import task_queue
+from components.tasks import submit_task, task_panel
 
 def _clear_add_job_session():
     # Clear derived data
-    for key in ["job_data", "match", "view_job_path"]:
+    for key in ["job_data", "match", "view_job_path", "duplicate_hit", "ignore_duplicate", "add_job_task", "reuse_job_data"]:
         st.session_state.pop(key, None)
 
     # Explicitly clear widget-backed keys so UI blanks out without a rerun
@@ -26,6 +30,168 @@ def _kickoff_analysis():
     st.session_state["analyzing_job"] = True
     st.session_state["analysis_requested"] = True
 
+def _analyze_anyway():
+    st.session_state["ignore_duplicate"] = True
+    _kickoff_analysis()
+
+def _show_duplicate_choice(hit: dict, profile: dict):
+    """A saved job looks like the same posting: offer to reuse it instead of paying for extraction."""
+    dup = hit["dup"]
+    try:
+        existing = read_job(dup["path"])
+    except Exception:
+        st.session_state.pop("duplicate_hit", None)
+        return
+    how = "same URL" if dup["reason"] == "url" else f"{dup['similarity']:.0%} text overlap"
+    st.warning(
+        f"This looks like a job you already saved ({how}): **{existing.get('job_title')}** at "
+        f"**{existing.get('company')}**, added {existing.get('date_added') or 'earlier'}."
+    )
+    c1, c2, c3 = st.columns(3)
+    if c1.button("♻️ Reuse stored extraction", key="dup_reuse"):
+        job_data = reuse_extraction(existing, hit.get("url"), hit.get("fp"))
+        match = existing.get("match") or {}
+        st.session_state.pop("duplicate_hit", None)
+        if match.get("profile_hash") != profile_hash(profile):
+            # re-score in the background; the result is merged in add_job()
+            st.session_state["reuse_job_data"] = job_data
+            st.session_state["add_job_task"] = submit_task("score", {"job": job_data}, label=existing.get("job_title") or "")
+            st.session_state["analyzing_job"] = True
+        else:
+            job_data["match"] = match
+            st.session_state["job_data"] = job_data
+            st.session_state["match"] = match
+        st.rerun()
+    if c2.button("🔎 Open saved job", key="dup_open"):
+        st.session_state.pop("duplicate_hit", None)
+        st.session_state["view_job_path"] = dup["path"]
+        st.session_state["selected_page"] = "View Job"
+        st.rerun()
+    c3.button("Analyze anyway", key="dup_ignore", on_click=_analyze_anyway)
+
+def _show_batch_mode(profile: dict):
+    st.caption("Paste one URL per line, or upload a .txt/.csv file. Each posting is fetched, extracted, scored and saved.")
+    pasted = st.text_area("Job URLs", height=150, key="job_batch_input")
+    uploaded = st.file_uploader("Or upload a list of URLs", type=["txt", "csv"], key="job_batch_file")
+
+    c1, c2 = st.columns(2)
+    workers = c1.number_input("Parallel jobs", min_value=1, max_value=16, value=DEFAULT_WORKERS, step=1)
+    interval = c2.number_input(
+        "Seconds between requests to the same site", min_value=0.0, max_value=30.0,
+        value=DEFAULT_HOST_INTERVAL_S, step=0.5,
+    )
+
+    text = pasted or ""
+    if uploaded is not None:
+        text += "\n" + uploaded.getvalue().decode("utf-8", errors="ignore")
+    urls = parse_url_list(text)
+    st.caption(f"{len(urls)} URL(s) detected")
+
+    if st.button("Ingest all", key="batch_ingest_btn", disabled=not urls or "batch_task" in st.session_state):
+        st.session_state["batch_task"] = submit_task(
+            "ingest_batch",
+            {"urls": urls, "workers": int(workers), "host_interval": float(interval)},
+            label=f"{len(urls)} URL(s)",
+        )
+        st.rerun()
+
+    task_id = st.session_state.get("batch_task")
+    if task_id is None:
+        return
+    t = task_panel(task_id, "Batch ingest", render=_show_batch_rows)
+    if t is None:
+        return
+    st.session_state.pop("batch_task", None)
+    if t["status"] != task_queue.DONE:
+        st.error(f"Batch ingest {t['status']}: {t.get('error') or ''}")
+        return
+    results = (t["result"] or {}).get("rows") or []
+    _show_batch_rows(t)
+    saved = sum(1 for r in results if r["status"] == "saved")
+    dupes = sum(1 for r in results if r["status"] == "duplicate")
+    if saved + dupes == len(results):
+        st.success(f"✅ Saved {saved} job(s), skipped {dupes} duplicate(s). Open them from Saved Jobs.")
+    else:
+        st.warning(f"Saved {saved} of {len(results)} job(s), skipped {dupes} duplicate(s). See the table for failures.")
+
+def _show_batch_rows(t: dict):
+    prog = t.get("progress") or {}
+    results = (t.get("result") or {}).get("rows") or prog.get("rows") or []
+    total = prog.get("total") or len(results) or 1
+    st.progress(min(1.0, len(results) / total), text=f"{len(results)} / {total} done")
+    if results:
+        st.dataframe(
+            [{
+                "Status": r["status"],
+                "Title": r.get("job_title") or "",
+                "Company": r.get("company") or "",
+                "Score": r.get("overall_score"),
+                "Time (s)": r.get("elapsed_s"),
+                "URL": r["url"],
+                "Error": r.get("error", ""),
+            } for r in results],
+            use_container_width=True,
+        )
+
+def _analysis_payload(input_mode: str) -> dict | None:
+    """The add_job task payload for the current inputs, or None (with a warning) if they're empty."""
+    # "Analyze anyway" after a duplicate warning reuses the fetched text
+    retry = st.session_state.pop("duplicate_hit", None) if st.session_state.pop("ignore_duplicate", False) else None
+    with_analysis = bool(st.session_state.get("add_job_with_analysis"))
+    if retry:
+        return {
+            "text": retry["text"], "url": retry["url"], "ignore_duplicate": True,
+            "trusted": retry.get("trusted", False), "job_posting": retry.get("job_posting"),
+            "with_analysis": with_analysis,
+        }
+    if input_mode == "URL":
+        url_val = (st.session_state.get("job_url_input") or "").strip()
+        if not url_val:
+            st.warning("Please paste a job URL.")
+            return None
+        return {"url": url_val, "fetch": True, "with_analysis": with_analysis}
+    text_val = (st.session_state.get("job_text_input") or "").strip()
+    if not text_val:
+        st.warning("Please paste the full job description text.")
+        return None
+    return {"text": text_val, "url": (st.session_state.get("job_url_ref") or "").strip(), "with_analysis": with_analysis}
+
+def _take_result(t: dict):
+    """Move a finished add_job / score task's result into the session."""
+    res = t.get("result") or {}
+    if t["status"] != task_queue.DONE:
+        st.session_state.pop("reuse_job_data", None)
+        if t["status"] == task_queue.FAILED:
+            st.session_state["add_job_error"] = t.get("error")
+        return
+    if "duplicate" in res:
+        st.session_state["duplicate_hit"] = res["duplicate"]
+        return
+    if "match" in res:
+        # re-score of a reused extraction
+        job_data = st.session_state.pop("reuse_job_data", None) or {}
+        job_data["match"] = res["match"]
+    else:
+        job_data = res.get("job_data") or {}
+    st.session_state["job_data"] = job_data
+    st.session_state["match"] = job_data.get("match") or {}
+
+def _show_recent_tasks():
+    """Finished Add Job runs from the queue, so work isn't lost when the tab was closed mid-run."""
+    recent = task_queue.list_tasks(statuses=(task_queue.DONE,), kinds=("add_job",), limit=10)
+    recent = [t for t in recent if (t["result"] or {}).get("job_data")]
+    if not recent:
+        return
+    with st.expander(f"Recent background analyses ({len(recent)})", expanded=False):
+        for t in recent:
+            jd = t["result"]["job_data"]
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(t["finished_at"] or t["created_at"]))
+            c1, c2 = st.columns([5, 1])
+            c1.markdown(f"**{jd.get('job_title') or 'Untitled'}** at {jd.get('company') or '—'}  \n_{when}_")
+            if c2.button("Load", key=f"load_task_{t['id']}"):
+                _take_result(t)
+                st.rerun()
+
 def add_job(profile: dict):
     # init flags
     if "analyzing_job" not in st.session_state:
@@ -34,7 +200,11 @@ def add_job(profile: dict):
         st.session_state["analysis_requested"] = False
 
     st.header("📎 Add a Job Listing")
-    input_mode = st.radio("How would you like to add a job?", ["URL", "Full Text"], index=0)
+    input_mode = st.radio("How would you like to add a job?", ["URL", "Full Text", "Batch URLs"], index=0)
+
+    if input_mode == "Batch URLs":
+        _show_batch_mode(profile)
+        return
 
     disabled = st.session_state["analyzing_job"]
 
@@ -44,6 +214,12 @@ def add_job(profile: dict):
         st.text_area("Paste full job description text here", height=50, key="job_text_input", disabled=disabled)
         st.text_input("Optional: Paste job URL for reference", key="job_url_ref", disabled=disabled)
 
+    st.checkbox(
+        "Also run in-depth analysis (in parallel with scoring)",
+        key="add_job_with_analysis",
+        disabled=disabled,
+    )
+
     col_analyze, col_clear = st.columns([1, 1])
 
     analyze_label = "Analyzing…" if disabled else "Analyze Job"
@@ -57,53 +233,37 @@ def add_job(profile: dict):
     if ("job_data" in st.session_state) or ("match" in st.session_state):
         col_clear.button("Clear Job Session", key="clear_job_session_top", on_click=_clear_add_job_session, disabled=disabled)
 
-    # Phase 2: do the work while the button stays disabled and show stages
-    if st.session_state["analyzing_job"] and st.session_state["analysis_requested"]:
-        try:
-            with st.status("Analyzing job…", expanded=True) as status_box:
-                # Validate/get inputs
-                if input_mode == "URL":
-                    url_val = (st.session_state.get("job_url_input") or "").strip()
-                    if not url_val:
-                        st.warning("Please paste a job URL.")
-                        st.session_state["analysis_requested"] = False
-                        return
-                    status_box.update(label="Fetching job content…")
-                    job_text_local = fetch_job_text(url_val)
-                    if not job_text_local:
-                        st.error("Could not fetch this URL. If it is blocked, switch to 'Full Text' and paste the content.")
-                        st.session_state["analysis_requested"] = False
-                        return
-                    job_url_local = url_val
-                else:
-                    text_val = (st.session_state.get("job_text_input") or "").strip()
-                    if not text_val:
-                        st.warning("Please paste the full job description text.")
-                        st.session_state["analysis_requested"] = False
-                        return
-                    job_text_local = text_val
-                    job_url_local = (st.session_state.get("job_url_ref") or "").strip()
-
-                status_box.update(label="Extracting structured details…")
-                job_data = run_job_extraction_chain(job_text_local, job_url_local)
-
-                status_box.update(label="Scoring match against your profile…")
-                match = score_job_fit(job_data, profile)
-                job_data["match"] = match
-
-                # Save to session for display
-                st.session_state["job_data"] = job_data
-                st.session_state["match"] = match
-
-                status_box.update(label="Done", state="complete")
-
-        except Exception as e:
-            st.error(f"Analysis failed: {e}")
-        finally:
-            # Release lock and clear the one-shot trigger
+    # Phase 2: queue the work; the button stays disabled until the task finishes
+    if st.session_state["analysis_requested"]:
+        st.session_state["analysis_requested"] = False
+        payload = _analysis_payload(input_mode)
+        if payload is None:
+            st.session_state["analyzing_job"] = False
+        else:
+            label = payload.get("url") or (payload.get("text") or "")[:60]
+            st.session_state["add_job_task"] = submit_task("add_job", payload, label=label)
+        st.rerun()
+
+    task_id = st.session_state.get("add_job_task")
+    if task_id is not None:
+        t = task_panel(task_id, "Analyzing job")
+        if t is not None:
+            # Release lock and refresh UI to show results and re-enable controls
+            st.session_state.pop("add_job_task", None)
             st.session_state["analyzing_job"] = False
-            st.session_state["analysis_requested"] = False
-            st.rerun()  # refresh UI to show results and re-enable controls
+            _take_result(t)
+            st.rerun()
+
+    err = st.session_state.pop("add_job_error", None)
+    if err:
+        st.error(f"Analysis failed: {err}")
+
+    if not st.session_state["analyzing_job"] and "job_data" not in st.session_state:
+        _show_recent_tasks()
+
+    hit = st.session_state.get("duplicate_hit")
+    if hit and not st.session_state["analyzing_job"]:
+        _show_duplicate_choice(hit, profile)
 
     # === Display saved data from session ===
     if "job_data" in st.session_state:
@@ -0,0 +1,79 @@
+# components/cost_analytics.py
+import streamlit as st
+
+from utils.ai import cost_analytics, model_router
+
+RANGES = {"Last 24 hours": 1, "Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90, "All time": None}
+
+def _pct(x: float) -> str:
+    return f"{x * 100:.0f}%"
+
+def show_cost_analytics():
+    st.caption("Latency, tokens and cost of every LLM call, from data/gpt_calls.csv.")
+
+    c1, c2, c3 = st.columns([2, 2, 1])
+    label = c1.selectbox("Range", list(RANGES), index=2, key="analytics_range")
+    freq = c2.selectbox("Group by", ["day", "hour", "week"], key="analytics_freq")
+    if c3.button("Refresh", key="analytics_refresh"):
+        st.rerun()
+
+    # cheap: only rows logged since the last visit are parsed
+    cost_analytics.refresh()
+    since = cost_analytics.since_days(RANGES[label])
+    t = cost_analytics.totals(since)
+    if not t["calls"]:
+        st.info("No LLM calls logged in this range yet.")
+        return
+
+    summary = cost_analytics.summary(since)
+    m = st.columns(5)
+    m[0].metric("Calls", f"{t['calls']:,}")
+    m[1].metric("Cost", f"${t['cost_usd']:,.4f}")
+    m[2].metric("Tokens", f"{t['tokens']:,}")
+    m[3].metric("Response cache hits", _pct(t["response_cache_hit_rate"]))
+    m[4].metric("Prompt tokens cached", _pct(t["prompt_cached_share"]))
+
+    series = cost_analytics.timeseries(since, freq)
+    st.markdown("**Cost by task**")
+    st.bar_chart(series.pivot_table(index="period", columns="task", values="cost_usd", aggfunc="sum"))
+    st.markdown("**p95 latency by task (s)**")
+    st.line_chart(series.pivot_table(index="period", columns="task", values="p95_latency_s"))
+    st.markdown("**Tokens by task**")
+    st.bar_chart(series.pivot_table(index="period", columns="task", values="tokens", aggfunc="sum"))
+
+    st.markdown("**By task and model**")
+    st.dataframe(
+        summary,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "cost_usd": st.column_config.NumberColumn("Cost ($)", format="%.4f"),
+            "p50_latency_s": st.column_config.NumberColumn("p50 (s)", format="%.2f"),
+            "p95_latency_s": st.column_config.NumberColumn("p95 (s)", format="%.2f"),
+            "response_cache_hit_rate": st.column_config.NumberColumn("Cache hits", format="%.2f"),
+            "prompt_cached_share": st.column_config.NumberColumn("Prompt cached", format="%.2f"),
+        },
+    )
+
+    st.markdown("**Most expensive jobs**")
+    jobs = cost_analytics.per_job(since)
+    if jobs.empty:
+        st.caption("No calls attributed to a job yet.")
+    else:
+        st.dataframe(
+            jobs,
+            hide_index=True,
+            use_container_width=True,
+            column_config={"cost_usd": st.column_config.NumberColumn("Cost ($)", format="%.4f")},
+        )
+
+    routing = model_router.outcome_summary()
+    if routing:
+        st.markdown("**Model routing: first-try success by task, input size and tier**")
+        st.caption("Tiers under the target success rate escalate; cheaper tiers that meet it take over (settings: model_routing).")
+        st.dataframe(
+            routing,
+            hide_index=True,
+            use_container_width=True,
+            column_config={"first_try_success": st.column_config.NumberColumn("First-try success", format="%.2f")},
+        )
@@ -1,41 +1,17 @@
-import os
-import json
 import math
 import streamlit as st
-from datetime import datetime
+from services import job_store, semantic_index
+from components.tasks import submit_task
+from services.skill_matching_agent.bulk_rescore import TASK_KIND as RESCORE_TASK, rescore_status, stale_jobs
+from services.skill_matching_agent.matrix_scoring import load_profile_variants, rank_jobs, variants_version
+from utils.file_utils import load_profile
+from utils.ai.embeddings import semantic_config
 
-JOBS_FOLDER = "data/jobs"
+SEMANTIC_TOP_K = 200
 
-def _parse_when(s: str):
-    """Try parsing multiple date formats safely for sorting."""
-    if not s:
-        return datetime.min
-    try:
-        return datetime.fromisoformat(s.replace("Z", "").split(".")[0])
-    except Exception:
-        try:
-            return datetime.strptime(s, "%Y-%m-%d %H:%M:%S")
-        except Exception:
-            return datetime.min
-
-def load_saved_jobs(folder=JOBS_FOLDER):
-    jobs = []
-    if not os.path.exists(folder):
-        os.makedirs(folder)
-
-    # Recursive load
-    for root, _, files in os.walk(folder):
-        for filename in files:
-            if filename.endswith(".json"):
-                path = os.path.join(root, filename)
-                try:
-                    with open(path, "r", encoding="utf-8") as f:
-                        job = json.load(f)
-                        job["_source_path"] = path
-                        jobs.append(job)
-                except Exception as e:
-                    st.warning(f"Skipped {path}: {e}")
-    return jobs
+def load_saved_jobs():
+    """Return lightweight job summaries from the job index (no per-job JSON reads)."""
+    return job_store.list_jobs()
 
 def _ensure_session_defaults():
     if "sort_order" not in st.session_state:
@@ -48,6 +24,8 @@ def _ensure_session_defaults():
         st.session_state["page"] = 0
     if "search_query" not in st.session_state:
         st.session_state["search_query"] = ""
+    if "semantic_search" not in st.session_state:
+        st.session_state["semantic_search"] = False
     if "_last_controls_snapshot" not in st.session_state:
         st.session_state["_last_controls_snapshot"] = None
 
@@ -58,6 +36,7 @@ def _controls_snapshot():
         st.session_state.get("job_filter"),
         st.session_state.get("page_size"),
         st.session_state.get("search_query"),
+        st.session_state.get("semantic_search"),
     )
 
 def _reset_page_if_controls_changed():
@@ -66,48 +45,119 @@ def _reset_page_if_controls_changed():
         st.session_state["page"] = 0
         st.session_state["_last_controls_snapshot"] = snap
 
-def show_job_cards(jobs):
+def _show_rescore_status():
+    """Progress of the background bulk re-score, or an offer to start one for stale jobs."""
+    status = rescore_status()
+    if status.get("running"):
+        if status.get("status") == "running":
+            st.info(f"🔁 Re-scoring saved jobs against your updated profile: "
+                    f"{len(status.get('done', []))}/{status.get('total', 0)} done.")
+        else:
+            st.info("🔁 Re-scoring saved jobs against your updated profile: queued.")
+        return
+
+    # only re-checked after a job or the profile changes, not on every search keystroke
+    try:
+        key = (job_store.index_version(), variants_version()[0])
+        cached = st.session_state.get("_stale_jobs")
+        if not cached or cached[0] != key:
+            cached = (key, len(stale_jobs(load_profile())))
+            st.session_state["_stale_jobs"] = cached
+        stale = cached[1]
+    except Exception as e:
+        st.warning(f"Could not check for jobs scored against an older profile: {e}")
+        return
+    if not stale:
+        return
+    left, right = st.columns([3, 1])
+    with left:
+        msg = f"{stale} saved job(s) were scored against an older profile."
+        if status.get("status") in ("interrupted", "partial"):
+            msg += " The last bulk re-score did not finish; it will resume where it stopped."
+        st.caption(msg)
+    with right:
+        if st.button("🔁 Re-score stale jobs", key="bulk_rescore"):
+            submit_task(RESCORE_TASK, {}, label="Re-score stale jobs")
+            st.rerun()
+
+def _show_variant_ranking():
+    """Every saved job scored against every profile variant (data/profile.json + data/profiles/*.json)."""
+    with st.expander("📊 Rank all jobs across profile variants", expanded=False):
+        versions = variants_version()
+        st.caption(
+            "Fast local scoring (no API calls) against your profile and each variant in "
+            "`data/profiles/*.json`. Use it to triage; the job page has the full match."
+        )
+        c1, c2 = st.columns([2, 1])
+        with c1:
+            sort_by = st.selectbox("Sort by", ["Best variant"] + [n for n, _ in versions], key="rank_sort_by")
+        with c2:
+            limit = st.number_input("Show top", min_value=10, max_value=1000, value=50, step=10, key="rank_limit")
+
+        # scored on request, then again only when jobs, variants or these options change
+        if st.button("📊 Rank jobs", key="rank_run"):
+            st.session_state["rank_requested"] = True
+        if not st.session_state.get("rank_requested"):
+            return
+        key = (job_store.index_version(), versions, sort_by, int(limit))
+        cached = st.session_state.get("_variant_ranking")
+        if not cached or cached[0] != key:
+            rows = rank_jobs(load_profile_variants(), sort_by=None if sort_by == "Best variant" else sort_by, limit=int(limit))
+            cached = (key, rows)
+            st.session_state["_variant_ranking"] = cached
+        rows = cached[1]
+        if not rows:
+            st.info("Nothing to rank yet.")
+            return
+        st.dataframe(
+            [
+                {"Job": r["job_title"], "Company": r["company"], **r["scores"], "Best fit": r["best"], "Path": r["path"]}
+                for r in rows
+            ],
+            use_container_width=True,
+            hide_index=True,
+        )
+
+def show_job_cards():
     _ensure_session_defaults()
 
     st.header("🗃️ Saved Jobs")
 
     col1, col2, col3 = st.columns([1, 1, 2])
     with col1:
-        sort_order = st.radio("Sort by", ["Newest", "Oldest"], horizontal=True, key="sort_order")
+        sort_order = st.radio("Sort by", ["Newest", "Oldest", "Relevance"], horizontal=True, key="sort_order",
+                              help="Relevance ranks search results by how well they match (title hits count most)")
     with col2:
         filter_option = st.radio("Filter", ["All Jobs", "Applied Only"], horizontal=True, key="job_filter")
     with col3:
-        st.text_input("Search", key="search_query", placeholder="Title, company or location..")
+        st.text_input("Search", key="search_query", placeholder="Title, company, skills, responsibilities..")
+        semantic_on = semantic_config()["enabled"]
+        if semantic_on:
+            st.toggle("Search by meaning", key="semantic_search",
+                      help='Ranks jobs by similarity to your description, e.g. "event-driven backend, Kafka-ish"')
 
     _reset_page_if_controls_changed()
 
-    if not jobs:
+    if job_store.count_jobs() == 0:
         st.info("No saved jobs yet. Add one on the 'Add Job' page.")
         return
 
-    # Filter
-    if filter_option == "Applied Only":
-        jobs = [job for job in jobs if job.get("date_applied")]
-
-    # Search
-    q = (st.session_state.get("search_query") or "").strip().lower()
-    if q:
-        def _matches(job):
-            title = (job.get("job_title") or "").lower()
-            company = (job.get("company") or "").lower()
-            location = (job.get("location") or "").lower()
-            return q in title or q in company or q in location
-        jobs = [j for j in jobs if _matches(j)]
-
-    # Sort using _parse_when
-    jobs = sorted(
-        jobs,
-        key=lambda j: _parse_when(j.get("date_added", "")),
-        reverse=(sort_order == "Newest"),
-    )
+    _show_rescore_status()
+    _show_variant_ranking()
+
+    # Filter + search + sort + paginate in the index, not in Python
+    applied_only = (filter_option == "Applied Only")
+    q = (st.session_state.get("search_query") or "").strip()
+
+    semantic = bool(q) and semantic_on and st.session_state.get("semantic_search")
+    if semantic:
+        # ranked by meaning: the top SEMANTIC_TOP_K hits, paged in memory
+        hits = job_store.jobs_by_paths([p for p, _ in semantic_index.search(q, k=SEMANTIC_TOP_K)])
+        if applied_only:
+            hits = [j for j in hits if j.get("date_applied")]
 
     # Pagination math
-    total = len(jobs)
+    total = len(hits) if semantic else job_store.count_jobs(applied_only=applied_only, search=q)
     page_size = st.session_state["page_size"]
     total_pages = max(1, math.ceil(total / page_size))
     page = min(st.session_state["page"], total_pages - 1)
@@ -116,7 +166,17 @@ def show_job_cards(jobs):
     # Slice
     start = page * page_size
     end = start + page_size
-    visible_jobs = jobs[start:end]
+    if semantic:
+        visible_jobs = hits[start:end]
+    else:
+        visible_jobs = job_store.list_jobs(
+            applied_only=applied_only,
+            search=q,
+            newest_first=(sort_order != "Oldest"),
+            limit=page_size,
+            offset=start,
+            by_relevance=(sort_order == "Relevance"),
+        )
 
     # Render cards (same as before) ...
     for idx, job in enumerate(visible_jobs):
@@ -124,7 +184,7 @@ def show_job_cards(jobs):
             if job.get("date_applied"):
                 st.markdown(f"✅ **Applied on {job['date_applied']}**")
             st.subheader(f"{job.get('job_title')} at {job.get('company')}")
-            st.markdown(f"📍 {job.get('location', 'N/A')}  |  {job.get('work_location', 'N/A')}")
+            st.markdown(f"📍 {job.get('location') or 'N/A'}  |  {job.get('work_location') or 'N/A'}")
             summary = (job.get("summary") or "").strip()
             if summary:
                 st.write(summary[:400] + ("..." if len(summary) > 400 else ""))
@@ -147,8 +207,7 @@ def show_job_cards(jobs):
                 with d1:
                     if st.button("✅ Yes, delete it", key=f"confirm_yes_{job.get('_source_path', '')}"):
                         try:
-                            if os.path.exists(target):
-                                os.remove(target)
+                            job_store.delete_job(target)
                             st.session_state["confirm_delete"] = None
                             # Keep page valid after deletion
                             st.session_state["page"] = min(st.session_state["page"], max(0, total_pages - 1))
@@ -201,4 +260,8 @@ def show_job_cards(jobs):
 
     with right:
         st.caption(f"Page {page + 1} of {total_pages}")
+        if st.button("🔄 Rebuild index", help="Re-scan data/jobs if job files were added or edited outside the app"):
+            job_store.rebuild_index()
+            semantic_index.rebuild()
+            st.rerun()
 
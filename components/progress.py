@@ -0,0 +1,12 @@
+# components/progress.py
+import streamlit as st
+from utils.progress import ProgressFn
+
+def streamlit_progress(placeholder=None) -> ProgressFn:
+    """Render service progress messages into a single Streamlit placeholder."""
+    box = placeholder if placeholder is not None else st.empty()
+
+    def _cb(level: str, message: str) -> None:
+        getattr(box, level, box.info)(message)
+
+    return _cb
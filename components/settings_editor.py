@@ -5,6 +5,9 @@ import tempfile
 from typing import Any, Dict, List
 import streamlit as st
 from utils.config.settings import load_settings, save_settings  # reuse your existing helpers
+from utils.config import credit_ledger
+from components.cost_analytics import show_cost_analytics
+from components.traces import show_traces
 
 # ---------- Small UI helpers ----------
 def _inject_css():
@@ -35,6 +38,8 @@ def _basic_settings_checks(d: Dict[str, Any]) -> List[str]:
         errs.append("`developer_mode` should be a boolean.")
     if "credit_balance" in d and not isinstance(d["credit_balance"], (int, float)):
         errs.append("`credit_balance` should be a number.")
+    if "enforce_credit_balance" in d and not isinstance(d["enforce_credit_balance"], bool):
+        errs.append("`enforce_credit_balance` should be a boolean.")
 
     pm = d.get("preferred_models")
     if pm is not None:
@@ -44,6 +49,87 @@ def _basic_settings_checks(d: Dict[str, Any]) -> List[str]:
             for k in ["extract","summarize","cover_letter","resume","cheap_fallback","review_extracted_job","analysis","analysis_mini","clean_job_text", "skill_match"]:
                 if k in pm and not isinstance(pm[k], str):
                     errs.append(f"`preferred_models.{k}` should be a string (model name).")
+
+    lc = d.get("llm_cache")
+    if lc is not None:
+        if not isinstance(lc, dict):
+            errs.append("`llm_cache` should be an object with enabled, ttl_hours and max_mb.")
+        else:
+            if "enabled" in lc and not isinstance(lc["enabled"], bool):
+                errs.append("`llm_cache.enabled` should be a boolean.")
+            for k in ["ttl_hours", "max_mb"]:
+                if k in lc and not isinstance(lc[k], (int, float)):
+                    errs.append(f"`llm_cache.{k}` should be a number.")
+    sm = d.get("skill_matching")
+    if sm is not None:
+        if not isinstance(sm, dict):
+            errs.append("`skill_matching` should be an object.")
+        elif "mode" in sm and sm["mode"] not in ("local", "hybrid", "llm"):
+            errs.append("`skill_matching.mode` should be one of: local, hybrid, llm.")
+    ss = d.get("semantic_search")
+    if ss is not None:
+        if not isinstance(ss, dict):
+            errs.append("`semantic_search` should be an object.")
+        else:
+            if "backend" in ss and ss["backend"] not in ("auto", "hashing", "sentence-transformers"):
+                errs.append("`semantic_search.backend` should be one of: auto, hashing, sentence-transformers.")
+            if "hash_dim" in ss and not (isinstance(ss["hash_dim"], int) and ss["hash_dim"] > 0):
+                errs.append("`semantic_search.hash_dim` should be a positive integer.")
+    hc = d.get("http_cache")
+    if hc is not None:
+        if not isinstance(hc, dict):
+            errs.append("`http_cache` should be an object.")
+        else:
+            for k in ("fresh_for_minutes", "max_mb"):
+                if k in hc and not (isinstance(hc[k], (int, float)) and hc[k] >= 0):
+                    errs.append(f"`http_cache.{k}` should be a non-negative number.")
+    pb = d.get("payload_budget")
+    if pb is not None:
+        if not isinstance(pb, dict):
+            errs.append("`payload_budget` should be an object mapping task -> token budget.")
+        else:
+            for k, v in pb.items():
+                if not (isinstance(v, int) and v >= 0):
+                    errs.append(f"`payload_budget.{k}` should be a non-negative integer (0 = no limit).")
+    tq = d.get("task_queue")
+    if tq is not None:
+        if not isinstance(tq, dict):
+            errs.append("`task_queue` should be an object with workers, autostart and poll_seconds.")
+        else:
+            if "workers" in tq and not (isinstance(tq["workers"], int) and tq["workers"] >= 1):
+                errs.append("`task_queue.workers` should be a positive integer.")
+            if "autostart" in tq and not isinstance(tq["autostart"], bool):
+                errs.append("`task_queue.autostart` should be a boolean.")
+            if "poll_seconds" in tq and not (isinstance(tq["poll_seconds"], (int, float)) and tq["poll_seconds"] > 0):
+                errs.append("`task_queue.poll_seconds` should be a positive number.")
+    tr = d.get("tracing")
+    if tr is not None:
+        if not isinstance(tr, dict):
+            errs.append("`tracing` should be an object with enabled and keep_runs.")
+        else:
+            if "enabled" in tr and not isinstance(tr["enabled"], bool):
+                errs.append("`tracing.enabled` should be a boolean.")
+            if "keep_runs" in tr and not (isinstance(tr["keep_runs"], int) and tr["keep_runs"] >= 1):
+                errs.append("`tracing.keep_runs` should be a positive integer.")
+    mr = d.get("model_routing")
+    if mr is not None:
+        if not isinstance(mr, dict):
+            errs.append("`model_routing` should be an object.")
+        else:
+            if "enabled" in mr and not isinstance(mr["enabled"], bool):
+                errs.append("`model_routing.enabled` should be a boolean.")
+            tiers = mr.get("tiers")
+            if tiers is not None and not (isinstance(tiers, dict) and tiers and set(tiers) <= {"nano", "mini", "full"}
+                                          and all(isinstance(v, str) for v in tiers.values())):
+                errs.append("`model_routing.tiers` should map nano / mini / full to model names.")
+            if "adaptive_tasks" in mr and not (isinstance(mr["adaptive_tasks"], list) and all(isinstance(t, str) for t in mr["adaptive_tasks"])):
+                errs.append("`model_routing.adaptive_tasks` should be a list of task names.")
+            for k in ("small_input_tokens", "large_input_tokens", "min_samples", "window"):
+                if k in mr and not (isinstance(mr[k], int) and mr[k] >= 0):
+                    errs.append(f"`model_routing.{k}` should be a non-negative integer.")
+            for k in ("target_success", "explore_rate"):
+                if k in mr and not (isinstance(mr[k], (int, float)) and 0 <= mr[k] <= 1):
+                    errs.append(f"`model_routing.{k}` should be a number between 0 and 1.")
     return errs
 
 # ---------- Main ----------
@@ -51,11 +137,17 @@ def show_settings_editor():
     st.header("🛠️ App Settings")
     _inject_css()
 
-    # Always reload live settings so View reflects current state
+    # Always reload live settings so View reflects current state.
+    # credit_balance lives in the credit ledger; show the live value here.
     s = load_settings()
+    live_balance = credit_ledger.get_balance()
+    s["credit_balance"] = live_balance
     st.caption("Control models, developer mode, credit balance, and other app flags.")
 
-    tab_view, tab_edit = st.tabs(["View", "Edit JSON"])
+    # pipeline traces are a developer tool
+    dev_mode = bool(s.get("developer_mode", False))
+    tabs = st.tabs(["View", "Edit JSON", "Usage & Cost"] + (["Traces"] if dev_mode else []))
+    tab_view, tab_edit, tab_usage = tabs[:3]
 
     # ===== View (prettier) =====
     with tab_view:
@@ -73,7 +165,7 @@ def show_settings_editor():
 
         # Credit balance big number
         with top[1]:
-            bal = float(s.get("credit_balance", 0.0)) if isinstance(s.get("credit_balance", 0.0), (int,float)) else 0.0
+            bal = live_balance
             st.markdown("**Credit Balance**")
             st.markdown(f"<div class='big'>${bal:,.2f}</div>", unsafe_allow_html=True)
             st.caption("Updated after each API call.")
@@ -114,6 +206,16 @@ def show_settings_editor():
         with st.expander("Raw JSON"):
             st.json(s, expanded=False)
 
+        lc = s.get("llm_cache", {}) or {}
+        st.caption(
+            f"LLM response cache: {'on' if lc.get('enabled', True) else 'off'} · "
+            f"TTL {lc.get('ttl_hours', 168)}h · max {lc.get('max_mb', 200)} MB"
+        )
+        if st.button("Clear LLM response cache"):
+            from utils.ai import response_cache
+            response_cache.clear()
+            st.success("Response cache cleared.")
+
     # ===== Edit JSON (your original logic) =====
     with tab_edit:
         st.caption("Edit the raw settings JSON. Validates before saving.")
@@ -140,6 +242,10 @@ def show_settings_editor():
                     st.error("Fix these before saving:\n\n- " + "\n- ".join(errs))
                 else:
                     try:
+                        # A changed credit_balance is a manual top-up: record it in the ledger
+                        new_bal = parsed.get("credit_balance")
+                        if isinstance(new_bal, (int, float)) and round(float(new_bal), 6) != round(live_balance, 6):
+                            credit_ledger.set_balance(float(new_bal), note="App Settings")
                         # Use the same mechanism the rest of the app uses
                         save_settings(parsed)
                         # keep session in sync and refresh
@@ -152,5 +258,15 @@ def show_settings_editor():
         st.divider()
         if st.button("Reload from disk"):
             fresh = load_settings()
+            fresh["credit_balance"] = credit_ledger.get_balance()
             st.session_state["settings_json_buffer"] = _pretty_json(fresh)
             st.success("Reloaded latest settings.")
+
+    # ===== Usage & Cost =====
+    with tab_usage:
+        show_cost_analytics()
+
+    # ===== Traces (developer mode) =====
+    if dev_mode:
+        with tabs[3]:
+            show_traces()
@@ -0,0 +1,51 @@
+# components/tasks.py
+import time
+import streamlit as st
+
+from services import task_queue
+
+def submit_task(kind: str, payload: dict, label: str = "", job_path: str = "") -> int:
+    """Queue a background task and make sure a worker pool is there to run it."""
+    task_id = task_queue.submit(kind, payload, label=label, job_path=job_path)
+    try:
+        task_queue.ensure_worker()
+    except Exception as e:
+        print(f"[TaskQueue] could not start a worker: {e}")
+    return task_id
+
+def _elapsed(t: dict) -> str:
+    start = t.get("started_at") or t.get("created_at") or time.time()
+    return f"{time.time() - start:.0f}s"
+
+def _show_pending(task_id: int, label: str, render=None):
+    t = task_queue.get(task_id)
+    if t is None or task_queue.is_finished(t):
+        # whole-page rerun so the caller picks up the result
+        st.rerun()
+    msg = (t.get("progress") or {}).get("message") or ""
+    if t["status"] == task_queue.QUEUED:
+        st.info(f"⏳ {label}: queued ({_elapsed(t)})")
+        if not task_queue.live_workers():
+            st.caption("Waiting for a worker. If this doesn't start, run `python -m jobhunter worker` from the repo root.")
+        if st.button("Cancel", key=f"cancel_task_{task_id}"):
+            task_queue.cancel(task_id)
+            st.rerun()
+    else:
+        st.info(f"⚙️ {label}: running ({_elapsed(t)}) {msg}")
+    if render:
+        render(t)
+
+def task_panel(task_id: int, label: str, render=None):
+    """
+    Returns the task once it has finished. Until then shows its progress in a fragment
+    that polls the queue (the rest of the page stays usable) and reruns the page when
+    the task completes. `render(task)` can draw partial results while it runs.
+    """
+    t = task_queue.get(task_id)
+    if t is None:
+        return {"id": task_id, "status": task_queue.FAILED, "error": "Task is no longer in the queue.", "result": None}
+    if task_queue.is_finished(t):
+        return t
+    every = task_queue.queue_config()["poll_seconds"]
+    st.fragment(run_every=every)(_show_pending)(task_id, label, render)
+    return None
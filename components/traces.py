@@ -0,0 +1,97 @@
+# components/traces.py
+import json
+import time
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+from utils import tracing
+
+KIND_COLORS = {"run": "#64748b", "stage": "#3b82f6", "llm": "#f59e0b", "parse": "#10b981", "event": "#ef4444"}
+
+def _run_label(r: dict) -> str:
+    when = time.strftime("%m-%d %H:%M:%S", time.localtime(r["started_at"]))
+    job = (r["job"] or "")[:60]
+    return f"{when}  {r['name']}  {r['duration_ms'] / 1000:.1f}s  ${r['cost_usd']:.4f}  {job}"
+
+def _waterfall(spans: list) -> alt.LayerChart:
+    rows = []
+    for i, s in enumerate(spans):
+        attrs = {k: v for k, v in s["attrs"].items() if k not in ("job", "url")}
+        rows.append({
+            "order": i,
+            "span": f"{'  ' * s['depth']}{s['name']}  #{i}",
+            "kind": s["kind"],
+            "start_ms": round(s["offset_ms"], 1),
+            "end_ms": round(s["offset_ms"] + max(s["duration_ms"], 0.0), 1),
+            "duration_ms": round(s["duration_ms"], 1),
+            "cost_usd": float(s["attrs"].get("cost_usd") or 0),
+            "details": json.dumps(attrs, ensure_ascii=False, default=str)[:300],
+            "error": s["error"] or "",
+        })
+    df = pd.DataFrame(rows)
+    y = alt.Y("span:N", sort=alt.SortField("order"), title=None, axis=alt.Axis(labelLimit=320))
+    color = alt.Color(
+        "kind:N",
+        scale=alt.Scale(domain=list(KIND_COLORS), range=list(KIND_COLORS.values())),
+        legend=alt.Legend(orient="bottom"),
+    )
+    tooltip = ["span", "kind", "duration_ms", "cost_usd", "details", "error"]
+    bars = alt.Chart(df[df["kind"] != "event"]).mark_bar(height=12).encode(
+        x=alt.X("start_ms:Q", title="ms since run start"), x2="end_ms:Q", y=y, color=color, tooltip=tooltip,
+    )
+    marks = alt.Chart(df[df["kind"] == "event"]).mark_point(shape="diamond", size=80, filled=True).encode(
+        x="start_ms:Q", y=y, color=color, tooltip=tooltip,
+    )
+    return (bars + marks).properties(height=max(120, 22 * len(df)))
+
+def show_traces():
+    st.caption("Per-run timings of the ingest pipeline (fetch, parse, each LLM call, branch decisions), from data/traces.db.")
+    runs = tracing.list_runs(200)
+    if not runs:
+        st.info("No traces yet. Add a job and its run will show up here.")
+        return
+
+    names = sorted({r["name"] for r in runs})
+    c1, c2 = st.columns([1, 3])
+    kind = c1.selectbox("Run type", ["all"] + names, key="trace_run_type")
+    shown = [r for r in runs if kind == "all" or r["name"] == kind]
+    if not shown:
+        st.info("No runs of this type.")
+        return
+    pick = c2.selectbox("Run", range(len(shown)), format_func=lambda i: _run_label(shown[i]), key="trace_run")
+    run = shown[pick]
+
+    m = st.columns(4)
+    m[0].metric("Wall time", f"{run['duration_ms'] / 1000:.2f}s")
+    m[1].metric("LLM calls", run["llm_calls"])
+    m[2].metric("Cost", f"${run['cost_usd']:.4f}")
+    m[3].metric("Status", run["status"])
+
+    spans = tracing.run_spans(run["run_id"])
+    llm_ms = sum(s["duration_ms"] for s in spans if s["kind"] == "llm")
+    if run["duration_ms"]:
+        st.caption(f"LLM calls account for {llm_ms / run['duration_ms']:.0%} of wall time (overlapping calls counted separately).")
+    st.altair_chart(_waterfall(spans), use_container_width=True)
+
+    with st.expander("Branches taken", expanded=False):
+        events = [s for s in spans if s["kind"] == "event"]
+        if events:
+            st.dataframe(
+                [{"event": s["name"], **{k: str(v) for k, v in s["attrs"].items()}} for s in events],
+                hide_index=True, use_container_width=True,
+            )
+        else:
+            st.caption("No branch decisions recorded in this run.")
+
+    st.markdown("**Stages across recent runs**")
+    st.dataframe(
+        tracing.stage_summary(200),
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "mean_ms": st.column_config.NumberColumn("Mean (ms)", format="%.1f"),
+            "p95_ms": st.column_config.NumberColumn("p95 (ms)", format="%.1f"),
+            "cost_usd": st.column_config.NumberColumn("Cost ($)", format="%.4f"),
+        },
+    )
@@ -4,13 +4,14 @@ import os
 import markdown2
 import hashlib
 from services.google_docs_utils import create_google_doc_from_html
-from services.cover_letter_agent.generate_cover_letter import generate_cover_letter as cl_generate
-from services.resume_agent.generate_resume import generate_resume as res_generate
-from services.analysis_agent.run_analysis import run_in_depth_analysis
 from services.sheets_tracker import log_application
+from services.job_store import read_job, write_job, jobs_by_paths
+from services import semantic_index
+from utils.ai.embeddings import semantic_config
+from services import task_queue
+from components.tasks import submit_task, task_panel
 from streamlit_quill import st_quill
-from services.skill_matching_agent.score_job_fit import score_job_fit
-from services.skill_matching_agent.skill_match_utils import compute_scores_from_matches
+from services.skill_matching_agent.bulk_rescore import TASK_KIND as RESCORE_TASK, rescore_status
 from utils.config.config import GOOGLE_DRIVE_FOLDERS, SHEETS_URL
 from datetime import datetime
 from utils.prompt_loader import list_prompts
@@ -28,9 +29,53 @@ def _band_label(v: float) -> str:
 def _pct(v):
     return f"{float(v):.1f}%"
 
-def save_job_json(job: dict, path: str):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(job, f, indent=2)
+def _update_job(path: str, job: dict, **fields):
+    """
+    Set `fields` (None removes one) on the job file as it is now, not on the copy this
+    rerun loaded: background tasks may have written a new match or analysis since.
+    `job` gets the same change so the rest of the page sees it.
+    """
+    fresh = read_job(path)
+    fresh.pop("_source_path", None)
+    for target in (fresh, job):
+        for k, v in fields.items():
+            if v is None:
+                target.pop(k, None)
+            else:
+                target[k] = v
+    write_job(path, fresh)
+
+def _show_partial(t: dict):
+    """Preview of a document while the worker is still generating it."""
+    partial = (t.get("progress") or {}).get("partial")
+    if partial:
+        with st.container(border=True):
+            st.markdown(partial)
+
+def _job_task(kind: str, path: str, label: str, render=None) -> tuple:
+    """
+    (busy, finished) for this job's latest background `kind` task. While it runs, its
+    progress is shown here; a finished task is handed back once per session.
+    """
+    t = task_queue.latest(kind, path)
+    if t is None:
+        return False, None
+    if not task_queue.is_finished(t):
+        task_panel(t["id"], label, render=render)
+        return True, None
+    seen = st.session_state.setdefault("seen_tasks", set())
+    if t["id"] in seen:
+        return False, None
+    seen.add(t["id"])
+    if t["status"] == task_queue.FAILED:
+        st.error(f"{label} failed: {t.get('error')}")
+    return False, t
+
+def _set_doc(kind: str, text: str):
+    """Load generated markdown into the cover letter ("cl") or resume ("res") editor."""
+    st.session_state.pop(f"view_quill_{kind}", None)
+    st.session_state[f"view_{kind}"] = text
+    st.session_state[f"view_{kind}_key"] = _stable_key(f"view_quill_{kind}", text)
 
 def clear_job_session_state():
     for key in [
@@ -38,6 +83,7 @@ def clear_job_session_state():
         "view_res",
         "cover_letter_url",
         "resume_url",
+        "similar_jobs",
         "last_viewed_job"
     ]:
         st.session_state.pop(key, None)
@@ -45,12 +91,34 @@ def clear_job_session_state():
 def _stable_key(prefix: str, text: str) -> str:
     return f"{prefix}_{hashlib.md5(text.encode('utf-8')).hexdigest()[:10]}"
 
-def add_resp_bonus(match: dict, analysis: dict) -> dict:
-    conf = (analysis.get("responsibilities", {}) or {}).get("confidence", 0) or 0
-    bonus = 8 * max(0, min(100, conf)) / 100.0
-    if "scores" in match:
-        match["scores"]["overall_score"] = min(100.0, round(match["scores"]["overall_score"] + bonus, 1))
-    return match
+def _show_similar_jobs(path: str):
+    """'More like this': nearest saved jobs by embedding similarity."""
+    if st.button("🧭 More like this", key="more_like_this"):
+        with st.spinner("Finding similar jobs..."):
+            hits = semantic_index.similar(path, k=5)
+        scores = dict(hits)
+        st.session_state["similar_jobs"] = [
+            {**j, "similarity": scores.get(j["_source_path"], 0.0)} for j in jobs_by_paths([p for p, _ in hits])
+        ]
+
+    similar = st.session_state.get("similar_jobs")
+    if similar is None:
+        return
+    if not similar:
+        st.caption("No similar saved jobs yet.")
+        return
+    with st.container(border=True):
+        st.markdown("**Similar saved jobs**")
+        for j in similar:
+            c1, c2 = st.columns([6, 1])
+            with c1:
+                st.markdown(f"{j.get('job_title')} at {j.get('company')} · 📍 {j.get('location') or '—'} "
+                            f"· similarity {j['similarity']:.2f}")
+            with c2:
+                if st.button("View", key=f"similar_{j['_source_path']}"):
+                    clear_job_session_state()
+                    st.session_state["view_job_path"] = j["_source_path"]
+                    st.rerun()
 
 def show_view_job(profile: dict):
     col1, col2 = st.columns([0.6, 7.4])
@@ -85,6 +153,9 @@ def show_view_job(profile: dict):
     st.subheader(f"{job.get('job_title', 'Unknown Title')} at {job.get('company', 'Unknown Company')}")
     st.markdown(f"📍 {job.get('location', '—')}")
 
+    if semantic_config()["enabled"]:
+        _show_similar_jobs(path)
+
     # --- Full Job Details as two-column rows ---
     st.markdown("### 📋 Full Job Details")
 
@@ -131,6 +202,7 @@ def show_view_job(profile: dict):
     analysis = job.get("analysis", {})
 
     st.markdown("### 🤝 Profile Match Details")
+    _job_task("score", path, "Re-scoring match")
 
     if not match:
         st.info("No match data available. Try re-running the skill matching agent.")
@@ -367,18 +439,15 @@ def show_view_job(profile: dict):
                     # Auto re-score only if signature changed
                     if old_sig != new_sig:
                         print(f"🤖 [Skill Matching AI] Re-scoring due to profile update for job '{job.get('job_title')}' at {job.get('company')}")
-                        with st.spinner("Re-scoring match with updated profile..."):
-                            try:
-                                updated_match = score_job_fit(job, latest)
-                                if updated_match:
-                                    job["match"] = updated_match
-                                    save_job_json(job, path)
-                                    st.success("Re-scored with updated profile.")
-                                    st.rerun()
-                                else:
-                                    st.info("Saved profile. Re-score skipped: scorer returned no data.")
-                            except Exception as e:
-                                st.info(f"Saved profile. Re-score skipped: {e}")
+                        try:
+                            submit_task("score", {"path": path}, label=job.get("job_title") or "", job_path=path)
+                            # every other saved job now has a stale match; this one has its own task
+                            if not rescore_status()["running"]:
+                                submit_task(RESCORE_TASK, {"skip": [path]}, label="Re-score stale jobs")
+                                st.toast("Re-scoring your other saved jobs in the background.")
+                            st.rerun()
+                        except Exception as e:
+                            st.info(f"Saved profile. Re-score skipped: {e}")
                     else:
                         st.info("Profile unchanged. Re-score not needed.")
 
@@ -386,29 +455,13 @@ def show_view_job(profile: dict):
     st.markdown("---")
     st.markdown("### 🧠 In‑depth Analysis")
 
+    an_busy, _ = _job_task("analysis", path, "In‑depth analysis")
     if not analysis:
-        if st.button("Generate In‑depth Analysis", key="run_analysis"):
-            with st.spinner("Analyzing responsibilities, strengths, gaps, and doc recommendations..."):
-                a = run_in_depth_analysis(job, profile)
-                job["analysis"] = a
-                save_job_json(job, path)
-
-                # Optional: recompute overall score with responsibilities bonus now that we have confidence
-                try:
-                    m = dict(match or {})
-                    # temporary bonus blend: + up to 8 points scaled by confidence
-                    resp_conf = (a.get("responsibilities", {}) or {}).get("confidence", 0) or 0
-                    # Reuse the scorer, but inject a bonus by post-processing:
-                    m = compute_scores_from_matches(m)  # keep skill/pref as-is
-                    bonus = 8 * max(0, min(100, resp_conf)) / 100.0
-                    m["scores"]["overall_score"] = min(100.0, round(m["scores"]["overall_score"] + bonus, 1))
-                    job["match"] = m
-                    save_job_json(job, path)
-                except Exception:
-                    pass
-
+        if st.button("Generate In‑depth Analysis", key="run_analysis", disabled=an_busy):
+            # the worker writes the analysis (and the responsibilities bonus) into the job file
+            submit_task("analysis", {"path": path}, label=job.get("job_title") or "", job_path=path)
             st.rerun()
-        else:
+        elif not an_busy:
             st.info("Run analysis to unlock responsibilities evidence, strengths/gaps, and document recommendations.")
             # fall through to disable doc generation below
     else:
@@ -416,26 +469,8 @@ def show_view_job(profile: dict):
         if analysis.get("summary"):
             st.markdown(f"**Summary:** {analysis['summary']}")
         # Actions for existing analysis
-        if st.button("🔄 Regenerate In‑depth Analysis", key="regen_analysis"):
-            with st.spinner("Re‑analyzing responsibilities, strengths, gaps, and doc recommendations..."):
-                # Re-run analysis
-                a = run_in_depth_analysis(job, profile)
-                job["analysis"] = a
-
-                # Recompute base scores from match (skill+pref only)
-                try:
-                    m = dict(job.get("match") or {})
-                    m = compute_scores_from_matches(m)  # base recompute
-                    # Apply responsibilities bonus once, based on fresh analysis
-                    resp_conf = (a.get("responsibilities", {}) or {}).get("confidence", 0) or 0
-                    bonus = 8 * max(0, min(100, resp_conf)) / 100.0
-                    if "scores" in m:
-                        m["scores"]["overall_score"] = min(100.0, round(m["scores"]["overall_score"] + bonus, 1))
-                    job["match"] = m
-                    save_job_json(job, path)
-                    st.success("Analysis regenerated and scores updated.")
-                except Exception as e:
-                    st.info(f"Analysis regenerated, but score update skipped: {e}")
+        if st.button("🔄 Regenerate In‑depth Analysis", key="regen_analysis", disabled=an_busy):
+            submit_task("analysis", {"path": path}, label=job.get("job_title") or "", job_path=path)
             st.rerun()
 
         # Responsibilities evidence
@@ -484,6 +519,10 @@ def show_view_job(profile: dict):
 
     # --- Generate or View Application Documents ---
     st.markdown("### ✨ Application Documents")
+    docs_busy, docs_done = _job_task("documents", path, "Cover letter and resume", render=_show_partial)
+    if docs_done and docs_done["status"] == task_queue.DONE:
+        _set_doc("cl", docs_done["result"]["cover_letter"])
+        _set_doc("res", docs_done["result"]["resume"])
     col1, col2 = st.columns([1,1])
 
     with col1:
@@ -503,28 +542,25 @@ def show_view_job(profile: dict):
             st.info("No cover-letter prompts found. Create one in Prompt Settings.")
             selected_cl_prompt = None
 
+        cl_busy, cl_done = _job_task("cover_letter", path, "Cover letter", render=_show_partial)
+        if cl_done and cl_done["status"] == task_queue.DONE:
+            _set_doc("cl", cl_done["result"]["cover_letter"])
+        cl_payload = {"path": path, "prompt": selected_cl_prompt}
+
         cl_url = job.get("cover_letter_url") or st.session_state.get("cover_letter_url")
         if cl_url:
             #  show “view” link
             st.markdown(f"[📄 View Cover Letter ↗]({cl_url})")
             #  Regenerate logic
-            if st.button("🔄 Regenerate Cover Letter", key="regen_cl"):
-                with st.spinner("Regenerating cover letter..."):
-                    cl = cl_generate(job, profile, prompt_filename=selected_cl_prompt)
-                    # Clear old editor state and store new content + new key
-                    st.session_state.pop("view_quill_cl", None)
-                    st.session_state["view_cl"] = cl
-                    st.session_state["view_cl_key"] = _stable_key("view_quill_cl", cl)
-                    job.pop("cover_letter_url", None)
-                    save_job_json(job, path)
+            if st.button("🔄 Regenerate Cover Letter", key="regen_cl", disabled=cl_busy or docs_busy):
+                _update_job(path, job, cover_letter_url=None)
+                submit_task("cover_letter", cl_payload, label=job.get("job_title") or "", job_path=path)
+                st.rerun()
         else:
-            disabled = not bool(job.get("analysis"))
+            disabled = not bool(job.get("analysis")) or cl_busy or docs_busy
             if st.button("✍️ Generate Cover Letter", key="gen_cl", disabled=disabled):
-                with st.spinner("Generating cover letter..."):
-                    cl = cl_generate(job, profile, prompt_filename=selected_cl_prompt)
-                    st.session_state.pop("view_quill_cl", None)
-                    st.session_state["view_cl"] = cl
-                    st.session_state["view_cl_key"] = _stable_key("view_quill_cl", cl)
+                submit_task("cover_letter", cl_payload, label=job.get("job_title") or "", job_path=path)
+                st.rerun()
 
     # Resume column
     with col2:
@@ -543,25 +579,35 @@ def show_view_job(profile: dict):
             st.info("No resume prompts found. Create one in Prompt Settings.")
             selected_res_prompt = None
 
+        res_busy, res_done = _job_task("resume", path, "Resume", render=_show_partial)
+        if res_done and res_done["status"] == task_queue.DONE:
+            _set_doc("res", res_done["result"]["resume"])
+        res_payload = {"path": path, "prompt": selected_res_prompt}
+
         res_url = job.get("resume_url") or st.session_state.get("resume_url")
         if res_url:
             st.markdown(f"[📄 View Resume ↗]({res_url})")
-            if st.button("🔄 Regenerate Resume", key="regen_res"):
-                with st.spinner("Regenerating resume..."):
-                    res = res_generate(job, profile, prompt_filename=selected_res_prompt)
-                    st.session_state.pop("view_quill_res", None)
-                    st.session_state["view_res"] = res
-                    st.session_state["view_res_key"] = _stable_key("view_quill_res", res)
-                    job.pop("resume_url", None)
-                    save_job_json(job, path)
+            if st.button("🔄 Regenerate Resume", key="regen_res", disabled=res_busy or docs_busy):
+                _update_job(path, job, resume_url=None)
+                submit_task("resume", res_payload, label=job.get("job_title") or "", job_path=path)
+                st.rerun()
         else:
-            disabled = not bool(job.get("analysis"))
+            disabled = not bool(job.get("analysis")) or res_busy or docs_busy
             if st.button("✍️ Generate Resume", key="gen_res", disabled=disabled):
-                with st.spinner("Generating resume..."):
-                    res = res_generate(job, profile, prompt_filename=selected_res_prompt)
-                    st.session_state.pop("view_quill_res", None)
-                    st.session_state["view_res"] = res
-                    st.session_state["view_res_key"] = _stable_key("view_quill_res", res)
+                submit_task("resume", res_payload, label=job.get("job_title") or "", job_path=path)
+                st.rerun()
+
+    # Both documents are independent, so generate them concurrently in one click
+    if not (cl_url or res_url):
+        busy = cl_busy or res_busy or docs_busy
+        if st.button("⚡ Generate Both (in parallel)", key="gen_both", disabled=not bool(job.get("analysis")) or busy):
+            submit_task(
+                "documents",
+                {"path": path, "cover_letter_prompt": selected_cl_prompt, "resume_prompt": selected_res_prompt},
+                label=job.get("job_title") or "",
+                job_path=path,
+            )
+            st.rerun()
 
     # --- Cover Letter Editor ---
     if st.session_state.get("view_cl"):
@@ -582,8 +628,7 @@ def show_view_job(profile: dict):
                     cover_letter_folder_id = GOOGLE_DRIVE_FOLDERS["cover_letters"]
                     cl_url = create_google_doc_from_html(edited_cl, doc_title, folder_id=cover_letter_folder_id)
                     # save url to job JSON
-                    job["cover_letter_url"] = cl_url
-                    save_job_json(job, path)
+                    _update_job(path, job, cover_letter_url=cl_url)
                     st.session_state["cover_letter_url"] = cl_url
                     st.success(f"✅ [Click here to open in Google Docs ↗]({cl_url})")
                 except Exception as e:
@@ -608,8 +653,7 @@ def show_view_job(profile: dict):
                     resume_folder_id = GOOGLE_DRIVE_FOLDERS["resumes"]
                     res_url = create_google_doc_from_html(edited_res, doc_title, folder_id=resume_folder_id)
                     # Save URL to job JSON
-                    job["resume_url"] = res_url
-                    save_job_json(job, path)
+                    _update_job(path, job, resume_url=res_url)
                     st.session_state["resume_url"] = res_url
                     st.success(f"✅ [Click here to open in Google Docs ↗]({res_url})")
                 except Exception as e:
@@ -637,9 +681,7 @@ def show_view_job(profile: dict):
                 )
 
                 # Save a simple flag and the global sheet link
-                job["sheets_logged"] = True
-                job["date_applied"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                save_job_json(job, path)
+                _update_job(path, job, sheets_logged=True, date_applied=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
 
                 st.success(f"✅ Logged and marked as applied on {job['date_applied']}")
                 st.link_button("↗ Open in Google Sheets", SHEETS_URL)
@@ -0,0 +1,4 @@
+# jobhunter/__main__.py
+from jobhunter.cli import main
+
+raise SystemExit(main())
@@ -0,0 +1,147 @@
+# jobhunter/cli.py
+"""
+Headless entry point for the pipeline (no Streamlit needed).
+
+Run from the repo root so data/ and services/*/prompts resolve:
+
+    python -m jobhunter ingest https://... https://...
+    python -m jobhunter ingest --file urls.txt --workers 6
+    python -m jobhunter score data/jobs/20250101/some_job.json
+    python -m jobhunter rescore            # only jobs scored against an older profile
+    python -m jobhunter rescore --all
+    python -m jobhunter rank --by backend --limit 20
+    python -m jobhunter generate cover_letter data/jobs/20250101/some_job.json --out letter.md
+    python -m jobhunter worker --processes 4    # run the app's background task queue
+"""
+import argparse, sys
+from typing import List
+
+from utils.file_utils import load_profile
+from utils.progress import print_progress
+
+def _cmd_ingest(args) -> int:
+    from services.batch_ingest import ingest_urls, parse_url_list
+
+    text = "\n".join(args.urls or [])
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            text += "\n" + f.read()
+    urls = parse_url_list(text)
+    if not urls:
+        print("No URLs given.", file=sys.stderr)
+        return 2
+
+    profile = load_profile()
+    failed = 0
+    for i, res in enumerate(ingest_urls(urls, profile, args.workers, args.host_interval), start=1):
+        if res["status"] == "saved":
+            print(f"[{i}/{len(urls)}] saved  {res.get('overall_score')}  {res.get('job_title')} @ {res.get('company')}  -> {res['path']}")
+        elif res["status"] == "duplicate":
+            print(f"[{i}/{len(urls)}] duplicate  {res['url']}  -> {res['path']}")
+        else:
+            failed += 1
+            print(f"[{i}/{len(urls)}] {res['status']}  {res['url']}  {res.get('error', '')}")
+    return 1 if failed else 0
+
+def _score_paths(paths: List[str]) -> int:
+    from services.skill_matching_agent.bulk_rescore import rescore_job
+
+    profile = load_profile()
+    failed = 0
+    for i, path in enumerate(paths, start=1):
+        try:
+            match = rescore_job(path, profile, progress=print_progress)
+            print(f"[{i}/{len(paths)}] {match['scores'].get('overall_score')}  {path}")
+        except Exception as e:
+            failed += 1
+            print(f"[{i}/{len(paths)}] error  {path}: {e}", file=sys.stderr)
+    return 1 if failed else 0
+
+def _cmd_score(args) -> int:
+    return _score_paths(args.paths)
+
+def _cmd_rescore(args) -> int:
+    from services.skill_matching_agent.bulk_rescore import run_bulk_rescore
+
+    cp = run_bulk_rescore(load_profile(), max_workers=args.workers, force=args.all, progress=print_progress)
+    return 1 if cp["failed"] else 0
+
+def _cmd_rank(args) -> int:
+    from services.skill_matching_agent.matrix_scoring import load_profile_variants, rank_jobs
+
+    variants = load_profile_variants()
+    if args.by and args.by not in variants:
+        print(f"Unknown profile variant '{args.by}'. Have: {', '.join(variants)}", file=sys.stderr)
+        return 2
+    names = list(variants)
+    print("  ".join(f"{n:>8.8}" for n in names) + "  job")
+    for r in rank_jobs(variants, sort_by=args.by, limit=args.limit):
+        print("  ".join(f"{r['scores'][n]:8.1f}" for n in names) + f"  {r['job_title']} @ {r['company']}  ({r['path']})")
+    return 0
+
+def _cmd_generate(args) -> int:
+    from services import job_store
+
+    job = job_store.read_job(args.path)
+    profile = load_profile()
+    if args.kind == "cover_letter":
+        from services.cover_letter_agent.generate_cover_letter import generate_cover_letter
+        text = generate_cover_letter(job, profile, prompt_filename=args.prompt, progress=print_progress)
+    else:
+        from services.resume_agent.generate_resume import generate_resume
+        text = generate_resume(job, profile, prompt_filename=args.prompt, progress=print_progress)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"Wrote {args.out}")
+    else:
+        print(text)
+    return 0
+
+def _cmd_worker(args) -> int:
+    from services.task_queue import queue_config, run_pool
+
+    run_pool(args.processes or queue_config()["workers"])
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="jobhunter", description="JobHunter.AI headless pipeline")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    ing = sub.add_parser("ingest", help="Fetch, extract, score and save job URLs")
+    ing.add_argument("urls", nargs="*", help="Job posting URLs")
+    ing.add_argument("--file", help="Text/CSV file with URLs")
+    ing.add_argument("--workers", type=int, default=4, help="Parallel jobs (default 4)")
+    ing.add_argument("--host-interval", type=float, default=2.0, help="Seconds between requests to one site")
+    ing.set_defaults(func=_cmd_ingest)
+
+    sc = sub.add_parser("score", help="Score saved job files against data/profile.json")
+    sc.add_argument("paths", nargs="+", help="Saved job JSON paths")
+    sc.set_defaults(func=_cmd_score)
+
+    rs = sub.add_parser("rescore", help="Re-score saved jobs after a profile change (resumable)")
+    rs.add_argument("--all", action="store_true", help="Re-score every job, not only stale ones")
+    rs.add_argument("--workers", type=int, default=4, help="Parallel jobs (default 4)")
+    rs.set_defaults(func=_cmd_rescore)
+
+    rk = sub.add_parser("rank", help="Rank all saved jobs against each profile variant (local, no API calls)")
+    rk.add_argument("--by", help="Sort by this variant (default: best score across variants)")
+    rk.add_argument("--limit", type=int, default=50, help="Rows to print (default 50)")
+    rk.set_defaults(func=_cmd_rank)
+
+    gen = sub.add_parser("generate", help="Generate a cover letter or resume for a saved job")
+    gen.add_argument("kind", choices=["cover_letter", "resume"])
+    gen.add_argument("path", help="Saved job JSON path")
+    gen.add_argument("--prompt", help="Prompt filename in the agent's prompts folder")
+    gen.add_argument("--out", help="Write markdown here instead of stdout")
+    gen.set_defaults(func=_cmd_generate)
+
+    wk = sub.add_parser("worker", help="Run background tasks queued by the app (data/tasks.db) until Ctrl+C")
+    wk.add_argument("--processes", type=int, help="Worker processes (default: settings task_queue.workers)")
+    wk.set_defaults(func=_cmd_worker)
+    return p
+
+def main(argv: List[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -1,7 +1,9 @@
 import json
-from typing import Dict, Any
+from typing import Dict, Any, List
 from utils.prompt_loader import load_prompt
-from utils.ai.openai_client import call_gpt
+from utils.ai.openai_client import call_gpt, acall_gpt
+from utils.ai.cost_logger import job_context
+from utils.ai.messages import cacheable_messages
 from services.skill_matching_agent.skill_match_utils import ensure_analysis_shape
 
 def build_payload(job: Dict[str, Any], profile: Dict[str, Any]) -> Dict[str, Any]:
@@ -23,18 +25,33 @@ def build_payload(job: Dict[str, Any], profile: Dict[str, Any]) -> Dict[str, Any
         },
     }
 
-def run_in_depth_analysis(job: Dict[str, Any], profile: Dict[str, Any]) -> Dict[str, Any]:
+def _analysis_messages(job: Dict[str, Any], profile: Dict[str, Any]) -> List[Dict[str, str]]:
     system_prompt = load_prompt("analysis_agent", "run_analysis_prompt.txt")
     payload = build_payload(job, profile)
+    # profile first so it lands in the cached prompt prefix
+    return cacheable_messages(system_prompt, {"PROFILE": payload["PROFILE"]}, {"JOB_DATA": payload["JOB_DATA"]})
+
+def run_in_depth_analysis(job: Dict[str, Any], profile: Dict[str, Any]) -> Dict[str, Any]:
+    print(f"🤖 [Analysis AI] Running job analysis for {job.get('company', 'Unknown Company')}..")
+    with job_context(job):
+        text, meta = call_gpt(
+            task="analysis",
+            messages=_analysis_messages(job, profile),
+            response_format={"type": "json_object"}
+        )
+    print(f"[Analysis AI] (tokens)={meta['total_tokens']} (cost)=${meta['cost_usd']} (model)={meta['model']}")
+    data = json.loads(text) if text else {}
+    return ensure_analysis_shape(data or {})
+
+async def arun_in_depth_analysis(job: Dict[str, Any], profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Async twin of run_in_depth_analysis."""
     print(f"🤖 [Analysis AI] Running job analysis for {job.get('company', 'Unknown Company')}..")
-    text, meta = call_gpt(
-        task="analysis",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": json.dumps(payload)}
-        ],
-        response_format={"type": "json_object"}
-    )
+    with job_context(job):
+        text, meta = await acall_gpt(
+            task="analysis",
+            messages=_analysis_messages(job, profile),
+            response_format={"type": "json_object"}
+        )
     print(f"[Analysis AI] (tokens)={meta['total_tokens']} (cost)=${meta['cost_usd']} (model)={meta['model']}")
     data = json.loads(text) if text else {}
     return ensure_analysis_shape(data or {})
@@ -0,0 +1,136 @@
+# services/batch_ingest.py
+import re, time, threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, Iterator, List
+from urllib.parse import urlparse
+
+from services import job_store
+from services.job_parser import fetch_job_page
+from services.save_job import save_job
+from services.duplicate_index import fingerprint, find_duplicates
+from services.job_extraction_agent.preclean import heuristic_preclean
+from services.job_extraction_agent.run_chain import run_job_extraction_chain
+from services.skill_matching_agent.score_job_fit import score_job_fit
+from utils.tracing import span
+
+DEFAULT_WORKERS = 4
+DEFAULT_HOST_INTERVAL_S = 2.0
+
+class HostRateLimiter:
+    """Spaces out requests to the same host by at least `min_interval_s` seconds."""
+
+    def __init__(self, min_interval_s: float = DEFAULT_HOST_INTERVAL_S):
+        self.min_interval_s = max(0.0, float(min_interval_s))
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> None:
+        host = (urlparse(url).hostname or "").lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.min_interval_s
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+def parse_url_list(text: str) -> List[str]:
+    """Pull http(s) URLs out of pasted text or an uploaded .txt/.csv file, de-duplicated in order."""
+    seen, out = set(), []
+    for token in re.split(r"[\s,;]+", text or ""):
+        u = token.strip().strip("\"'<>")
+        if not u.lower().startswith(("http://", "https://")):
+            continue
+        if u not in seen:
+            seen.add(u)
+            out.append(u)
+    return out
+
+def ingest_url(
+    url: str,
+    profile: Dict[str, Any],
+    limiter: HostRateLimiter | None = None,
+    skip_duplicates: bool = True,
+) -> Dict[str, Any]:
+    """
+    Fetch -> extract -> score -> save for a single URL. Never raises; errors go in the result.
+    A posting that near-duplicates a saved job is reported as "duplicate" before any LLM call.
+    """
+    with span("ingest", job=url) as sp:
+        result = _ingest_url(url, profile, limiter, skip_duplicates)
+        if sp:
+            sp["attrs"]["status"] = result["status"]
+        return result
+
+def _ingest_url(url: str, profile: Dict[str, Any], limiter: HostRateLimiter | None, skip_duplicates: bool) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"url": url, "status": "pending", "path": None, "error": ""}
+    t0 = time.time()
+    try:
+        if limiter:
+            with span("rate_limit_wait"):
+                limiter.wait(url)
+        page = fetch_job_page(url)
+        text = page["text"] if page else None
+        if not text:
+            result.update(status="fetch_failed", error="Could not fetch this URL (blocked or empty).")
+            return result
+
+        with span("preclean"):
+            pre = heuristic_preclean(text)
+        if skip_duplicates:
+            with span("duplicate_check"):
+                dups = find_duplicates(fingerprint(pre), url)
+            if dups:
+                existing = (job_store.jobs_by_paths([dups[0]["path"]]) or [{}])[0]
+                result.update(
+                    status="duplicate",
+                    path=dups[0]["path"],
+                    job_title=existing.get("job_title"),
+                    company=existing.get("company"),
+                    overall_score=(existing.get("scores") or {}).get("overall_score"),
+                    error=f"Same posting as a saved job ({dups[0]['reason']} match, {dups[0]['similarity']:.0%}).",
+                )
+                return result
+
+        job_data = run_job_extraction_chain(text, url, precleaned=pre,
+                                            trusted_source=page["trusted"], job_posting=page.get("job_posting"))
+        if not job_data:
+            result.update(status="extract_failed", error="Extraction returned no data.")
+            return result
+
+        job_data["match"] = score_job_fit(job_data, profile)
+        with span("save"):
+            path = save_job(job_data)
+
+        scores = job_data["match"].get("scores", {})
+        result.update(
+            status="saved",
+            path=path,
+            job_title=job_data.get("job_title"),
+            company=job_data.get("company"),
+            overall_score=scores.get("overall_score"),
+        )
+    except Exception as e:
+        result.update(status="error", error=str(e))
+    finally:
+        result["elapsed_s"] = round(time.time() - t0, 2)
+    return result
+
+def ingest_urls(
+    urls: Iterable[str],
+    profile: Dict[str, Any],
+    max_workers: int = DEFAULT_WORKERS,
+    per_host_interval_s: float = DEFAULT_HOST_INTERVAL_S,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Run ingest_url for many URLs on a bounded thread pool.
+    Yields each result as soon as it finishes, so the caller can show per-item progress.
+    """
+    urls = list(urls)
+    if not urls:
+        return
+    limiter = HostRateLimiter(per_host_interval_s)
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="ingest") as pool:
+        futures = {pool.submit(ingest_url, u, profile, limiter): u for u in urls}
+        for fut in as_completed(futures):
+            yield fut.result()
@@ -1,23 +1,30 @@
-import json
-from typing import Dict, Any
-import streamlit as st
+from typing import Dict, Any, List
 
 from utils.prompt_loader import load_prompt
-from utils.ai.openai_client import call_gpt
+from services.generator_payload import build_generator_payload, generator_messages
+from utils.ai.openai_client import call_gpt, acall_gpt, GPTStream
+from utils.ai.cost_logger import job_context
+from utils.progress import ProgressFn, report
 
 def _build_full_payload(job_data: Dict[str, Any], profile: Dict[str, Any]) -> Dict[str, Any]:
-    # MVP: include everything; we can add a stripper later to trim tokens
-    return {
-        "job": job_data or {},
-        "candidate": profile or {},
-        "constraints": {
-            "format": "markdown",
-            "company_name": (job_data or {}).get("company"),
-            "job_title": (job_data or {}).get("job_title")
-        }
-    }
-
-def generate_cover_letter(job_data: Dict[str, Any], profile: Dict[str, Any], model: str = "gpt-5-mini", prompt_filename: str | None = None) -> str:
+    # Only what the prompt uses, trimmed to settings["payload_budget"]["cover_letter"]
+    return build_generator_payload(job_data, profile, "cover_letter", {
+        "format": "markdown",
+        "company_name": (job_data or {}).get("company"),
+        "job_title": (job_data or {}).get("job_title")
+    })
+
+def _cover_letter_messages(job_data: Dict[str, Any], profile: Dict[str, Any], prompt_filename: str | None) -> List[Dict[str, str]]:
+    system_prompt = load_prompt("cover_letter_agent", prompt_filename or "_cover_letter_prompt.txt")
+    return generator_messages(system_prompt, _build_full_payload(job_data, profile))
+
+def generate_cover_letter(
+    job_data: Dict[str, Any],
+    profile: Dict[str, Any],
+    model: str = "gpt-5-mini",
+    prompt_filename: str | None = None,
+    progress: ProgressFn | None = None,
+) -> str:
     """
     Same structure as score_job_fit:
         - load_prompt + RULES
@@ -26,21 +33,15 @@ def generate_cover_letter(job_data: Dict[str, Any], profile: Dict[str, Any], mod
     Generate a cover letter with an optional specific system prompt file.
     Fallback to 'cover_letter_prompt.txt' if not provided.
     """
-    system_prompt = load_prompt("cover_letter_agent", prompt_filename or "_cover_letter_prompt.txt")
-
-    payload = _build_full_payload(job_data, profile)
-
     try:
         print(f"🤖 [CoverLetter AI Generator] Generating for {job_data.get('company', 'Unknown Company')}..")
-        text, meta = call_gpt(
-            task="cover_letter",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": json.dumps(payload, ensure_ascii=False)}
-            ],
-        )
+        with job_context(job_data):
+            text, meta = call_gpt(
+                task="cover_letter",
+                messages=_cover_letter_messages(job_data, profile, prompt_filename),
+            )
         print(f"[CoverLetter AI Generator] (tokens)={meta['total_tokens']} (cost)=${meta['cost_usd']} (model)={meta['model']}")
-        st.empty().success("✅ Cover letter generated!")
+        report(progress, "success", "✅ Cover letter generated!")
 
         # Clean and return
         letter = (text or "").strip()
@@ -49,3 +50,36 @@ def generate_cover_letter(job_data: Dict[str, Any], profile: Dict[str, Any], mod
     except Exception as e:
         print("[CoverLetter] Fatal error:", e)
         return f"❌ Error: {e}"
+
+def stream_cover_letter(
+    job_data: Dict[str, Any],
+    profile: Dict[str, Any],
+    prompt_filename: str | None = None,
+) -> GPTStream:
+    """Streaming variant: iterate for text as it is generated; `.text` holds the full letter after."""
+    print(f"🤖 [CoverLetter AI Generator] Streaming for {job_data.get('company', 'Unknown Company')}..")
+    with job_context(job_data):
+        return call_gpt(
+            task="cover_letter",
+            messages=_cover_letter_messages(job_data, profile, prompt_filename),
+            stream=True,
+        )
+
+async def agenerate_cover_letter(
+    job_data: Dict[str, Any],
+    profile: Dict[str, Any],
+    prompt_filename: str | None = None,
+) -> str:
+    """Async twin of generate_cover_letter."""
+    try:
+        print(f"🤖 [CoverLetter AI Generator] Generating for {job_data.get('company', 'Unknown Company')}..")
+        with job_context(job_data):
+            text, meta = await acall_gpt(
+                task="cover_letter",
+                messages=_cover_letter_messages(job_data, profile, prompt_filename),
+            )
+        print(f"[CoverLetter AI Generator] (tokens)={meta['total_tokens']} (cost)=${meta['cost_usd']} (model)={meta['model']}")
+        return (text or "").strip()
+    except Exception as e:
+        print("[CoverLetter] Fatal error:", e)
+        return f"❌ Error: {e}"
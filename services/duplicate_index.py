@@ -0,0 +1,217 @@
+# services/duplicate_index.py
+"""
+Near-duplicate detection for job postings, before any LLM call.
+
+A MinHash signature (128 permutations over word 5-shingles) is computed on the
+heuristic_preclean output and stored on the saved job as `source_fingerprint`.
+Signatures are banded for LSH (16 bands x 8 rows, so pairs above ~0.7 Jaccard
+almost always share a bucket) in data/job_fingerprints.db. A normalized URL
+match is the fallback for jobs saved without a fingerprint.
+"""
+import os, re, zlib, base64, sqlite3, threading
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import numpy as np
+
+from services import job_store
+
+DB_PATH = os.path.join("data", "job_fingerprints.db")
+
+NUM_PERM = 128
+BANDS, ROWS = 16, 8
+SHINGLE = 5
+DUPLICATE_THRESHOLD = 0.8
+# Query params dropped from the URL key (plus any utm_*); others like refId or sourceId can identify the posting
+TRACKING_PARAMS = {"ref", "source", "gh_src"}
+
+# Post-extraction fields that belong to the saved job, not to the posting
+_NOT_EXTRACTION = {
+    "match", "analysis", "date_added", "date_applied", "cover_letter_url",
+    "resume_url", "sheets_logged", "source_fingerprint", "_source_path", "scores",
+}
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, 1 << 31, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 31, NUM_PERM, dtype=np.uint64)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    path    TEXT PRIMARY KEY,
+    sig     BLOB,
+    url_key TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_fp_url ON fingerprints(url_key);
+CREATE TABLE IF NOT EXISTS bands (
+    band   INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    path   TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_bands ON bands(band, bucket);
+CREATE INDEX IF NOT EXISTS idx_bands_path ON bands(path);
+"""
+
+_init_lock = threading.Lock()
+_initialized = False
+
+# ---------- signatures ----------
+def _shingle_hashes(text: str) -> np.ndarray:
+    words = re.findall(r"\w+", (text or "").lower())
+    if len(words) < SHINGLE:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = [" ".join(words[i:i + SHINGLE]) for i in range(len(words) - SHINGLE + 1)]
+    return np.fromiter({zlib.crc32(g.encode("utf-8")) for g in grams}, dtype=np.uint64)
+
+def minhash(text: str) -> Optional[np.ndarray]:
+    """uint32[NUM_PERM] signature, or None for empty text."""
+    x = _shingle_hashes(text)
+    if not len(x):
+        return None
+    # (a*x + b) mod p for every permutation at once; a, b < 2^31 and x < 2^32 keep it in uint64
+    h = (np.outer(x, _A) + _B) % _MERSENNE
+    return h.min(axis=0).astype(np.uint32)
+
+def fingerprint(text: str) -> Optional[str]:
+    """Compact base64 form of the signature, stored on the job as `source_fingerprint`."""
+    sig = minhash(text)
+    return base64.b64encode(sig.tobytes()).decode("ascii") if sig is not None else None
+
+def _decode(fp: Optional[str]) -> Optional[np.ndarray]:
+    if not fp:
+        return None
+    try:
+        sig = np.frombuffer(base64.b64decode(fp), dtype=np.uint32)
+    except Exception:
+        return None
+    return sig if len(sig) == NUM_PERM else None
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the two shingle sets."""
+    return float(np.mean(a == b))
+
+def _buckets(sig: np.ndarray) -> List[int]:
+    return [zlib.crc32(sig[i * ROWS:(i + 1) * ROWS].tobytes()) for i in range(BANDS)]
+
+def _is_tracking_param(key: str) -> bool:
+    key = key.lower()
+    return key in TRACKING_PARAMS or key.startswith("utm_")
+
+def url_key(url: Optional[str]) -> Optional[str]:
+    """Scheme-less, lowercase host, no fragment, trailing slash or tracking params."""
+    if not url or not url.strip():
+        return None
+    parts = urlsplit(url.strip())
+    query = [(k, v) for k, v in parse_qsl(parts.query) if not _is_tracking_param(k)]
+    return urlunsplit(("", parts.netloc.lower().removeprefix("www."), parts.path.rstrip("/"), urlencode(query), "")).lstrip("/")
+
+# ---------- storage ----------
+def _connect() -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+def _put(conn: sqlite3.Connection, path: str, job: Dict[str, Any]) -> None:
+    sig = _decode(job.get("source_fingerprint"))
+    key = url_key(job.get("url"))
+    conn.execute("DELETE FROM bands WHERE path = ?", (path,))
+    if sig is None and key is None:
+        conn.execute("DELETE FROM fingerprints WHERE path = ?", (path,))
+        return
+    conn.execute(
+        "INSERT OR REPLACE INTO fingerprints (path, sig, url_key) VALUES (?, ?, ?)",
+        (path, sig.tobytes() if sig is not None else None, key),
+    )
+    if sig is not None:
+        conn.executemany(
+            "INSERT INTO bands (band, bucket, path) VALUES (?, ?, ?)",
+            [(b, bucket, path) for b, bucket in enumerate(_buckets(sig))],
+        )
+
+def rebuild() -> int:
+    """Re-read every saved job's fingerprint and URL."""
+    n = 0
+    with _connect() as conn:
+        conn.executescript(_SCHEMA)
+        conn.execute("DELETE FROM fingerprints")
+        conn.execute("DELETE FROM bands")
+        for row in job_store.list_jobs():
+            try:
+                job = job_store.read_job(row["_source_path"])
+            except Exception:
+                continue
+            _put(conn, os.path.normpath(row["_source_path"]), job)
+            n += 1
+    print(f"[Dedupe] indexed {n} jobs")
+    return n
+
+def _ensure() -> None:
+    global _initialized
+    if _initialized:
+        return
+    with _init_lock:
+        if _initialized:
+            return
+        fresh = not os.path.exists(DB_PATH)
+        with _connect() as conn:
+            conn.executescript(_SCHEMA)
+        _initialized = True
+    if fresh:
+        rebuild()
+
+def add(path: str, job: Dict[str, Any]) -> None:
+    _ensure()
+    with _connect() as conn:
+        _put(conn, os.path.normpath(path), job)
+
+def remove(path: str) -> None:
+    _ensure()
+    path = os.path.normpath(path)
+    with _connect() as conn:
+        conn.execute("DELETE FROM bands WHERE path = ?", (path,))
+        conn.execute("DELETE FROM fingerprints WHERE path = ?", (path,))
+
+def find_duplicates(
+    fp: Optional[str],
+    url: Optional[str] = None,
+    threshold: float = DUPLICATE_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """
+    Saved jobs that look like the same posting, best first:
+        [{"path", "similarity", "reason": "text" | "url"}]
+    """
+    _ensure()
+    sig = _decode(fp)
+    key = url_key(url)
+    found: Dict[str, Dict[str, Any]] = {}
+    with _connect() as conn:
+        if sig is not None:
+            cands = set()
+            for b, bucket in enumerate(_buckets(sig)):
+                cands.update(r[0] for r in conn.execute(
+                    "SELECT path FROM bands WHERE band = ? AND bucket = ?", (b, bucket)
+                ))
+            for path in cands:
+                row = conn.execute("SELECT sig FROM fingerprints WHERE path = ?", (path,)).fetchone()
+                if row and row[0]:
+                    s = similarity(sig, np.frombuffer(row[0], dtype=np.uint32))
+                    if s >= threshold:
+                        found[path] = {"path": path, "similarity": round(s, 3), "reason": "text"}
+        if key:
+            for (path,) in conn.execute("SELECT path FROM fingerprints WHERE url_key = ?", (key,)):
+                found.setdefault(path, {"path": path, "similarity": 1.0, "reason": "url"})
+    # drop rows whose job file is gone (deleted outside the app)
+    hits = [h for h in found.values() if os.path.exists(h["path"])]
+    return sorted(hits, key=lambda h: -h["similarity"])
+
+def reuse_extraction(existing: Dict[str, Any], url: Optional[str] = None, fp: Optional[str] = None) -> Dict[str, Any]:
+    """The stored extraction of a duplicate, ready to be re-scored and saved as a new job."""
+    job = {k: v for k, v in existing.items() if k not in _NOT_EXTRACTION}
+    if url:
+        job["url"] = url
+    fp = fp or existing.get("source_fingerprint")
+    if fp:
+        job["source_fingerprint"] = fp
+    return job
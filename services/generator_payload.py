@@ -0,0 +1,220 @@
+# services/generator_payload.py
+"""
+Compact job + profile payloads for the document generators (cover letter, resume).
+
+A saved job carries everything the app knows about it (scores, match details,
+fingerprints, file paths). The generators only need the posting, the analysis
+recommendations for their own document and the relevant parts of the profile, so:
+
+    1) keep the job fields the prompts use, plus this task's doc_recommendations
+    2) dedupe profile bullets, qualifications, traits and skills
+    3) list the experience bullets most relevant to the job's required / nice-to-have skills
+    4) if the payload is over settings["payload_budget"][task], order the profile by that
+       relevance (roles stay in reverse-chronological order) and drop the least relevant
+       content until it fits
+
+The profile block is left byte-identical across jobs whenever it fits, so it can sit in
+the cached prompt prefix (utils/ai/messages.py); only an over-budget profile is reshaped
+per job.
+"""
+import re, copy, json
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from services.skill_matching_agent.skill_match_utils import ALIASES, normalize_set
+from utils.ai.messages import cacheable_messages
+from utils.ai.tokens import count_json_tokens
+from utils.config.settings import load_settings
+
+# Payload tokens per task (the system prompt is not counted)
+DEFAULT_BUDGETS = {"cover_letter": 2500, "resume": 3500}
+
+JOB_FIELDS = (
+    "job_title", "company", "location", "work_location", "job_type", "summary",
+    "required_skills", "nice_to_have_skills", "responsibilities", "qualifications",
+)
+PROFILE_DROP = ("preferences",)
+MIN_BULLETS_PER_ROLE = 2
+MIN_PROJECTS = 1
+RELEVANT_BULLETS = 8
+
+def budget_for(task: str) -> int:
+    budgets = {**DEFAULT_BUDGETS, **(load_settings().get("payload_budget") or {})}
+    return int(budgets.get(task) or 0)
+
+def _flat(s: str) -> str:
+    return re.sub(r"\s+", " ", (s or "").lower().replace(".", " ")).strip()
+
+def _key(s: Any) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", str(s).lower()).strip()
+
+def _dedupe(items: List[Any] | None) -> List[Any]:
+    seen, out = set(), []
+    for x in items or []:
+        k = _key(x)
+        if k and k not in seen:
+            seen.add(k)
+            out.append(x)
+    return out
+
+class Relevance:
+    """Scores text by the job skills it mentions: 2 per required skill, 1 per nice-to-have."""
+
+    def __init__(self, job: Dict[str, Any]):
+        self.patterns: List[Tuple[float, re.Pattern]] = []
+        for weight, field in ((2.0, "required_skills"), (1.0, "nice_to_have_skills")):
+            for term in normalize_set(job.get(field)):
+                alts = sorted({_flat(v) for v in (term, *ALIASES.get(term, ()))} - {""}, key=len, reverse=True)
+                if alts:
+                    pattern = "|".join(re.escape(a) for a in alts)
+                    self.patterns.append((weight, re.compile(rf"(?<![a-z0-9])(?:{pattern})(?![a-z0-9])")))
+
+    def __call__(self, item: Any) -> float:
+        text = _flat(item if isinstance(item, str) else json.dumps(item, ensure_ascii=False))
+        return sum(w for w, p in self.patterns if p.search(text))
+
+# ---------- compaction ----------
+def compact_job(job: Dict[str, Any], task: str) -> Dict[str, Any]:
+    out = {k: job[k] for k in JOB_FIELDS if job.get(k)}
+
+    a = job.get("analysis") or {}
+    recs = (a.get("doc_recommendations") or {}).get(task)
+    analysis = {
+        "summary": a.get("summary"),
+        "strengths": a.get("strengths"),
+        "gaps": a.get("gaps"),
+        "doc_recommendations": {task: recs} if recs else None,
+    }
+    analysis = {k: v for k, v in analysis.items() if v}
+    if analysis:
+        out["analysis"] = analysis
+
+    fit = (job.get("match") or {}).get("fit") or {}
+    skills = fit.get("skills") or {}
+    matched = (skills.get("required") or {}).get("matched", []) + (skills.get("nice_to_have") or {}).get("matched", [])
+    missing = (skills.get("required") or {}).get("missing", [])
+    if matched or missing:
+        out["match"] = {"matched_skills": _dedupe(matched), "missing_required_skills": _dedupe(missing)}
+    return out
+
+def compact_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Deduped profile without job-independent noise. Same input, same output: safe to cache."""
+    p = {k: copy.deepcopy(v) for k, v in (profile or {}).items() if k not in PROFILE_DROP}
+    for k in ("skills", "qualifications", "projects", "traits"):
+        if isinstance(p.get(k), list):
+            p[k] = _dedupe(p[k])
+
+    seen = set()
+    for role in p.get("work_experience") or []:
+        for f in ("responsibilities", "achievements"):
+            if f not in role:
+                continue
+            kept = []
+            for b in role.get(f) or []:
+                k = _key(b)
+                if k and k not in seen:
+                    seen.add(k)
+                    kept.append(b)
+            role[f] = kept
+    return p
+
+def rank_profile(p: Dict[str, Any], rel: Relevance) -> None:
+    """Order skills, qualifications, projects and each role's bullets by relevance, in place."""
+    by_rel = lambda items: sorted(items, key=lambda x: -rel(x))  # stable: ties keep profile order
+    for k in ("skills", "qualifications", "projects"):
+        if isinstance(p.get(k), list):
+            p[k] = by_rel(p[k])
+    for role in p.get("work_experience") or []:
+        for f in ("responsibilities", "achievements"):
+            if isinstance(role.get(f), list):
+                role[f] = by_rel(role[f])
+
+def relevant_experience(p: Dict[str, Any], rel: Relevance, limit: int = RELEVANT_BULLETS) -> List[str]:
+    """The profile's experience bullets that mention the most job skills, best first."""
+    scored = []
+    for role in p.get("work_experience") or []:
+        for f in ("achievements", "responsibilities"):
+            for b in role.get(f) or []:
+                s = rel(b)
+                if s > 0:
+                    scored.append((s, b))
+    scored.sort(key=lambda x: -x[0])
+    return [b for _, b in scored[:limit]]
+
+# ---------- budget ----------
+def _role_size(role: Dict[str, Any]) -> int:
+    return len(role.get("responsibilities") or []) + len(role.get("achievements") or [])
+
+def _candidates(payload: Dict[str, Any], rel: Relevance) -> Iterator[Tuple[List[Any], Any, Callable[[], bool]]]:
+    """(list, item, still_allowed) removals, least useful first."""
+    prof, job = payload["candidate"], payload["job"]
+    roles = prof.get("work_experience") or []
+    projects = prof.get("projects") or []
+
+    def bullets(zero_only: bool):
+        pool = []
+        for i, role in enumerate(roles):
+            for f in ("responsibilities", "achievements"):
+                for j, b in enumerate(role.get(f) or []):
+                    s = rel(b)
+                    if not zero_only or s == 0:
+                        pool.append((s, -i, -j, role, f, b))  # older roles and later bullets go first
+        pool.sort(key=lambda x: x[:3])
+        for _, _, _, role, f, b in pool:
+            yield role[f], b, (lambda role=role: _role_size(role) > MIN_BULLETS_PER_ROLE)
+
+    always = lambda: True
+    yield from ((projects, x, lambda: len(projects) > MIN_PROJECTS) for x in reversed(projects[:]) if rel(x) == 0)
+    yield from bullets(zero_only=True)
+    yield from ((prof["qualifications"], x, always) for x in reversed(prof.get("qualifications") or []) if rel(x) == 0)
+    yield from ((prof["traits"], x, always) for x in reversed(prof.get("traits") or []))
+    yield from ((projects, x, lambda: len(projects) > MIN_PROJECTS) for x in reversed(projects[:]))
+    yield from bullets(zero_only=False)
+    for k in ("qualifications", "responsibilities"):
+        yield from ((job[k], x, lambda k=k: len(job[k]) > 5) for x in reversed(job.get(k) or []))
+
+def fit_to_budget(payload: Dict[str, Any], budget: int, rel: Relevance) -> int:
+    """Drop the least relevant items in place until the payload fits. Returns its token count."""
+    tokens = count_json_tokens(payload)
+    if not budget or tokens <= budget:
+        return tokens
+    for lst, item, allowed in _candidates(payload, rel):
+        if item in lst and allowed():
+            lst.remove(item)
+            tokens = count_json_tokens(payload)
+            if tokens <= budget:
+                break
+    return tokens
+
+def build_generator_payload(
+    job: Dict[str, Any],
+    profile: Dict[str, Any],
+    task: str,
+    constraints: Dict[str, Any] | None = None,
+) -> Dict[str, Any]:
+    """
+    {"candidate", "job", "relevant_experience", "constraints"} for `task` ("cover_letter" | "resume"),
+    within its token budget.
+    """
+    job, profile = job or {}, profile or {}
+    rel = Relevance(job)
+    candidate = compact_profile(profile)
+    payload = {
+        "candidate": candidate,
+        "job": compact_job(job, task),
+        "relevant_experience": relevant_experience(candidate, rel),
+        "constraints": constraints or {},
+    }
+    budget = budget_for(task)
+    before = count_json_tokens({"job": job, "candidate": profile, "constraints": constraints or {}})
+    after = count_json_tokens(payload)
+    if budget and after > budget:
+        rank_profile(candidate, rel)
+        after = fit_to_budget(payload, budget, rel)
+        print(f"[Payload] (task)={task} profile trimmed for this job; it will not hit the prompt cache")
+    print(f"[Payload] (task)={task} (tokens)={before} -> {after} (budget)={budget}")
+    return payload
+
+def generator_messages(system_prompt: str, payload: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Profile first (cacheable prefix), then everything about this job."""
+    variable = {k: v for k, v in payload.items() if k != "candidate"}
+    return cacheable_messages(system_prompt, {"candidate": payload["candidate"]}, variable)
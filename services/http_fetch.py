@@ -0,0 +1,190 @@
+# services/http_fetch.py
+"""
+Shared HTTP layer for job pages.
+
+    - one pooled requests.Session (keep-alive, retries with exponential backoff,
+      honours Retry-After on 429/503)
+    - an on-disk cache (data/http_cache.db) of the page HTML, its extracted text and
+      the ETag / Last-Modified validators
+    - conditional re-fetch: a cached page is revalidated with If-None-Match /
+      If-Modified-Since, so an unchanged posting costs a 304 and no re-parse
+
+Cached text is tagged with the extractor's version, so changing the extractor
+re-parses the stored HTML without downloading it again.
+"""
+import os, time, zlib, sqlite3, threading
+from typing import Any, Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.config.settings import load_settings
+
+CACHE_PATH = os.path.join("data", "http_cache.db")
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/114.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+}
+TIMEOUT_S = (5, 15)  # connect, read
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url           TEXT PRIMARY KEY,
+    final_url     TEXT,
+    etag          TEXT,
+    last_modified TEXT,
+    html          BLOB,
+    text          TEXT,
+    text_version  TEXT,
+    size          INTEGER,
+    fetched_at    REAL,
+    validated_at  REAL
+);
+CREATE INDEX IF NOT EXISTS idx_pages_validated ON pages(validated_at);
+"""
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_ready = False
+
+def session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=3, connect=3, read=2, status=3,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("GET", "HEAD"),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry)
+            s = requests.Session()
+            s.headers.update(HEADERS)
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            _session = s
+        return _session
+
+def _cache_config() -> Dict[str, Any]:
+    c = load_settings().get("http_cache") or {}
+    return {
+        "enabled": bool(c.get("enabled", True)),
+        "fresh_s": float(c.get("fresh_for_minutes", 60)) * 60.0,
+        "max_bytes": int(float(c.get("max_mb", 200)) * 1024 * 1024),
+    }
+
+def _connect() -> sqlite3.Connection:
+    global _ready
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    conn = sqlite3.connect(CACHE_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    if not _ready:
+        conn.executescript(_SCHEMA)
+        _ready = True
+    return conn
+
+def _text_for(row: sqlite3.Row, html: str, to_text, text_version: str) -> str:
+    if row is not None and row["text"] is not None and row["text_version"] == text_version:
+        return row["text"]
+    return to_text(html) if to_text else html
+
+def _store(conn, url, final_url, etag, last_modified, html, text, text_version, now, max_bytes) -> None:
+    blob = zlib.compress(html.encode("utf-8"))
+    conn.execute(
+        "INSERT OR REPLACE INTO pages (url, final_url, etag, last_modified, html, text, text_version, size, fetched_at, validated_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (url, final_url, etag, last_modified, blob, text, text_version,
+         len(blob) + len((text or "").encode("utf-8")), now, now),
+    )
+    _evict(conn, max_bytes)
+
+def _evict(conn: sqlite3.Connection, max_bytes: int) -> None:
+    """Drop least-recently-validated pages until under the size cap."""
+    if not max_bytes:
+        return
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+    if total <= max_bytes:
+        return
+    target = int(max_bytes * 0.9)
+    for url, size in conn.execute("SELECT url, size FROM pages ORDER BY validated_at ASC").fetchall():
+        if total <= target:
+            break
+        conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+        total -= size
+
+def fetch(
+    url: str,
+    to_text: Optional[Callable[[str], str]] = None,
+    text_version: str = "1",
+    force: bool = False,
+) -> Optional[Dict[str, Any]]:
+    """
+    GET a page through the cache. Returns None if it could not be fetched and nothing is cached.
+
+        {"url", "final_url", "html", "text", "source": "fresh" | "not_modified" | "downloaded" | "stale"}
+
+    "fresh": cached and validated within fresh_for_minutes, no request at all.
+    "not_modified": revalidated with a 304. "stale": the request failed, cached copy returned.
+    `to_text` turns HTML into text; its result is cached under `text_version`.
+    """
+    cfg = _cache_config()
+    now = time.time()
+    row = None
+    if cfg["enabled"]:
+        with _connect() as conn:
+            row = conn.execute("SELECT * FROM pages WHERE url = ?", (url,)).fetchone()
+
+    def _from_row(source: str) -> Dict[str, Any]:
+        html = zlib.decompress(row["html"]).decode("utf-8")
+        text = _text_for(row, html, to_text, text_version)
+        revalidated = source == "not_modified"
+        if revalidated or text != row["text"] or row["text_version"] != text_version:
+            with _connect() as conn:
+                conn.execute(
+                    "UPDATE pages SET text = ?, text_version = ?, validated_at = ? WHERE url = ?",
+                    (text, text_version, now if revalidated else row["validated_at"], url),
+                )
+        return {"url": url, "final_url": row["final_url"], "html": html, "text": text, "source": source}
+
+    if row is not None and not force and now - (row["validated_at"] or 0) < cfg["fresh_s"]:
+        return _from_row("fresh")
+
+    headers = {}
+    if row is not None:
+        if row["etag"]:
+            headers["If-None-Match"] = row["etag"]
+        if row["last_modified"]:
+            headers["If-Modified-Since"] = row["last_modified"]
+
+    t0 = time.time()
+    try:
+        resp = session().get(url, headers=headers, timeout=TIMEOUT_S)
+        if resp.status_code == 304 and row is not None:
+            print(f"[HTTP] 304 {url} ({time.time() - t0:.2f}s)")
+            return _from_row("not_modified")
+        resp.raise_for_status()
+    except Exception as e:
+        print(f"[HTTP] request error: {e}")
+        return _from_row("stale") if row is not None else None
+
+    html = resp.text
+    text = to_text(html) if to_text else html
+    print(f"[HTTP] {resp.status_code} {url} {len(resp.content) // 1024} KB ({time.time() - t0:.2f}s)")
+    if cfg["enabled"]:
+        with _connect() as conn:
+            _store(conn, url, resp.url, resp.headers.get("ETag"), resp.headers.get("Last-Modified"),
+                   html, text, text_version, now, cfg["max_bytes"])
+    return {"url": url, "final_url": resp.url, "html": html, "text": text, "source": "downloaded"}
+
+def clear() -> None:
+    with _connect() as conn:
+        conn.execute("DELETE FROM pages")
@@ -2,7 +2,11 @@
 import os
 import json
 from utils.ai.openai_client import call_gpt
+from utils.ai.model_router import report_outcome
 from utils.prompt_loader import load_prompt
+from utils.tracing import span
+from services.job_extraction_agent.job_schema import JOB_FORMAT, LIST_FIELDS, field_guide, json_schema_format
+from services.job_extraction_agent.followup import merge_fields, text_windows
 
 def clean_job_text(raw_text: str) -> str:
     prompt = load_prompt("job_extraction_agent", "cleaner_prompt.txt")
@@ -13,7 +17,11 @@ def clean_job_text(raw_text: str) -> str:
         messages=[{"role": "user", "content": prompt}]
     )
     print(f"[CleanText] tokens={meta['total_tokens']} cost=${meta['cost_usd']}")
-    return text.strip()
+    text = text.strip()
+    # a cleaner that drops most of the posting failed, whatever it returned
+    ok = len(text) >= 0.2 * len(raw_text)
+    report_outcome("clean_job_text", ok, "" if ok else "too_short")
+    return text
 
 def extract_job_info(clean_text: str, job_url: str = None) -> dict:
     tmpl = load_prompt("job_extraction_agent", "job_extractor_prompt.txt")
@@ -24,14 +32,48 @@ def extract_job_info(clean_text: str, job_url: str = None) -> dict:
         text, meta = call_gpt(
             task="extract",
             messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"}
+            response_format=JOB_FORMAT
         )
         print(f"[Extraction AI] (tokens)={meta['total_tokens']} (cost)=${meta['cost_usd']} (model)={meta['model']}")
-        return json.loads(text) if text else {}
+        with span("json_parse", kind="parse", chars=len(text or "")):
+            return json.loads(text) if text else {}
     except Exception as e:
         print("[ExtractJob] error:", e)
+        report_outcome("extract", False, "json_parse")
         return {}
 
+def extract_missing_fields(clean_text: str, known: dict, missing: list) -> dict:
+    """
+    Like extract_job_info, but only for `missing` fields; `known` came from the page's
+    structured data (see structured_data.py) and always wins over the model's answer.
+    """
+    if not missing:
+        return dict(known)
+    tmpl = load_prompt("job_extraction_agent", "partial_extractor_prompt.txt")
+    prompt = (
+        tmpl.replace("{known_json}", json.dumps(known, ensure_ascii=False, indent=2))
+        .replace("{missing_fields}", ", ".join(missing))
+        .replace("{clean_text}", clean_text)
+    )
+
+    try:
+        print(f"🤖 [Extraction AI] Extracting {len(missing)} missing fields..")
+        text, meta = call_gpt(
+            task="extract",
+            messages=[{"role": "user", "content": prompt}],
+            response_format=json_schema_format(missing, "job_fields")
+        )
+        print(f"[Extraction AI] (tokens)={meta['total_tokens']} (cost)=${meta['cost_usd']} (model)={meta['model']}")
+        with span("json_parse", kind="parse", chars=len(text or "")):
+            found = json.loads(text) if text else {}
+    except Exception as e:
+        print("[ExtractJob] error:", e)
+        report_outcome("extract", False, "json_parse")
+        found = {}
+    if not isinstance(found, dict):
+        found = {}
+    return {**{k: v for k, v in found.items() if k in missing}, **known}
+
 def _dedupe_preserve_order(items):
     if not isinstance(items, list):
         return items
@@ -42,45 +84,41 @@ def _dedupe_preserve_order(items):
             out.append(x)
     return out
 
-def review_and_patch_job_data(clean_text: str, job_data: dict) -> dict:
+def fill_thin_fields(clean_text: str, job_data: dict, fields: list) -> dict:
     """
-    Re-scan cleaned text and only ADD missing items to job_data.
-    Never removes existing items.
+    Follow-up for fields extraction left empty or thin (see followup.thin_fields).
+    Sends only those fields and the parts of the text likely to mention them; list
+    fields only gain items, nothing already extracted is removed or overwritten.
     """
+    job_data = job_data if isinstance(job_data, dict) else {}
     try:
-        template = load_prompt("job_extraction_agent", "reviewer_prompt.txt")
-        current_json = json.dumps(job_data, ensure_ascii=False)
-        prompt = template.replace("{clean_text}", clean_text).replace("{current_json}", current_json)
+        known = {f: job_data[f] for f in fields if f in LIST_FIELDS and job_data.get(f)}
+        excerpts = text_windows(clean_text, fields)
+        prompt = (
+            load_prompt("job_extraction_agent", "field_followup_prompt.txt")
+            .replace("{fields}", ", ".join(fields))
+            .replace("{already_found}", json.dumps(known, ensure_ascii=False) if known else "(none)")
+            .replace("{field_guide}", field_guide(fields))
+            .replace("{excerpts}", excerpts)
+        )
 
         text, meta = call_gpt(
             task="review_extracted_job",
             messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"}
+            response_format=json_schema_format(fields, "job_followup")
         )
-        print(f"[Reviewer] tokens={meta['total_tokens']} cost=${meta['cost_usd']}")
-
-        patched = {}
-        if text.strip():
-            try:
-                patched = json.loads(text)
-            except json.JSONDecodeError:
-                s = text.strip().strip("```json").strip("```").strip()
-                from re import search, DOTALL
-                m = search(r"\{.*\}", s, DOTALL)
-                if m:
-                    patched = json.loads(m.group(0))
-
-        # safety dedupe
-        for key in ["required_skills", "nice_to_have_skills", "responsibilities", "qualifications"]:
-            if key in patched and isinstance(patched[key], list):
-                seen, out = set(), []
-                for x in patched[key]:
-                    if x not in seen:
-                        seen.add(x); out.append(x)
-                patched[key] = out
+        print(f"[FollowUp] fields={fields} excerpt_chars={len(excerpts)}/{len(clean_text or '')} "
+              f"tokens={meta['total_tokens']} cost=${meta['cost_usd']}")
 
-        return patched
+        with span("json_parse", kind="parse", chars=len(text or "")):
+            found = json.loads(text) if text and text.strip() else {}
+        if not isinstance(found, dict):
+            found = {}
+        report_outcome("review_extracted_job", bool(found), "" if found else "empty")
+        return merge_fields(job_data, found, fields)
     except Exception as e:
+        print("[FollowUp] error:", e)
+        report_outcome("review_extracted_job", False, "json_parse")
         job_data.setdefault("_review_notes", {})
         job_data["_review_notes"]["error"] = str(e)
         return job_data
@@ -0,0 +1,100 @@
+# services/job_extraction_agent/followup.py
+"""
+What to ask again after extraction, and which parts of the posting to send with it.
+
+Rather than resending the whole cleaned text plus the current JSON, the follow-up call
+(extract_job_data.fill_thin_fields) gets only the thin fields and the lines most likely
+to mention them: the top of the posting for title / company, the section under a
+"Requirements" / "Tech stack" style heading for skills, lines that mention remote /
+hybrid / a location for location, and so on.
+"""
+import re
+from typing import Any, Dict, List
+
+MIN_REQUIRED_SKILLS = 6
+CORE_FIELDS = ("job_title", "company", "location")
+
+HEAD_LINES = 12          # title / company / summary live at the top
+SECTION_LINES = 14       # lines kept under a matching heading
+MAX_HEADING_CHARS = 60   # a cue in a line this short is taken as a section heading
+WINDOW_BUDGET_CHARS = 6000
+
+_HEAD_FIELDS = ("job_title", "company", "summary")
+
+# lowercase substrings that point at the text for each field
+FIELD_CUES: Dict[str, tuple] = {
+    "company": ("about us", "about the company", "who we are", "our company", "join "),
+    "location": ("location", "remote", "hybrid", "on-site", "onsite", "in-office", "based in", "office"),
+    "work_location": ("remote", "hybrid", "on-site", "onsite", "in-office", "work from"),
+    "salary": ("salary", "compensation", "pay range", "per hour", "per year", "$", "cad", "usd"),
+    "job_type": ("full-time", "full time", "part-time", "part time", "contract", "permanent", "temporary", "internship"),
+    "required_skills": (
+        "requirement", "qualification", "skills", "must have", "must-have", "experience with", "experience in",
+        "proficien", "tech stack", "technolog", "what you bring", "what you'll need", "you have", "knowledge of",
+    ),
+    "nice_to_have_skills": ("nice to have", "nice-to-have", "bonus", "a plus", "preferred", "asset"),
+    "qualifications": ("qualification", "requirement", "degree", "years of experience", "certif"),
+    "responsibilities": ("responsibilit", "you will", "what you'll do", "what you will do", "duties", "day to day"),
+    "notes": ("benefit", "perks", "we offer", "visa", "travel", "equal opportunity"),
+}
+
+def thin_fields(job_data: Any) -> List[str]:
+    """Fields worth a follow-up: missing core fields, or too few required skills."""
+    if not isinstance(job_data, dict):
+        return list(CORE_FIELDS) + ["required_skills"]
+    out = [f for f in CORE_FIELDS if not job_data.get(f)]
+    if len(job_data.get("required_skills") or []) < MIN_REQUIRED_SKILLS:
+        out.append("required_skills")
+    return out
+
+def text_windows(text: str, fields: List[str], budget_chars: int = WINDOW_BUDGET_CHARS) -> str:
+    """
+    The lines of `text` relevant to `fields`, in posting order, gaps marked with "...".
+    Falls back to the start of the text when no cue matches.
+    """
+    lines = [l.strip() for l in (text or "").splitlines() if l.strip()]
+    if sum(len(l) + 1 for l in lines) <= budget_chars:
+        return "\n".join(lines)
+
+    keep = set()
+    if any(f in _HEAD_FIELDS for f in fields):
+        keep.update(range(min(HEAD_LINES, len(lines))))
+    cues = tuple(c for f in fields for c in FIELD_CUES.get(f, ()))
+    for i, line in enumerate(lines):
+        low = line.lower()
+        if not any(c in low for c in cues):
+            continue
+        if len(line) <= MAX_HEADING_CHARS and not re.search(r"[.!?]$", line):
+            keep.update(range(i, min(len(lines), i + SECTION_LINES + 1)))
+        else:
+            keep.update(range(max(0, i - 1), min(len(lines), i + 2)))
+    if not keep:
+        return "\n".join(lines)[:budget_chars]
+
+    out, size, prev = [], 0, None
+    for i in sorted(keep):
+        piece = lines[i] if prev is None or i == prev + 1 else "...\n" + lines[i]
+        if size + len(piece) + 1 > budget_chars:
+            break
+        out.append(piece)
+        size += len(piece) + 1
+        prev = i
+    return "\n".join(out)
+
+def merge_fields(job_data: Dict[str, Any], found: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """Fill empty scalars and append new list items from `found`; never drops what is there."""
+    out = dict(job_data)
+    for f in fields:
+        v = found.get(f)
+        if isinstance(out.get(f), list) or isinstance(v, list):
+            have = list(out.get(f) or [])
+            seen = {str(x).strip().lower() for x in have}
+            for item in v or []:
+                key = str(item).strip().lower()
+                if key and key not in seen:
+                    seen.add(key)
+                    have.append(item)
+            out[f] = have
+        elif v and not out.get(f):
+            out[f] = v
+    return out
@@ -0,0 +1,275 @@
+# services/job_extraction_agent/html_extract.py
+"""
+Single-pass HTML -> job text.
+
+Parses the page once (lxml when installed, BeautifulSoup "html.parser" otherwise) and
+picks the best content source, in order:
+
+    1) a schema.org JobPosting in <script type="application/ld+json"> or in microdata
+    2) a per-site content selector from SITE_RULES (Greenhouse, Lever, Workday, ...)
+    3) the whole page minus nav/header/footer/script chrome ("generic")
+
+Results from 1) and 2) are `trusted`: they contain only the posting, so the chain can
+skip the LLM cleaner. Add a board with register_site().
+"""
+import re, json, html as html_lib
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+try:
+    import lxml.html as lxml_html
+except ImportError:  # optional; BeautifulSoup is the fallback
+    lxml_html = None
+
+from bs4 import BeautifulSoup
+
+# Selectors are deliberately simple so both backends understand them:
+# "#id", ".class", "tag" or "[attr=value]".
+SITE_RULES: List[Dict[str, Any]] = [
+    {"name": "greenhouse", "hosts": ("greenhouse.io",),
+     "selectors": (".job__description", "#content", "#app_body")},
+    {"name": "lever", "hosts": ("lever.co",),
+     "selectors": (".posting-page", ".content")},
+    {"name": "workday", "hosts": ("myworkdayjobs.com", "myworkdaysite.com"),
+     "selectors": ("[data-automation-id=jobPostingDescription]",)},
+]
+
+MIN_TRUSTED_CHARS = 200
+CHROME_TAGS = ("script", "style", "noscript", "template", "svg", "nav", "header", "footer", "form", "aside", "iframe")
+BLOCK_TAGS = (
+    "p", "div", "br", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6", "tr", "td", "th",
+    "section", "article", "main", "table", "dd", "dt", "blockquote", "pre", "hr",
+)
+
+def register_site(name: str, hosts: Iterable[str], selectors: Iterable[str]) -> None:
+    """Add (or replace) a per-site rule. `hosts` match the URL host or any of its parent domains."""
+    SITE_RULES[:] = [r for r in SITE_RULES if r["name"] != name]
+    SITE_RULES.append({"name": name, "hosts": tuple(hosts), "selectors": tuple(selectors)})
+
+def site_rule(url: Optional[str]) -> Optional[Dict[str, Any]]:
+    host = (urlparse(url or "").hostname or "").lower()
+    if not host:
+        return None
+    for rule in SITE_RULES:
+        if any(host == h or host.endswith("." + h) for h in rule["hosts"]):
+            return rule
+    return None
+
+def looks_like_html(text: str) -> bool:
+    head = (text or "")[:5000].lower()
+    return "<html" in head or "<body" in head or "<div" in head or "<p" in head
+
+def collapse_lines(text: str) -> str:
+    lines = [re.sub(r"[ \t ]+", " ", ln).strip() for ln in (text or "").splitlines()]
+    return "\n".join(ln for ln in lines if ln)
+
+# ---------- JSON-LD ----------
+def _iter_ld(node: Any) -> Iterable[Dict[str, Any]]:
+    if isinstance(node, list):
+        for x in node:
+            yield from _iter_ld(x)
+    elif isinstance(node, dict):
+        yield node
+        if "@graph" in node:
+            yield from _iter_ld(node["@graph"])
+
+def _is_job_posting(node: Dict[str, Any]) -> bool:
+    t = node.get("@type")
+    types = t if isinstance(t, list) else [t]
+    return "JobPosting" in types
+
+def find_job_posting(ld_blocks: Iterable[str]) -> Optional[Dict[str, Any]]:
+    """First schema.org JobPosting object found in the raw ld+json script bodies."""
+    for raw in ld_blocks:
+        try:
+            data = json.loads((raw or "").strip(), strict=False)
+        except ValueError:
+            continue
+        for node in _iter_ld(data):
+            if _is_job_posting(node):
+                return node
+    return None
+
+def fragment_to_text(fragment: str) -> str:
+    """HTML (possibly entity-escaped, as in JSON-LD descriptions) -> plain text."""
+    fragment = fragment or ""
+    if "&lt;" in fragment and "<" not in fragment:
+        fragment = html_lib.unescape(fragment)
+    if "<" not in fragment:
+        return collapse_lines(html_lib.unescape(fragment))
+    return _Doc(f"<div>{fragment}</div>").body_text()
+
+def ld_name(v: Any) -> str:
+    if isinstance(v, dict):
+        return str(v.get("name") or "")
+    return str(v or "")
+
+def ld_location(posting: Dict[str, Any]) -> str:
+    locs = posting.get("jobLocation")
+    out = []
+    for loc in locs if isinstance(locs, list) else [locs]:
+        addr = (loc or {}).get("address") if isinstance(loc, dict) else None
+        if isinstance(addr, dict):
+            parts = [addr.get("addressLocality"), addr.get("addressRegion"), ld_name(addr.get("addressCountry"))]
+            s = ", ".join(str(p) for p in parts if p)
+            if s and s not in out:
+                out.append(s)
+        elif isinstance(addr, str) and addr not in out:
+            out.append(addr)
+    if str(posting.get("jobLocationType") or "").upper() == "TELECOMMUTE":
+        out.append("Remote")
+    return "; ".join(out)
+
+def posting_text(posting: Dict[str, Any]) -> str:
+    """Title / company / location header followed by the description, as the extractor expects."""
+    header = [
+        ld_name(posting.get("title")),
+        ld_name(posting.get("hiringOrganization")),
+        ld_location(posting),
+    ]
+    body = fragment_to_text(str(posting.get("description") or ""))
+    return collapse_lines("\n".join([h for h in header if h] + [body]))
+
+# ---------- parsing backends ----------
+def _selector_xpath(sel: str) -> str:
+    if sel.startswith("#"):
+        return f"//*[@id='{sel[1:]}']"
+    if sel.startswith("."):
+        return f"//*[contains(concat(' ', normalize-space(@class), ' '), ' {sel[1:]} ')]"
+    m = re.fullmatch(r"\[([\w-]+)=([^\]]+)\]", sel)
+    if m:
+        return f"//*[@{m.group(1)}='{m.group(2).strip(chr(34) + chr(39))}']"
+    return f"//{sel}"
+
+class _Doc:
+    """One parsed page. lxml when available, BeautifulSoup otherwise; same interface."""
+
+    def __init__(self, html: str):
+        self.root = None
+        self.soup = None
+        if lxml_html is not None:
+            try:
+                self.root = lxml_html.document_fromstring(html.encode("utf-8"))
+            except Exception:
+                self.root = None
+        if self.root is None:
+            self.soup = BeautifulSoup(html, "html.parser")
+        self._stripped = False
+
+    def ld_json(self) -> List[str]:
+        if self.root is not None:
+            return [s.text or "" for s in self.root.iter("script")
+                    if (s.get("type") or "").lower() == "application/ld+json"]
+        return [s.string or s.get_text() for s in self.soup.find_all("script", type="application/ld+json")]
+
+    def title(self) -> str:
+        if self.root is not None:
+            el = self.root.find(".//title")
+            return (el.text_content() if el is not None else "").strip()
+        return self.soup.title.get_text(strip=True) if self.soup.title else ""
+
+    def microdata_posting(self) -> Optional[Dict[str, Any]]:
+        """The first itemtype=schema.org/JobPosting item, shaped like its JSON-LD equivalent."""
+        if self.root is not None:
+            hits = self.root.xpath("//*[contains(@itemtype, 'schema.org/JobPosting')]")
+            top = hits[0] if hits else None
+        else:
+            top = self.soup.find(attrs={"itemtype": re.compile(r"schema\.org/JobPosting")})
+        if top is None:
+            return None
+        item = self._md_item(top)
+        item["@type"] = "JobPosting"
+        return item
+
+    def _children(self, el) -> List[Any]:
+        if self.root is not None:
+            return [c for c in el if isinstance(c.tag, str)]
+        return el.find_all(recursive=False)
+
+    def _md_value(self, el) -> str:
+        tag = (el.tag if self.root is not None else el.name).lower()
+        if el.get("itemprop") == "description":
+            return lxml_html.tostring(el, encoding="unicode", with_tail=False) if self.root is not None else str(el)
+        if tag == "meta":
+            return el.get("content") or ""
+        if tag in ("a", "link"):
+            return el.get("href") or ""
+        if tag == "time" and el.get("datetime"):
+            return el.get("datetime")
+        text = el.text_content() if self.root is not None else el.get_text(" ")
+        return re.sub(r"\s+", " ", text).strip()
+
+    def _md_item(self, el) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        stack = self._children(el)
+        while stack:
+            child = stack.pop(0)
+            props = (child.get("itemprop") or "").split()
+            scoped = child.get("itemscope") is not None
+            if props:
+                value = self._md_item(child) if scoped else self._md_value(child)
+                for prop in props:
+                    if prop in out:
+                        out[prop] = (out[prop] if isinstance(out[prop], list) else [out[prop]]) + [value]
+                    else:
+                        out[prop] = value
+            if not scoped:
+                stack[0:0] = self._children(child)
+        return out
+
+    def _strip_chrome(self) -> None:
+        if self._stripped:
+            return
+        self._stripped = True
+        if self.root is not None:
+            for el in list(self.root.iter(*CHROME_TAGS)):
+                el.drop_tree()
+            # newline around block elements so text_content() keeps the layout
+            for el in self.root.iter(*BLOCK_TAGS):
+                el.text = "\n" + (el.text or "")
+                el.tail = "\n" + (el.tail or "")
+        else:
+            for tag in self.soup.find_all(CHROME_TAGS):
+                tag.decompose()
+
+    def select_text(self, selector: str) -> str:
+        self._strip_chrome()
+        if self.root is not None:
+            hits = self.root.xpath(_selector_xpath(selector))
+            return collapse_lines(hits[0].text_content()) if hits else ""
+        el = self.soup.select_one(selector)
+        return el.get_text("\n", strip=True) if el is not None else ""
+
+    def body_text(self) -> str:
+        self._strip_chrome()
+        if self.root is not None:
+            return collapse_lines(self.root.text_content())
+        return collapse_lines(self.soup.get_text("\n", strip=True))
+
+def extract(html: str, url: Optional[str] = None) -> Dict[str, Any]:
+    """
+    {"text", "source": "jsonld" | "microdata" | "site:<name>" | "generic", "trusted": bool, "job_posting": dict | None}
+
+    `job_posting` is the schema.org JobPosting (JSON-LD shape) when the page has one,
+    for structured_data.from_job_posting().
+    """
+    doc = _Doc(html or "")
+
+    posting, source = find_job_posting(doc.ld_json()), "jsonld"
+    if posting is None:
+        posting, source = doc.microdata_posting(), "microdata"
+    if posting:
+        text = posting_text(posting)
+        if len(text) >= MIN_TRUSTED_CHARS:
+            return {"text": text, "source": source, "trusted": True, "job_posting": posting}
+
+    rule = site_rule(url)
+    if rule:
+        title = doc.title()
+        for sel in rule["selectors"]:
+            content = doc.select_text(sel)
+            if len(content) >= MIN_TRUSTED_CHARS:
+                text = content if not title or title in content else f"{title}\n{content}"
+                return {"text": text, "source": f"site:{rule['name']}", "trusted": True, "job_posting": posting}
+
+    return {"text": doc.body_text(), "source": "generic", "trusted": False, "job_posting": posting}
@@ -0,0 +1,54 @@
+# services/job_extraction_agent/job_schema.py
+"""
+The job schema as a strict JSON schema for structured outputs, so extraction replies
+always parse and always carry every requested key (with "" / [] when the posting is
+silent), and the per-field guide the prompts share.
+"""
+from typing import Any, Dict, List
+
+from services.job_extraction_agent.structured_data import JOB_FIELDS
+
+LIST_FIELDS = ("required_skills", "nice_to_have_skills", "responsibilities", "qualifications", "notes")
+
+FIELD_GUIDE = {
+    "job_title": "Job Title [job_title]",
+    "company": "Company Name [company]",
+    "location": "Location [location]",
+    "work_location": "Remote/Hybrid/Onsite [work_location]",
+    "salary": "Salary Range [salary] (if any)",
+    "job_type": "Job Type [job_type] (Full-time, Part-time, Contract)",
+    "required_skills": (
+        "Required Skills [required_skills] (list each individual skill. For example, \"Frontend: Next.js 15, "
+        "TypeScript, Tailwind CSS\" becomes [\"Next.js 15\", \"TypeScript\", \"Tailwind CSS\"]. Include every "
+        "item of a \"Tech Stack\" section as well.)"
+    ),
+    "nice_to_have_skills": (
+        "Nice-to-Have Skills [nice_to_have_skills] (skills the listing calls \"Nice to have\", "
+        "\"strong plus\", an asset, or similar)"
+    ),
+    "summary": "Summary [summary] (a summary of the job, 2-3 lines)",
+    "responsibilities": "Responsibilities [responsibilities] (list)",
+    "qualifications": "Qualifications [qualifications] (list)",
+    "url": "Job URL [url]",
+    "notes": "Notes [notes] (list any other notes worth knowing about the job)",
+}
+
+def json_schema_format(fields: List[str], name: str = "job") -> Dict[str, Any]:
+    """response_format for call_gpt asking for exactly `fields` (strict structured outputs)."""
+    props = {
+        f: {"type": "array", "items": {"type": "string"}} if f in LIST_FIELDS else {"type": "string"}
+        for f in fields
+    }
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": name,
+            "strict": True,
+            "schema": {"type": "object", "properties": props, "required": list(fields), "additionalProperties": False},
+        },
+    }
+
+JOB_FORMAT = json_schema_format(JOB_FIELDS)
+
+def field_guide(fields: List[str]) -> str:
+    return "\n".join(f"- {FIELD_GUIDE[f]}" for f in fields if f in FIELD_GUIDE)
@@ -1,11 +1,18 @@
 # services/job_extraction_agent/run_chain.py
-import streamlit as st
 from services.job_extraction_agent.preclean import heuristic_preclean
 from services.job_extraction_agent.extract_job_data import (
     clean_job_text,
     extract_job_info,
-    review_and_patch_job_data,
+    extract_missing_fields,
+    fill_thin_fields,
 )
+from services.job_extraction_agent.followup import thin_fields
+from services.job_extraction_agent.structured_data import JOB_FIELDS, from_job_posting, missing_fields
+from services.duplicate_index import fingerprint
+from utils.ai.cost_logger import job_context
+from utils.ai.model_router import report_outcome, route_hints
+from utils.progress import ProgressFn, report
+from utils.tracing import span, event
 
 def _looks_clean_enough(text: str) -> bool:
     if not text:
@@ -13,48 +20,75 @@ def _looks_clean_enough(text: str) -> bool:
     # simple, cheap heuristics
     return (len(text) >= 400) and (text.count("\n") >= 8)
 
-def _needs_review(job_data: dict) -> bool:
-    if not isinstance(job_data, dict):
-        return True
-    required = job_data.get("required_skills") or []
-    title_ok = bool(job_data.get("job_title"))
-    company_ok = bool(job_data.get("company"))
-    location_ok = bool(job_data.get("location"))
-    thin_skills = len(required) < 6
-    missing_core = not (title_ok and company_ok and location_ok)
-    return thin_skills or missing_core
-
-def run_job_extraction_chain(raw_text: str, job_url: str = None) -> dict:
+def run_job_extraction_chain(
+    raw_text: str,
+    job_url: str = None,
+    progress: ProgressFn | None = None,
+    precleaned: str | None = None,
+    trusted_source: bool = False,
+    job_posting: dict | None = None,
+) -> dict:
     """
     Pipeline:
-        1) heuristic pre-clean (no LLM)
-        2) conditional LLM clean (gpt-5-mini) if heuristic looks weak
-        3) extraction (gpt-5)
-        4) conditional reviewer (gpt-5-mini) if extraction looks thin or forced
+        1) heuristic pre-clean (no LLM), skipped if the caller already has `precleaned`
+        2) conditional LLM clean (gpt-5-mini) if heuristic looks weak; skipped for
+           `trusted_source` text (JSON-LD / site selector, see html_extract.py)
+        3) extraction with a strict JSON schema; with a schema.org `job_posting` from the page,
+           its fields are mapped directly and the model is only asked for the rest (skills, ...)
+        4) conditional follow-up if a core field is missing or skills look thin: only those
+           fields, with only the parts of the text that mention them (see followup.py)
+    Stage messages go to `progress` (see utils/progress.py), if given.
+    The result carries `source_fingerprint` for duplicate detection (services/duplicate_index.py).
+    Each step is a span (utils/tracing.py); the branch decisions are recorded as events.
     """
-    with st.spinner("Analyzing with AI..."):
-        stage_status = st.empty()
-
+    with job_context(job_url), span("extract_chain", job=job_url or ""):
         # Step 0: deterministic pre-clean
-        stage_status.info("Pre-cleaning...")
-        pre = heuristic_preclean(raw_text)
+        report(progress, "info", "Pre-cleaning...")
+        with span("preclean", chars_in=len(raw_text or ""), reused=precleaned is not None) as sp:
+            pre = precleaned if precleaned is not None else heuristic_preclean(raw_text)
+            if sp:
+                sp["attrs"]["chars_out"] = len(pre or "")
 
         # Step 1: conditional LLM cleaner
-        if _looks_clean_enough(pre):
+        clean_enough = _looks_clean_enough(pre)
+        event("looks_clean_enough", value=clean_enough, trusted_source=trusted_source)
+        if trusted_source or clean_enough:
             cleaned = pre
         else:
-            stage_status.info("🧼 Cleaning job text...")
-            cleaned = clean_job_text(pre)
+            report(progress, "info", "🧼 Cleaning job text...")
+            with span("clean"):
+                cleaned = clean_job_text(pre)
 
         # Step 2: extraction
-        stage_status.info("📦 Extracting structured data...")
-        job_data = extract_job_info(cleaned, job_url)
+        known = from_job_posting(job_posting, job_url)
+        missing = missing_fields(known)
+        partial = bool(known) and len(missing) < len(JOB_FIELDS) - 1  # more than just the url
+        event("structured_data", known=len(known), missing=len(missing), partial=partial)
+        # structured pages / partial extraction are easy inputs: the router may pick a smaller model
+        with route_hints(structured=trusted_source, partial=partial):
+            if partial:
+                report(progress, "info", f"📦 Read {len(known)} fields from the page's structured data, extracting the rest...")
+                with span("extract", mode="partial"):
+                    job_data = extract_missing_fields(cleaned, known, missing)
+            else:
+                report(progress, "info", "📦 Extracting structured data...")
+                with span("extract", mode="full"):
+                    job_data = extract_job_info(cleaned, job_url)
+
+        # Step 3: conditional field-level follow-up
+        thin = thin_fields(job_data)
+        event("needs_follow_up", value=bool(thin), fields=thin)
+        # an extraction that needs a follow-up did not succeed the first time (no-op if already reported)
+        report_outcome("extract", not thin, "thin_fields" if thin else "")
+        if thin:
+            report(progress, "info", f"🔍 Filling in {', '.join(thin)}...")
+            with span("follow_up", fields=thin):
+                job_data = fill_thin_fields(cleaned, job_data, thin)
 
-        # Step 3: conditional reviewer
-        if _needs_review(job_data):
-            stage_status.info("🔍 Reviewing and patching missing items...")
-            job_data = review_and_patch_job_data(cleaned, job_data)
+        fp = fingerprint(pre)
+        if fp and isinstance(job_data, dict) and job_data:
+            job_data["source_fingerprint"] = fp
 
-        stage_status.success("✅ Job extracted successfully!")
+    report(progress, "success", "✅ Job extracted successfully!")
 
     return job_data
@@ -0,0 +1,98 @@
+# services/job_extraction_agent/structured_data.py
+"""
+Deterministic extraction from a schema.org JobPosting (JSON-LD or microdata, see
+html_extract.py). Fills the fields the page states outright; the LLM is only asked
+for what is left (skills, responsibilities, summary, ...).
+"""
+from typing import Any, Dict, List, Optional
+
+from services.job_extraction_agent.html_extract import ld_location, ld_name
+
+# The fields job_extractor_prompt.txt asks for, in the same order
+JOB_FIELDS = [
+    "job_title", "company", "location", "work_location", "salary", "job_type",
+    "required_skills", "nice_to_have_skills", "summary", "responsibilities",
+    "qualifications", "url", "notes",
+]
+
+_EMPLOYMENT_TYPES = {
+    "FULL_TIME": "Full-time",
+    "PART_TIME": "Part-time",
+    "CONTRACTOR": "Contract",
+    "CONTRACT": "Contract",
+    "TEMPORARY": "Temporary",
+    "INTERN": "Internship",
+    "INTERNSHIP": "Internship",
+    "PER_DIEM": "Per diem",
+    "VOLUNTEER": "Volunteer",
+}
+
+_SALARY_UNITS = {"HOUR": "hour", "DAY": "day", "WEEK": "week", "MONTH": "month", "YEAR": "year"}
+
+def _first(v: Any) -> Any:
+    return v[0] if isinstance(v, list) and v else v
+
+def _money(v: Any) -> str:
+    try:
+        f = float(str(v).replace(",", ""))
+    except (TypeError, ValueError):
+        return str(v or "").strip()
+    return f"{f:,.0f}" if f >= 100 else f"{f:,.2f}"
+
+def _salary(posting: Dict[str, Any]) -> Optional[str]:
+    amount = _first(posting.get("baseSalary") or posting.get("estimatedSalary"))
+    if not amount:
+        return None
+    if not isinstance(amount, dict):
+        return str(amount).strip() or None
+    currency = str(amount.get("currency") or "").strip()
+    value = _first(amount.get("value"))
+    unit = ""
+    if isinstance(value, dict):
+        unit = _SALARY_UNITS.get(str(value.get("unitText") or "").upper(), "")
+        lo, hi = value.get("minValue"), value.get("maxValue")
+        if lo is None and hi is None:
+            lo = value.get("value")
+        nums = [_money(x) for x in (lo, hi) if x not in (None, "")]
+        if len(nums) == 2 and nums[0] == nums[1]:
+            nums = nums[:1]
+        text = "–".join(nums)
+    else:
+        text = _money(value) if value not in (None, "") else ""
+    if not text:
+        return None
+    return " ".join(p for p in (currency, text, f"per {unit}" if unit else "") if p)
+
+def _job_type(posting: Dict[str, Any]) -> Optional[str]:
+    raw = posting.get("employmentType")
+    types = raw if isinstance(raw, list) else [raw]
+    out = []
+    for t in types:
+        key = str(t or "").strip().upper().replace("-", "_").replace(" ", "_")
+        label = _EMPLOYMENT_TYPES.get(key, str(t or "").strip())
+        if label and label not in out:
+            out.append(label)
+    return ", ".join(out) or None
+
+def _work_location(posting: Dict[str, Any]) -> Optional[str]:
+    if str(posting.get("jobLocationType") or "").upper() == "TELECOMMUTE":
+        return "Remote"
+    return None  # a street address alone does not say onsite vs hybrid
+
+def from_job_posting(posting: Optional[Dict[str, Any]], job_url: Optional[str] = None) -> Dict[str, Any]:
+    """Map a JobPosting to the project's job schema. Only fields the page actually states are set."""
+    if not isinstance(posting, dict):
+        return {}
+    job = {
+        "job_title": ld_name(posting.get("title")).strip() or None,
+        "company": ld_name(_first(posting.get("hiringOrganization"))).strip() or None,
+        "location": ld_location(posting) or None,
+        "work_location": _work_location(posting),
+        "salary": _salary(posting),
+        "job_type": _job_type(posting),
+        "url": job_url or ld_name(posting.get("url")) or None,
+    }
+    return {k: v for k, v in job.items() if v}
+
+def missing_fields(job: Dict[str, Any]) -> List[str]:
+    return [f for f in JOB_FIELDS if not job.get(f)]
@@ -1,23 +1,39 @@
-import requests
-from bs4 import BeautifulSoup
+import json
 
-HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/114.0.0.0 Safari/537.36"
-    ),
-    "Accept-Language": "en-US,en;q=0.9",
-}
+from services.http_fetch import fetch
+from services.job_extraction_agent.html_extract import extract
+from utils.tracing import span
 
-def fetch_job_text(url):
-    """Fetch visible text from the given job URL. If blocked, return None."""
+# Bump when the extractor changes so cached pages are re-parsed (not re-downloaded)
+TEXT_VERSION = "extract-1"
+
+def fetch_job_page(url, force: bool = False):
+    """
+    Fetch the job URL and extract its text in one parse. None if blocked and not cached.
+        {"text", "source": "jsonld" | "site:<name>" | "generic", "trusted": bool, "job_posting": dict | None}
+    """
+    def to_text(html):
+        # only runs on a download or an extractor version change, not on a cache hit / 304
+        with span("html_parse", kind="parse", bytes=len(html or "")) as sp:
+            res = extract(html, url)
+            if sp:
+                sp["attrs"]["source"] = res.get("source")
+        return json.dumps(res)
+
+    with span("fetch", url=url) as sp:
+        # the cache stores whatever to_text returns, so keep the whole extraction result
+        page = fetch(url, to_text=to_text, text_version=TEXT_VERSION, force=force)
+        if sp:
+            sp["attrs"]["cache"] = page["source"] if page else "failed"
+    if not page:
+        return None
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=10)
-        resp.raise_for_status()
-    except Exception as e:
-        print(f"[job_parser] request error: {e}")
+        out = json.loads(page["text"])
+    except (TypeError, ValueError):
         return None
+    return out if out.get("text") else None
 
-    soup = BeautifulSoup(resp.text, "html.parser")
-    return soup.get_text(separator="\n", strip=True)
+def fetch_job_text(url, force: bool = False):
+    """Fetch visible text from the given job URL. If blocked, return None."""
+    page = fetch_job_page(url, force=force)
+    return page["text"] if page else None
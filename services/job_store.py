@@ -0,0 +1,357 @@
+# services/job_store.py
+import os, re, json, sqlite3, threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.skill_matching_agent.local_matcher import job_features
+
+JOB_DIR = os.path.join("data", "jobs")
+INDEX_PATH = os.path.join("data", "jobs_index.db")
+
+# Fields kept in the index so the feed never has to open per-job JSON files
+_COLUMNS = [
+    "path", "job_title", "company", "location", "work_location", "summary",
+    "url", "date_added", "date_applied", "skill_score", "preference_score",
+    "overall_score", "profile_hash", "features", "mtime",
+]
+# Index-only columns that list_jobs() does not hand back to the feed
+_HIDDEN = ("path", "mtime", "skill_score", "preference_score", "overall_score", "profile_hash", "features")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    path             TEXT PRIMARY KEY,
+    job_title        TEXT,
+    company          TEXT,
+    location         TEXT,
+    work_location    TEXT,
+    summary          TEXT,
+    url              TEXT,
+    date_added       TEXT,
+    date_applied     TEXT,
+    skill_score      REAL,
+    preference_score REAL,
+    overall_score    REAL,
+    profile_hash     TEXT,
+    features         TEXT,
+    mtime            REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_date_added ON jobs(date_added);
+"""
+
+# Columns added after the first release: (name, type). Existing index files get
+# them via ALTER TABLE; rows stay NULL until the job is written again.
+_ADDED_COLUMNS = [
+    ("profile_hash", "TEXT"),
+    ("features", "TEXT"),
+]
+
+# Full-text index over every extracted field, kept in step with `jobs` by rowid.
+# prefix='2 3' stores 2- and 3-char prefixes so "kub*" style queries stay index lookups.
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE jobs_fts USING fts5(
+    job_title, company, location, skills, responsibilities, body,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+"""
+# bm25 column weights, same order as the FTS columns: a title hit beats a body hit
+_FTS_WEIGHTS = (10.0, 6.0, 3.0, 4.0, 1.5, 1.0)
+
+_init_lock = threading.Lock()
+_initialized = False
+_fts_ok = True  # False when this SQLite build lacks FTS5; search falls back to LIKE
+
+def _connect() -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(INDEX_PATH), exist_ok=True)
+    conn = sqlite3.connect(INDEX_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+def _migrate(conn: sqlite3.Connection) -> bool:
+    """Bring the schema up to date. Returns True if the FTS table had to be created."""
+    global _fts_ok
+    conn.executescript(_SCHEMA)
+    have = {r[1] for r in conn.execute("PRAGMA table_info(jobs)").fetchall()}
+    for name, typ in _ADDED_COLUMNS:
+        if name not in have:
+            conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {typ}")
+
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'jobs_fts'").fetchone():
+        return False
+    try:
+        conn.executescript(_FTS_SCHEMA)
+        return True
+    except sqlite3.OperationalError as e:
+        _fts_ok = False
+        print(f"[JobStore] FTS5 unavailable, search falls back to LIKE: {e}")
+        return False
+
+def _norm_path(path: str) -> str:
+    return os.path.normpath(path)
+
+def _summary_row(path: str, job: Dict[str, Any]) -> Dict[str, Any]:
+    match = job.get("match") or {}
+    scores = match.get("scores") or {}
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = 0.0
+    return {
+        "path": _norm_path(path),
+        "job_title": job.get("job_title"),
+        "company": job.get("company"),
+        "location": job.get("location"),
+        "work_location": job.get("work_location"),
+        "summary": (job.get("summary") or "")[:1000],
+        "url": job.get("url"),
+        "date_added": job.get("date_added") or "",
+        "date_applied": job.get("date_applied") or "",
+        "skill_score": scores.get("skill_score"),
+        "preference_score": scores.get("preference_score"),
+        "overall_score": scores.get("overall_score"),
+        "profile_hash": match.get("profile_hash"),
+        "features": json.dumps(job_features(job), ensure_ascii=False),
+        "mtime": mtime,
+    }
+
+def _text(v: Any) -> str:
+    if isinstance(v, (list, tuple)):
+        return "\n".join(str(x) for x in v if x)
+    return str(v or "")
+
+def _fts_doc(job: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        "job_title": _text(job.get("job_title")),
+        "company": _text(job.get("company")),
+        "location": f"{_text(job.get('location'))} {_text(job.get('work_location'))}",
+        "skills": "\n".join(_text(job.get(k)) for k in ("required_skills", "nice_to_have_skills", "qualifications")),
+        "responsibilities": _text(job.get("responsibilities")),
+        "body": "\n".join(_text(job.get(k)) for k in ("summary", "salary", "job_type", "job_text")),
+    }
+
+def _fts_delete(conn: sqlite3.Connection, path: str) -> None:
+    old = conn.execute("SELECT rowid FROM jobs WHERE path = ?", (path,)).fetchone()
+    if old is not None:
+        conn.execute("DELETE FROM jobs_fts WHERE rowid = ?", (old[0],))
+
+def _upsert(conn: sqlite3.Connection, row: Dict[str, Any], doc: Optional[Dict[str, str]] = None) -> None:
+    cols = ", ".join(_COLUMNS)
+    marks = ", ".join(f":{c}" for c in _COLUMNS)
+    if _fts_ok:
+        _fts_delete(conn, row["path"])
+    cur = conn.execute(f"INSERT OR REPLACE INTO jobs ({cols}) VALUES ({marks})", row)
+    if _fts_ok and doc is not None:
+        conn.execute(
+            "INSERT INTO jobs_fts (rowid, job_title, company, location, skills, responsibilities, body) "
+            "VALUES (:rowid, :job_title, :company, :location, :skills, :responsibilities, :body)",
+            {"rowid": cur.lastrowid, **doc},
+        )
+
+def _row_to_job(r: sqlite3.Row) -> Dict[str, Any]:
+    job = {k: r[k] for k in r.keys() if k not in _HIDDEN}
+    job["_source_path"] = r["path"]
+    job["scores"] = {
+        "skill_score": r["skill_score"],
+        "preference_score": r["preference_score"],
+        "overall_score": r["overall_score"],
+    }
+    return job
+
+def rebuild_index(folder: str = JOB_DIR) -> int:
+    """Full scan of the job folder. Only needed once (migration) or on demand."""
+    rows = []
+    if os.path.exists(folder):
+        for root, _, files in os.walk(folder):
+            for filename in files:
+                if not filename.endswith(".json"):
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        job = json.load(f)
+                    rows.append((_summary_row(path, job), _fts_doc(job)))
+                except Exception as e:
+                    print(f"[JobStore] skipped {path}: {e}")
+
+    with _connect() as conn:
+        _migrate(conn)
+        conn.execute("DELETE FROM jobs")
+        if _fts_ok:
+            conn.execute("DELETE FROM jobs_fts")
+        for row, doc in rows:
+            _upsert(conn, row, doc)
+    print(f"[JobStore] indexed {len(rows)} jobs")
+    return len(rows)
+
+def ensure_index() -> None:
+    """Create the index on first use, migrating any existing job files into it."""
+    global _initialized
+    if _initialized:
+        return
+    with _init_lock:
+        if _initialized:
+            return
+        fresh = not os.path.exists(INDEX_PATH)
+        with _connect() as conn:
+            # an older index without the FTS table needs one full pass to fill it
+            fresh = _migrate(conn) or fresh
+        if fresh:
+            rebuild_index()
+        _initialized = True
+
+def index_job(path: str, job: Dict[str, Any]) -> None:
+    """Insert or refresh the index row for a job file that was just written."""
+    ensure_index()
+    with _connect() as conn:
+        _upsert(conn, _summary_row(path, job), _fts_doc(job))
+    from services import semantic_index, duplicate_index  # imported here: they depend on this module
+    semantic_index.enqueue(path, job)
+    duplicate_index.add(path, job)
+
+def remove_job(path: str) -> None:
+    ensure_index()
+    with _connect() as conn:
+        if _fts_ok:
+            _fts_delete(conn, _norm_path(path))
+        conn.execute("DELETE FROM jobs WHERE path = ?", (_norm_path(path),))
+    from services import semantic_index, duplicate_index
+    semantic_index.remove(path)
+    duplicate_index.remove(path)
+
+def write_job(path: str, job: Dict[str, Any]) -> str:
+    """Write a job JSON file and keep the index in sync."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(job, f, indent=2, ensure_ascii=False)
+    index_job(path, job)
+    return path
+
+def read_job(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        job = json.load(f)
+    job["_source_path"] = path
+    return job
+
+def delete_job(path: str) -> None:
+    """Delete the job file (if present) and its index row."""
+    if os.path.exists(path):
+        os.remove(path)
+    remove_job(path)
+
+def _fts_query(search: str) -> str:
+    """'kafka back' -> '"kafka"* AND "back"*': every word must match, each as a prefix."""
+    words = re.findall(r"\w+", (search or "").lower())
+    return " AND ".join(f'"{w}"*' for w in words)
+
+def _where(applied_only: bool, search: str) -> tuple[str, list]:
+    clauses, params = [], []
+    if applied_only:
+        clauses.append("date_applied != ''")
+    q = (search or "").strip().lower()
+    if q and _fts_ok:
+        match = _fts_query(q)
+        if match:
+            clauses.append("jobs.rowid IN (SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH ?)")
+            params.append(match)
+    elif q:
+        like = f"%{q}%"
+        clauses.append("(lower(job_title) LIKE ? OR lower(company) LIKE ? OR lower(location) LIKE ?)")
+        params += [like, like, like]
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+def count_jobs(applied_only: bool = False, search: str = "") -> int:
+    ensure_index()
+    where, params = _where(applied_only, search)
+    with _connect() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM jobs{where}", params).fetchone()[0]
+
+def list_jobs(
+    applied_only: bool = False,
+    search: str = "",
+    newest_first: bool = True,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    by_relevance: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Return index rows (no per-job file reads), sorted by date_added.
+    With a search and by_relevance=True, rows come back in BM25 order instead.
+    """
+    ensure_index()
+    where, params = _where(applied_only, search)
+    order = "DESC" if newest_first else "ASC"
+    match = _fts_query(search) if _fts_ok else ""
+    if by_relevance and match:
+        weights = ", ".join(str(w) for w in _FTS_WEIGHTS)
+        sql = (
+            f"SELECT jobs.* FROM jobs JOIN (SELECT rowid AS rid, bm25(jobs_fts, {weights}) AS score "
+            f"FROM jobs_fts WHERE jobs_fts MATCH ?) f ON f.rid = jobs.rowid{where} "
+            f"ORDER BY f.score, date_added {order}"
+        )
+        params = [match] + params
+    else:
+        sql = f"SELECT * FROM jobs{where} ORDER BY date_added {order}, path {order}"
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params += [int(limit), int(offset)]
+    with _connect() as conn:
+        return [_row_to_job(r) for r in conn.execute(sql, params).fetchall()]
+
+def stale_job_paths(current_hash: str) -> List[str]:
+    """Jobs whose match was scored against a different (or unknown) profile version."""
+    ensure_index()
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT path FROM jobs WHERE profile_hash IS NULL OR profile_hash != ? ORDER BY date_added DESC",
+            (current_hash,),
+        ).fetchall()
+    return [r["path"] for r in rows]
+
+def index_version() -> Tuple[int, int, float]:
+    """Cheap fingerprint that changes whenever a row is written or deleted."""
+    ensure_index()
+    with _connect() as conn:
+        row = conn.execute("SELECT COUNT(*), COALESCE(MAX(rowid), 0), COALESCE(SUM(mtime), 0) FROM jobs").fetchone()
+    return (row[0], row[1], row[2])
+
+def load_features() -> List[Tuple[str, str, str, Dict[str, Any]]]:
+    """
+    (path, job_title, company, features) for every job, for the matrix scorer.
+    Rows indexed before the features column existed are backfilled from their files once.
+    """
+    ensure_index()
+    with _connect() as conn:
+        rows = conn.execute("SELECT path, job_title, company, features FROM jobs").fetchall()
+
+    out, backfill = [], []
+    for r in rows:
+        feats = r["features"]
+        if feats is None:
+            try:
+                job = read_job(r["path"])
+                job.pop("_source_path", None)
+            except Exception as e:
+                print(f"[JobStore] no features for {r['path']}: {e}")
+                continue
+            feats = json.dumps(job_features(job), ensure_ascii=False)
+            backfill.append((feats, r["path"]))
+        out.append((r["path"], r["job_title"], r["company"], json.loads(feats)))
+
+    if backfill:
+        with _connect() as conn:
+            conn.executemany("UPDATE jobs SET features = ? WHERE path = ?", backfill)
+        print(f"[JobStore] backfilled features for {len(backfill)} jobs")
+    return out
+
+def jobs_by_paths(paths: List[str]) -> List[Dict[str, Any]]:
+    """Index rows for the given paths, in the same order (missing paths are skipped)."""
+    ensure_index()
+    if not paths:
+        return []
+    norm = [_norm_path(p) for p in paths]
+    with _connect() as conn:
+        rows = conn.execute(
+            f"SELECT * FROM jobs WHERE path IN ({','.join('?' * len(norm))})", norm
+        ).fetchall()
+    by_path = {r["path"]: _row_to_job(r) for r in rows}
+    return [by_path[p] for p in norm if p in by_path]
@@ -0,0 +1,47 @@
+# services/pipeline.py
+from typing import Any, Dict, Tuple
+
+from utils.ai.orchestrator import fan_out
+from services.skill_matching_agent.score_job_fit import ascore_job_fit
+from services.skill_matching_agent.skill_match_utils import apply_resp_bonus
+from services.analysis_agent.run_analysis import arun_in_depth_analysis
+from services.cover_letter_agent.generate_cover_letter import agenerate_cover_letter
+from services.resume_agent.generate_resume import agenerate_resume
+
+def score_and_analyze(job: Dict[str, Any], profile: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Skill matching and in-depth analysis only depend on the extracted job, so run
+    them concurrently and merge: job["match"] (with responsibilities bonus) and job["analysis"].
+    Returns the job dict. If analysis fails, the match is still saved without it.
+    """
+    res = fan_out(
+        match=ascore_job_fit(job, profile),
+        analysis=arun_in_depth_analysis(job, profile),
+    )
+    match, analysis = res["match"], res["analysis"]
+    if isinstance(match, Exception):
+        raise match
+
+    if isinstance(analysis, Exception):
+        job["match"] = match
+    else:
+        job["analysis"] = analysis
+        job["match"] = apply_resp_bonus(match, analysis)
+    return job
+
+def generate_documents(
+    job: Dict[str, Any],
+    profile: Dict[str, Any],
+    cover_letter_prompt: str | None = None,
+    resume_prompt: str | None = None,
+) -> Tuple[str, str]:
+    """Generate the cover letter and resume concurrently. Returns (cover_letter, resume) markdown."""
+    res = fan_out(
+        cover_letter=agenerate_cover_letter(job, profile, prompt_filename=cover_letter_prompt),
+        resume=agenerate_resume(job, profile, prompt_filename=resume_prompt),
+    )
+    out = []
+    for key in ("cover_letter", "resume"):
+        val = res[key]
+        out.append(f"❌ Error: {val}" if isinstance(val, Exception) else val)
+    return out[0], out[1]
@@ -1,36 +1,72 @@
-import json
-from typing import Dict, Any
-import streamlit as st
+from typing import Dict, Any, List
 from utils.prompt_loader import load_prompt
-from utils.ai.openai_client import call_gpt
+from services.generator_payload import build_generator_payload, generator_messages
+from utils.ai.openai_client import call_gpt, acall_gpt, GPTStream
+from utils.ai.cost_logger import job_context
+from utils.progress import ProgressFn, report
 
 def _build_payload(job: Dict[str, Any], profile: Dict[str, Any]) -> Dict[str, Any]:
-    return {
-        "job": job or {},
-        "candidate": profile or {},
-        "constraints": {
-            "format": "markdown",
-            "sections": ["Header","Summary","Skills","Experience","Projects","Education"],
-            "length": "2 pages max",
-            "ats_friendly": True
-        }
-    }
+    # Only what the prompt uses, trimmed to settings["payload_budget"]["resume"]
+    return build_generator_payload(job, profile, "resume", {
+        "format": "markdown",
+        "sections": ["Header","Summary","Skills","Experience","Projects","Education"],
+        "length": "2 pages max",
+        "ats_friendly": True
+    })
 
-def generate_resume(job: Dict[str, Any], profile: Dict[str, Any], model: str = "gpt-5-mini", prompt_filename: str | None = None) -> str:
+def _resume_messages(job: Dict[str, Any], profile: Dict[str, Any], prompt_filename: str | None) -> List[Dict[str, str]]:
     system_prompt = load_prompt("resume_agent", prompt_filename or "_resume_prompt.txt")
+    return generator_messages(system_prompt, _build_payload(job, profile))
 
-    payload = _build_payload(job, profile)
+def generate_resume(
+    job: Dict[str, Any],
+    profile: Dict[str, Any],
+    model: str = "gpt-5-mini",
+    prompt_filename: str | None = None,
+    progress: ProgressFn | None = None,
+) -> str:
     try:
         print(f"🤖 [Resume AI Generator] Generating for {job.get('company','Unknown')}..")
-        text, meta = call_gpt(
+        with job_context(job):
+            text, meta = call_gpt(
+                task="resume",
+                messages=_resume_messages(job, profile, prompt_filename),
+            )
+        print(f"[Resume AI Generator] (tokens)={meta['total_tokens']} (cost)=${meta['cost_usd']} (model)={meta['model']}")
+        report(progress, "success", "✅ Resume generated!")
+        return (text or "").strip()
+    except Exception as e:
+        print("[Resume] Fatal error:", e)
+        return f"❌ Error: {e}"
+
+def stream_resume(
+    job: Dict[str, Any],
+    profile: Dict[str, Any],
+    prompt_filename: str | None = None,
+) -> GPTStream:
+    """Streaming variant: iterate for text as it is generated; `.text` holds the full resume after."""
+    print(f"🤖 [Resume AI Generator] Streaming for {job.get('company','Unknown')}..")
+    with job_context(job):
+        return call_gpt(
             task="resume",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": json.dumps(payload, ensure_ascii=False)}
-            ],
+            messages=_resume_messages(job, profile, prompt_filename),
+            stream=True,
         )
+
+async def agenerate_resume(
+    job: Dict[str, Any],
+    profile: Dict[str, Any],
+    prompt_filename: str | None = None,
+) -> str:
+    """Async twin of generate_resume."""
+    try:
+        print(f"🤖 [Resume AI Generator] Generating for {job.get('company','Unknown')}..")
+        with job_context(job):
+            text, meta = await acall_gpt(
+                task="resume",
+                messages=_resume_messages(job, profile, prompt_filename),
+            )
         print(f"[Resume AI Generator] (tokens)={meta['total_tokens']} (cost)=${meta['cost_usd']} (model)={meta['model']}")
-        st.empty().success("✅ Resume generated!")
         return (text or "").strip()
     except Exception as e:
         print("[Resume] Fatal error:", e)
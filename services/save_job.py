@@ -1,8 +1,8 @@
 # save_job.py
-import os, json, re, unicodedata
+import os, re, unicodedata
 from datetime import datetime
+from services.job_store import JOB_DIR, write_job
 
-JOB_DIR = os.path.join("data", "jobs")
 _FORBIDDEN = r'<>:"/\\|?*'
 
 def _safe_slug(text: str, max_len: int = 80) -> str:
@@ -34,7 +34,4 @@ def save_job(job_data: dict):
     os.makedirs(day_dir, exist_ok=True)
 
     path = os.path.join(day_dir, fname)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(job_data, f, indent=2, ensure_ascii=False)
-
-    return path
+    return write_job(path, job_data)
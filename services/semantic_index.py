@@ -0,0 +1,367 @@
+# services/semantic_index.py
+"""
+Embedding index over saved jobs for "search by meaning" and "More like this".
+
+Storage (data/semantic/):
+    vectors.f32  memory-mapped float32 matrix, one L2-normalized row per slot
+    meta.db      SQLite: path -> slot, a hash of the embedded text, free slots,
+                 and which embedder produced the vectors
+
+Writes are incremental: job_store.index_job() enqueues the job, and a short timer
+flushes the queue so jobs saved close together (batch ingest, bulk re-score) are
+embedded in one batch; whatever is still queued is flushed at interpreter exit
+(CLI runs, scripts). A job whose embedded text did not change is skipped, and
+jobs the index is missing are embedded before the next search.
+
+Queries on large indexes use random-hyperplane LSH (several tables, 1-bit
+multi-probe) to pick candidates and re-rank them exactly; anything up to
+EXACT_BELOW rows is simply scanned, which is both exact and fast at that size.
+"""
+import os, json, time, atexit, hashlib, sqlite3, threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services import job_store
+from utils.ai.embeddings import get_embedder, semantic_config
+
+SEMANTIC_DIR = os.path.join("data", "semantic")
+VECTORS_PATH = os.path.join(SEMANTIC_DIR, "vectors.f32")
+META_PATH = os.path.join(SEMANTIC_DIR, "meta.db")
+
+BATCH_WAIT_S = 0.5          # gather saves for this long before embedding them together
+BATCH_SIZE = 64
+LSH_TABLES = 16
+LSH_BITS = 10
+EXACT_BELOW = 50000         # a full scan of this many rows is ~10 ms; LSH only pays off above it
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS slots (
+    path      TEXT PRIMARY KEY,
+    slot      INTEGER NOT NULL UNIQUE,
+    text_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS free_slots (slot INTEGER PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+_write_lock = threading.Lock()
+_pending: Dict[str, Tuple[str, str]] = {}   # path -> (text, text_hash)
+_pending_lock = threading.Lock()
+_timer: Optional[threading.Timer] = None
+
+def embed_text(job: Dict[str, Any]) -> str:
+    """The part of a job that describes what the role is about."""
+    parts = [job.get("job_title") or "", job.get("summary") or ""]
+    parts.append("Skills: " + ", ".join(job.get("required_skills") or []))
+    parts += list(job.get("responsibilities") or [])
+    return "\n".join(p for p in parts if p and p.strip())
+
+# ---------- storage ----------
+def _connect() -> sqlite3.Connection:
+    os.makedirs(SEMANTIC_DIR, exist_ok=True)
+    conn = sqlite3.connect(META_PATH, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+def _meta(conn: sqlite3.Connection, key: str, default: Any = None) -> Any:
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return json.loads(row[0]) if row else default
+
+def _set_meta(conn: sqlite3.Connection, key: str, value: Any) -> None:
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+def _bump_version(conn: sqlite3.Connection) -> None:
+    _set_meta(conn, "version", int(_meta(conn, "version", 0)) + 1)
+
+def _open_vectors(capacity: int, dim: int, mode: str = "r+") -> np.memmap:
+    need = capacity * dim * 4
+    if mode == "r+" and (not os.path.exists(VECTORS_PATH) or os.path.getsize(VECTORS_PATH) < need):
+        with open(VECTORS_PATH, "ab") as f:
+            f.truncate(need)
+    return np.memmap(VECTORS_PATH, dtype=np.float32, mode=mode, shape=(capacity, dim))
+
+def _ensure_space(conn: sqlite3.Connection, embedder) -> bool:
+    """Reset the store when the embedder changed (different vector space). Returns True if reset."""
+    if _meta(conn, "embedder") == embedder.name and _meta(conn, "dim") == embedder.dim:
+        return False
+    conn.execute("DELETE FROM slots")
+    conn.execute("DELETE FROM free_slots")
+    _set_meta(conn, "embedder", embedder.name)
+    _set_meta(conn, "dim", embedder.dim)
+    _set_meta(conn, "capacity", 0)
+    _bump_version(conn)
+    if os.path.exists(VECTORS_PATH):
+        os.remove(VECTORS_PATH)
+    print(f"[Semantic] index reset for embedder {embedder.name}")
+    return True
+
+def _alloc_slot(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT MIN(slot) FROM free_slots").fetchone()
+    if row[0] is not None:
+        conn.execute("DELETE FROM free_slots WHERE slot = ?", (row[0],))
+        return int(row[0])
+    top = conn.execute("SELECT COALESCE(MAX(slot), -1) FROM slots").fetchone()[0]
+    return int(top) + 1
+
+def _write(items: List[Tuple[str, str, str]]) -> int:
+    """Embed and store [(path, text, text_hash)], skipping unchanged texts. Returns rows written."""
+    if not items:
+        return 0
+    embedder = get_embedder()
+    with _write_lock:
+        conn = _connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            _ensure_space(conn, embedder)
+            known = {
+                r[0]: r[1] for r in conn.execute(
+                    f"SELECT path, text_hash FROM slots WHERE path IN ({','.join('?' * len(items))})",
+                    [p for p, _, _ in items],
+                )
+            }
+            todo = [(p, t, h) for p, t, h in items if known.get(p) != h]
+            if not todo:
+                conn.execute("COMMIT")
+                return 0
+
+            vecs = np.concatenate([
+                embedder.embed([t for _, t, _ in todo[i:i + BATCH_SIZE]])
+                for i in range(0, len(todo), BATCH_SIZE)
+            ])
+            slots = []
+            for path, _, h in todo:
+                row = conn.execute("SELECT slot FROM slots WHERE path = ?", (path,)).fetchone()
+                slot = int(row[0]) if row else _alloc_slot(conn)
+                conn.execute("INSERT OR REPLACE INTO slots (path, slot, text_hash) VALUES (?, ?, ?)", (path, slot, h))
+                slots.append(slot)
+
+            capacity = int(_meta(conn, "capacity", 0))
+            if max(slots) >= capacity:
+                capacity = max(1024, capacity * 2, max(slots) + 1)
+                _set_meta(conn, "capacity", capacity)
+            mm = _open_vectors(capacity, embedder.dim)
+            mm[np.asarray(slots)] = vecs
+            mm.flush()
+            del mm
+
+            _bump_version(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+    return len(todo)
+
+# ---------- incremental updates ----------
+def enqueue(path: str, job: Dict[str, Any]) -> None:
+    """Queue one saved job for embedding; flushed in a batch shortly after."""
+    global _timer
+    if not semantic_config().get("enabled", True):
+        return
+    text = embed_text(job)
+    h = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    with _pending_lock:
+        _pending[os.path.normpath(path)] = (text, h)
+        if _timer is None:
+            _timer = threading.Timer(BATCH_WAIT_S, flush)
+            _timer.daemon = True
+            _timer.start()
+
+def flush() -> int:
+    """Embed everything queued so far."""
+    global _timer
+    with _pending_lock:
+        items = [(p, t, h) for p, (t, h) in _pending.items()]
+        _pending.clear()
+        _timer = None
+    try:
+        n = _write(items)
+        if n:
+            print(f"[Semantic] embedded {n} job(s)")
+        return n
+    except Exception as e:
+        print(f"[Semantic] embedding failed: {e}")
+        return 0
+
+# a short-lived process (CLI ingest / score) exits before the timer fires
+atexit.register(flush)
+
+def remove(path: str) -> None:
+    path = os.path.normpath(path)
+    with _pending_lock:
+        _pending.pop(path, None)
+    if not os.path.exists(META_PATH):
+        return
+    with _write_lock:
+        conn = _connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT slot FROM slots WHERE path = ?", (path,)).fetchone()
+            if row:
+                conn.execute("DELETE FROM slots WHERE path = ?", (path,))
+                conn.execute("INSERT OR IGNORE INTO free_slots (slot) VALUES (?)", (row[0],))
+                _bump_version(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+def _job_item(path: str) -> Optional[Tuple[str, str, str]]:
+    try:
+        job = job_store.read_job(path)
+    except Exception as e:
+        print(f"[Semantic] skipped {path}: {e}")
+        return None
+    text = embed_text(job)
+    return os.path.normpath(path), text, hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def rebuild() -> int:
+    """Embed every saved job from scratch (first run, or after switching embedders)."""
+    conn = _connect()
+    try:
+        conn.execute("DELETE FROM slots")
+        conn.execute("DELETE FROM free_slots")
+        _bump_version(conn)
+    finally:
+        conn.close()
+
+    items = [it for it in (_job_item(row["_source_path"]) for row in job_store.list_jobs()) if it]
+    n = _write(items)
+    print(f"[Semantic] rebuilt index with {n} job(s)")
+    return n
+
+def sync() -> int:
+    """Embed saved jobs the index is missing and drop rows for deleted ones. Returns jobs embedded."""
+    saved = {os.path.normpath(row["_source_path"]) for row in job_store.list_jobs()}
+    conn = _connect()
+    try:
+        indexed = {r[0] for r in conn.execute("SELECT path FROM slots")}
+    finally:
+        conn.close()
+    for path in indexed - saved:
+        remove(path)
+    n = _write([it for it in (_job_item(p) for p in sorted(saved - indexed)) if it])
+    if n:
+        print(f"[Semantic] embedded {n} job(s) missing from the index")
+    return n
+
+# ---------- search ----------
+class _Snapshot:
+    """Read-only view of the vectors plus LSH tables, rebuilt when the store's version changes."""
+
+    def __init__(self, paths: List[str], vectors: np.ndarray, dim: int):
+        self.paths = paths
+        self.vectors = vectors                      # (n, dim), rows aligned with paths
+        self.row_of = {p: i for i, p in enumerate(paths)}
+        rng = np.random.default_rng(0)
+        self.planes = rng.standard_normal((dim, LSH_TABLES * LSH_BITS)).astype(np.float32)
+        self.tables = []
+        if len(paths) >= EXACT_BELOW:
+            codes = self._codes(vectors)
+            for t in range(LSH_TABLES):
+                order = np.argsort(codes[:, t], kind="stable")
+                self.tables.append((codes[order, t], order))
+
+    def _codes(self, vecs: np.ndarray) -> np.ndarray:
+        bits = (vecs @ self.planes > 0).reshape(len(vecs), LSH_TABLES, LSH_BITS)
+        return (bits * (1 << np.arange(LSH_BITS))).sum(axis=2)
+
+    def _candidates(self, q: np.ndarray) -> np.ndarray:
+        code = self._codes(q[None, :])[0]
+        flips = [0] + [1 << b for b in range(LSH_BITS)]
+        found = []
+        for t, (sorted_codes, order) in enumerate(self.tables):
+            for f in flips:
+                c = code[t] ^ f
+                lo, hi = np.searchsorted(sorted_codes, [c, c + 1])
+                if hi > lo:
+                    found.append(order[lo:hi])
+        return np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+
+    def query(self, q: np.ndarray, k: int, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        if not self.paths:
+            return []
+        rows = None
+        if self.tables:
+            rows = self._candidates(q)
+            if len(rows) < 4 * k:
+                rows = None  # too few candidates: recall beats the shortcut
+        sims = self.vectors @ q if rows is None else self.vectors[rows] @ q
+        rows = np.arange(len(self.paths)) if rows is None else rows
+
+        top = np.argsort(-sims)[: k + 1]
+        out = []
+        for i in top:
+            path = self.paths[rows[i]]
+            if path != exclude:
+                out.append((path, float(sims[i])))
+        return out[:k]
+
+_snap_lock = threading.Lock()
+_snap: Optional[Tuple[Any, _Snapshot]] = None
+
+def _snapshot() -> _Snapshot:
+    global _snap
+    embedder = get_embedder()
+    conn = _connect()
+    try:
+        if _ensure_space(conn, embedder):
+            conn.close()
+            rebuild()
+            conn = _connect()
+        key = (_meta(conn, "version", 0), embedder.name)
+        with _snap_lock:
+            if _snap and _snap[0] == key:
+                return _snap[1]
+        rows = conn.execute("SELECT path, slot FROM slots ORDER BY slot").fetchall()
+        capacity = int(_meta(conn, "capacity", 0))
+    finally:
+        conn.close()
+
+    paths = [r[0] for r in rows]
+    if rows and capacity:
+        mm = _open_vectors(capacity, embedder.dim, mode="r")
+        vectors = np.asarray(mm[np.asarray([r[1] for r in rows], dtype=np.int64)])
+    else:
+        vectors = np.zeros((0, embedder.dim), dtype=np.float32)
+    snap = _Snapshot(paths, vectors, embedder.dim)
+    with _snap_lock:
+        _snap = (key, snap)
+    return snap
+
+def _ready() -> _Snapshot:
+    flush()
+    snap = _snapshot()
+    if len(snap.paths) != job_store.count_jobs():
+        # jobs saved before semantic search existed, or by a process that exited before its flush
+        sync()
+        snap = _snapshot()
+    return snap
+
+def search(text: str, k: int = 20) -> List[Tuple[str, float]]:
+    """[(path, cosine)] for the k saved jobs closest in meaning to `text`."""
+    if not (text or "").strip():
+        return []
+    t0 = time.time()
+    snap = _ready()
+    q = get_embedder().embed([text])[0]
+    res = snap.query(q, k)
+    print(f"[Semantic] search over {len(snap.paths)} jobs in {(time.time() - t0) * 1000:.1f} ms")
+    return res
+
+def similar(path: str, k: int = 5) -> List[Tuple[str, float]]:
+    """[(path, cosine)] for the k saved jobs most like the one at `path`."""
+    path = os.path.normpath(path)
+    snap = _ready()
+    i = snap.row_of.get(path)
+    if i is None:
+        job = job_store.read_job(path)
+        q = get_embedder().embed([embed_text(job)])[0]
+    else:
+        q = snap.vectors[i]
+    return snap.query(q, k, exclude=path)
@@ -0,0 +1,124 @@
+# services/skill_matching_agent/bulk_rescore.py
+import os, json, time, tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List
+
+from services import job_store, task_queue
+from utils.progress import ProgressFn, report
+from .score_job_fit import score_job_fit
+from .skill_match_utils import profile_hash, apply_resp_bonus
+
+CHECKPOINT_PATH = os.path.join("data", "rescore_checkpoint.json")
+DEFAULT_WORKERS = 4
+
+# Runs on the task queue as kind "rescore_stale" (services/task_handlers.py);
+# the UI polls rescore_status() for progress.
+TASK_KIND = "rescore_stale"
+
+def _load_checkpoint() -> Dict[str, Any]:
+    try:
+        with open(CHECKPOINT_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_checkpoint(cp: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(CHECKPOINT_PATH), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(CHECKPOINT_PATH), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(cp, f, indent=2)
+    os.replace(tmp, CHECKPOINT_PATH)
+
+def stale_jobs(profile: Dict[str, Any]) -> List[str]:
+    """Saved job paths whose match was computed against a different profile version."""
+    return job_store.stale_job_paths(profile_hash(profile))
+
+def rescore_job(path: str, profile: Dict[str, Any], progress: ProgressFn | None = None) -> Dict[str, Any]:
+    """
+    Re-score one saved job in place. Keeps the responsibilities bonus if an analysis exists.
+    Raises without touching the stored match when the LLM step failed.
+    """
+    job = job_store.read_job(path)
+    job.pop("_source_path", None)
+    match = score_job_fit(job, profile, progress=progress)
+    if not match.get("profile_hash"):
+        raise RuntimeError("skill matching failed; the saved match was left as is")
+    # the job may have been edited while we scored; only touch what we own
+    job = job_store.read_job(path)
+    job.pop("_source_path", None)
+    if job.get("analysis"):
+        match = apply_resp_bonus(match, job["analysis"])
+    job["match"] = match
+    job_store.write_job(path, job)
+    return match
+
+def run_bulk_rescore(
+    profile: Dict[str, Any],
+    max_workers: int = DEFAULT_WORKERS,
+    force: bool = False,
+    progress: ProgressFn | None = None,
+    skip: Iterable[str] = (),
+) -> Dict[str, Any]:
+    """
+    Re-score every stale job (or every job with force=True) on a bounded thread pool.
+    Paths in `skip` are left out (e.g. a job the caller is already re-scoring).
+
+    Each finished job is written back through job_store, so the index is updated
+    incrementally and a re-run naturally skips jobs already stamped with the
+    current profile hash. The checkpoint file records progress for the UI and
+    lets a forced run resume where it stopped instead of starting over.
+    """
+    target = profile_hash(profile)
+    cp = _load_checkpoint()
+    resumable = cp.get("profile_hash") == target and cp.get("force") == force and cp.get("status") != "complete"
+    done = set(cp.get("done", [])) if resumable else set()
+
+    if force:
+        paths = [j["_source_path"] for j in job_store.list_jobs()]
+    else:
+        paths = job_store.stale_job_paths(target)
+    skip = {os.path.normpath(p) for p in skip}
+    todo = [p for p in paths if p not in done and os.path.normpath(p) not in skip]
+
+    cp = {
+        "profile_hash": target,
+        "force": force,
+        "status": "running",
+        "started": cp.get("started") if resumable else time.time(),
+        "total": len(todo) + len(done),
+        "done": sorted(done),
+        "failed": {},
+    }
+    _save_checkpoint(cp)
+    if resumable and done:
+        report(progress, "info", f"Resuming re-score: {len(done)} done, {len(todo)} to go.")
+
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="rescore") as pool:
+        futures = {pool.submit(rescore_job, p, profile): p for p in todo}
+        for fut in as_completed(futures):
+            path = futures[fut]
+            try:
+                score = fut.result().get("scores", {}).get("overall_score")
+                cp["done"].append(path)
+                report(progress, "info", f"[{len(cp['done'])}/{cp['total']}] {score}  {path}")
+            except Exception as e:
+                cp["failed"][path] = str(e)
+                report(progress, "warning", f"Re-score failed for {path}: {e}")
+            # checkpoint after every job so an interrupted run loses at most the in-flight ones
+            _save_checkpoint(cp)
+
+    cp["status"] = "complete" if not cp["failed"] else "partial"
+    cp["finished"] = time.time()
+    _save_checkpoint(cp)
+    report(progress, "success", f"✅ Re-scored {len(cp['done'])} job(s), {len(cp['failed'])} failed.")
+    return cp
+
+def rescore_status() -> Dict[str, Any]:
+    """Last checkpoint plus whether a re-score task is queued or running."""
+    cp = _load_checkpoint()
+    live = task_queue.list_tasks(statuses=(task_queue.QUEUED, task_queue.RUNNING), kinds=(TASK_KIND,), limit=1)
+    cp["running"] = bool(live)
+    if cp.get("status") == "running" and not cp["running"]:
+        # a checkpoint left "running" with no live task is an interrupted run
+        cp["status"] = "interrupted"
+    return cp
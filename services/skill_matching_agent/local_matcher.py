@@ -0,0 +1,412 @@
+# services/skill_matching_agent/local_matcher.py
+"""
+Deterministic skill/qualification matcher. Produces the same `fit` / `preferences`
+shape the LLM scorer returns, and flags items it cannot decide on ("ambiguous")
+so only those need an LLM call.
+
+Matching ladder for each job item, cheapest first:
+    1) exact match after _norm + synonym canonicalization
+    2) token-set: every token of the job item is covered by the profile's terms
+    3) fuzzy: difflib ratio >= fuzzy_threshold against any profile term
+    4) evidence: the term appears in experience bullets / qualifications text
+Anything whose best fuzzy/token score lands between ambiguous_threshold and
+fuzzy_threshold (and every qualification that isn't clearly covered) is ambiguous.
+"""
+import os, re, json, hashlib
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .skill_match_utils import ALIASES, _norm, flatten_experience_bullets, normalize_set
+
+SYNONYMS_PATH = os.path.join("data", "skill_synonyms.json")
+
+# Seed synonym groups on top of ALIASES. Users can extend them in data/skill_synonyms.json:
+#   {"kubernetes": ["k8s"], "postgresql": ["postgres", "psql"]}
+DEFAULT_SYNONYMS: Dict[str, set[str]] = {
+    "postgresql": {"postgres", "psql"},
+    "javascript": {"js", "ecmascript"},
+    "typescript": {"ts"},
+    "node js": {"node", "nodejs"},
+    "kubernetes": {"k8s"},
+    "c#": {"csharp", "c sharp"},
+    "aws": {"amazon web services"},
+    "ci/cd": {"cicd", "ci cd", "continuous integration", "continuous delivery"},
+    "object-oriented programming": {"oop", "object oriented programming", "object oriented design"},
+    "microsoft sql server": {"mssql", "sql server", "ms sql"},
+    "agile methodologies": {"agile", "scrum"},
+    "machine learning": {"ml"},
+    "large language models": {"llm", "llms", "llm integration"},
+}
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "mode": "hybrid",             # "local" | "hybrid" | "llm"
+    "fuzzy_threshold": 0.9,
+    "ambiguous_threshold": 0.6,
+    "qual_match_threshold": 0.75,  # share of a qualification's content words found in the profile
+}
+
+_STOPWORDS = {
+    "a", "an", "and", "or", "the", "of", "in", "on", "for", "to", "with", "at", "as", "by",
+    "is", "are", "be", "have", "has", "experience", "years", "year", "knowledge", "strong",
+    "understanding", "ability", "proficiency", "proficient", "skills", "skill", "working",
+    "familiarity", "familiar", "plus", "using", "related", "equivalent", "etc",
+}
+
+def _tokens(s: str) -> List[str]:
+    return re.findall(r"[a-z0-9#+/]+", (s or "").lower())
+
+def _content_tokens(s: str) -> set[str]:
+    return {t for t in _tokens(s) if t not in _STOPWORDS and len(t) > 1}
+
+# ---------- synonym graph ----------
+def _load_user_synonyms() -> Dict[str, List[str]]:
+    if not os.path.exists(SYNONYMS_PATH):
+        return {}
+    try:
+        with open(SYNONYMS_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return {k: list(v or []) for k, v in data.items()} if isinstance(data, dict) else {}
+    except Exception as e:
+        print(f"[LocalMatcher] ignoring {SYNONYMS_PATH}: {e}")
+        return {}
+
+class SynonymGraph:
+    """Undirected synonym graph; each connected component maps to one canonical term."""
+
+    def __init__(self, groups: Iterable[Tuple[str, Iterable[str]]]):
+        self._parent: Dict[str, str] = {}
+        self._canon_pref: Dict[str, str] = {}
+        for head, alts in groups:
+            h = _norm(head)
+            self._canon_pref.setdefault(h, h)
+            for alt in alts:
+                self._union(h, _norm(alt))
+        self._canon: Dict[str, str] = {}
+        for term in list(self._parent):
+            root = self._find(term)
+            # prefer an explicit group head as the canonical name
+            best = self._canon.get(root)
+            if term in self._canon_pref and (best is None or best not in self._canon_pref):
+                self._canon[root] = term
+            elif best is None:
+                self._canon[root] = term
+
+    def _find(self, x: str) -> str:
+        self._parent.setdefault(x, x)
+        while self._parent[x] != x:
+            self._parent[x] = self._parent[self._parent[x]]
+            x = self._parent[x]
+        return x
+
+    def _union(self, a: str, b: str) -> None:
+        ra, rb = self._find(a), self._find(b)
+        if ra != rb:
+            self._parent[rb] = ra
+
+    def canonical(self, normed: str) -> str:
+        if normed not in self._parent:
+            return normed
+        return self._canon[self._find(normed)]
+
+    def variants(self, normed: str) -> set[str]:
+        """All spellings in the same component (for evidence search)."""
+        if normed not in self._parent:
+            return {normed}
+        root = self._find(normed)
+        return {t for t in self._parent if self._find(t) == root}
+
+_graph_cache: Dict[str, SynonymGraph] = {}
+
+def synonym_graph() -> SynonymGraph:
+    user = _load_user_synonyms()
+    key = json.dumps(user, sort_keys=True)
+    g = _graph_cache.get(key)
+    if g is None:
+        groups = list(ALIASES.items()) + list(DEFAULT_SYNONYMS.items()) + list(user.items())
+        g = SynonymGraph(groups)
+        _graph_cache.clear()
+        _graph_cache[key] = g
+    return g
+
+def canon(s: str, graph: SynonymGraph | None = None) -> str:
+    return (graph or synonym_graph()).canonical(_norm(s))
+
+# ---------- profile index ----------
+def _expand_skill(raw: str) -> List[str]:
+    """'AWS (EC2, Lambda, RDS)' -> ['AWS (EC2, Lambda, RDS)', 'AWS', 'EC2', 'Lambda', 'RDS']"""
+    out = [raw]
+    m = re.match(r"^\s*([^()]+?)\s*\(([^)]*)\)\s*$", raw or "")
+    if m:
+        out.append(m.group(1))
+        out += [p for p in re.split(r"[,/;]", m.group(2)) if p.strip()]
+    return out
+
+class ProfileIndex:
+    def __init__(self, profile: Dict[str, Any], graph: SynonymGraph):
+        self.graph = graph
+        self.terms: set[str] = set()
+        for raw in profile.get("skills") or []:
+            for part in _expand_skill(raw):
+                n = graph.canonical(_norm(part))
+                if n:
+                    self.terms.add(n)
+        self.term_tokens: set[str] = set()
+        for t in self.terms:
+            self.term_tokens.update(_tokens(t))
+
+        quals = list(profile.get("qualifications") or [])
+        for e in profile.get("education") or []:
+            quals.append(json.dumps(e, ensure_ascii=False) if isinstance(e, dict) else str(e))
+        self.qual_tokens: set[str] = set()
+        for q in quals:
+            self.qual_tokens |= _content_tokens(q)
+        self.qual_tokens |= {t for term in self.terms for t in _tokens(term)}
+
+        evidence = flatten_experience_bullets(profile) + quals + [profile.get("summary") or ""]
+        self.evidence_text = " " + " ".join(_norm(x) for x in evidence if x) + " "
+
+_profile_cache: Dict[str, ProfileIndex] = {}
+
+def profile_index(profile: Dict[str, Any]) -> ProfileIndex:
+    graph = synonym_graph()
+    key = hashlib.md5(json.dumps(profile, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+    key += str(id(graph))
+    idx = _profile_cache.get(key)
+    if idx is None:
+        idx = ProfileIndex(profile, graph)
+        if len(_profile_cache) > 16:
+            _profile_cache.clear()
+        _profile_cache[key] = idx
+    return idx
+
+# ---------- matching ----------
+def _best_fuzzy(term: str, terms: Iterable[str]) -> float:
+    best = 0.0
+    sm = SequenceMatcher(autojunk=False)
+    sm.set_seq2(term)
+    for t in terms:
+        sm.set_seq1(t)
+        if sm.real_quick_ratio() <= best or sm.quick_ratio() <= best:
+            continue
+        best = max(best, sm.ratio())
+    return best
+
+def _classify_skill(raw: str, idx: ProfileIndex, cfg: Dict[str, Any]) -> str:
+    """Return 'matched', 'missing' or 'ambiguous' for one job skill."""
+    n = idx.graph.canonical(_norm(raw))
+    if not n:
+        return "missing"
+    if n in idx.terms:
+        return "matched"
+
+    toks = _tokens(n)
+    if toks and all(t in idx.term_tokens for t in toks):
+        return "matched"
+
+    fuzzy = _best_fuzzy(n, idx.terms)
+    if fuzzy >= cfg["fuzzy_threshold"]:
+        return "matched"
+
+    for v in idx.graph.variants(n):
+        if len(v) > 2 and re.search(rf"(?<![a-z0-9]){re.escape(v)}(?![a-z0-9])", idx.evidence_text):
+            return "matched"
+
+    overlap = (sum(1 for t in toks if t in idx.term_tokens) / len(toks)) if toks else 0.0
+    if max(fuzzy, overlap) >= cfg["ambiguous_threshold"]:
+        return "ambiguous"
+    return "missing"
+
+def _classify_qual(raw: str, idx: ProfileIndex, cfg: Dict[str, Any]) -> str:
+    toks = _content_tokens(raw)
+    if not toks:
+        return "matched"
+    covered = sum(1 for t in toks if t in idx.qual_tokens) / len(toks)
+    if covered >= cfg["qual_match_threshold"]:
+        return "matched"
+    # sentences like degree / years-of-experience equivalence need judgement
+    return "ambiguous"
+
+def _dedupe(items: Iterable[str] | None) -> List[str]:
+    seen, out = set(), []
+    for it in items or []:
+        if isinstance(it, str) and it.strip() and it not in seen:
+            seen.add(it)
+            out.append(it)
+    return out
+
+def _split(items: Iterable[str] | None, classify, idx, cfg) -> Dict[str, List[str]]:
+    out = {"matched": [], "missing": [], "ambiguous": []}
+    for it in _dedupe(items):
+        out[classify(it, idx, cfg)].append(it)
+    return out
+
+def work_mode(job: Dict[str, Any]) -> str | None:
+    """'remote' | 'hybrid' | 'onsite' from the job's location fields, None when not stated."""
+    mode_text = f"{job.get('work_location') or ''} {job.get('location') or ''}".lower()
+    if "remote" in mode_text:
+        return "remote"
+    if "hybrid" in mode_text:
+        return "hybrid"
+    if any(w in mode_text for w in ("onsite", "on-site", "on site", "in office", "in-office")):
+        return "onsite"
+    return None
+
+def preferred_locations(profile: Dict[str, Any]) -> List[str]:
+    prefs = profile.get("preferences", {}) or {}
+    wanted = [w.split(",")[0].strip().lower() for w in (prefs.get("work_locations") or [])]
+    return [w for w in wanted if w and w not in ("remote", "hybrid")]
+
+HOURS_PER_YEAR = 2080
+_SALARY_NUM = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*(k\b)?", re.IGNORECASE)
+
+def salary_range(text: Any) -> Tuple[float, float] | None:
+    """(low, high) yearly figures from a salary string ("$90,000 - $120k", "$45/hour"), None if unreadable."""
+    text = str(text or "").lower()
+    hourly = bool(re.search(r"/\s*h(ou)?r|per hour|hourly|an hour", text))
+    vals = []
+    for num, k in _SALARY_NUM.findall(text):
+        v = float(num.replace(",", "")) * (1000 if k else 1)
+        # skip years, headcounts and the like
+        if hourly and 5 <= v < 1000:
+            vals.append(v * HOURS_PER_YEAR)
+        elif not hourly and v >= 10000:
+            vals.append(v)
+    return (min(vals), max(vals)) if vals else None
+
+def check_salary(job: Dict[str, Any], profile: Dict[str, Any]) -> str:
+    """'below' | 'meets' | 'exceeds' against preferences.min_salary (yearly); 'unknown' when either is missing."""
+    want = (profile.get("preferences", {}) or {}).get("min_salary")
+    rng = salary_range(job.get("salary"))
+    try:
+        want = float(want)
+    except (TypeError, ValueError):
+        return "unknown"
+    if not rng or want <= 0:
+        return "unknown"
+    low, high = rng
+    if high < want:
+        return "below"
+    return "exceeds" if low > want else "meets"
+
+def check_preferences(job: Dict[str, Any], profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Location / work-mode / salary checks. Unknown data stays neutral (True / 'unknown')."""
+    prefs = profile.get("preferences", {}) or {}
+    mode = work_mode(job)
+
+    work_mode_ok = True if mode is None else bool(prefs.get(mode, mode != "onsite"))
+
+    location_ok = True
+    loc = (job.get("location") or "").lower()
+    wanted = preferred_locations(profile)
+    if loc and mode != "remote" and wanted:
+        location_ok = any(w in loc for w in wanted)
+
+    salary_ok = check_salary(job, profile)
+
+    notes = []
+    if mode:
+        notes.append(f"work mode: {mode}")
+    if not location_ok:
+        notes.append(f"location '{job.get('location')}' not in preferred locations")
+    if salary_ok == "below":
+        notes.append(f"salary '{job.get('salary')}' below your minimum")
+    return {
+        "location_ok": location_ok,
+        "work_mode_ok": work_mode_ok,
+        "salary_ok": salary_ok,
+        "notes": "; ".join(notes),
+    }
+
+def match_locally(job: Dict[str, Any], profile: Dict[str, Any], cfg: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    """
+    Returns the scorer's result shape plus an "ambiguous" section:
+        {"fit": {...}, "preferences": {...},
+         "ambiguous": {"required": [...], "nice_to_have": [...], "qualifications": [...]}}
+    """
+    cfg = {**DEFAULT_CONFIG, **(cfg or {})}
+    idx = profile_index(profile)
+
+    req = _split(job.get("required_skills"), _classify_skill, idx, cfg)
+    nice = _split(job.get("nice_to_have_skills"), _classify_skill, idx, cfg)
+    qual = _split(job.get("qualifications"), _classify_qual, idx, cfg)
+
+    def _sec(d):
+        return {"matched": d["matched"], "missing": d["missing"], "score": 0}
+
+    return {
+        "fit": {
+            "skills": {"required": _sec(req), "nice_to_have": _sec(nice)},
+            "qualifications": _sec(qual),
+        },
+        "preferences": check_preferences(job, profile),
+        "scores": {"skill_score": 0, "preference_score": 0, "overall_score": 0},
+        "ambiguous": {
+            "required": req["ambiguous"],
+            "nice_to_have": nice["ambiguous"],
+            "qualifications": qual["ambiguous"],
+        },
+    }
+
+def has_ambiguous(local: Dict[str, Any]) -> bool:
+    return any(local.get("ambiguous", {}).values())
+
+def ambiguous_job(job: Dict[str, Any], local: Dict[str, Any]) -> Dict[str, Any]:
+    """A trimmed job dict holding only the undecided items, for the LLM fallback."""
+    amb = local.get("ambiguous", {})
+    return {
+        "job_title": job.get("job_title"),
+        "company": job.get("company"),
+        "location": job.get("location"),
+        "work_location": job.get("work_location"),
+        "salary": job.get("salary"),
+        "job_type": job.get("job_type"),
+        "required_skills": amb.get("required", []),
+        "nice_to_have_skills": amb.get("nice_to_have", []),
+        "qualifications": amb.get("qualifications", []),
+    }
+
+def _section(result: Dict[str, Any], name: str) -> Dict[str, Any]:
+    fit = result.get("fit", {}) or {}
+    if name == "qualifications":
+        return fit.get("qualifications", {}) or {}
+    return (fit.get("skills", {}) or {}).get(name, {}) or {}
+
+def resolve(local: Dict[str, Any], llm: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    """
+    Fold ambiguous items into matched/missing. With an LLM answer, items it marked
+    matched are matched; everything else that was ambiguous counts as missing. The
+    LLM's salary_ok is kept when the local check could not tell.
+    """
+    out = json.loads(json.dumps({k: v for k, v in local.items() if k != "ambiguous"}))
+    llm_salary = ((llm or {}).get("preferences") or {}).get("salary_ok")
+    prefs = out.setdefault("preferences", {})
+    if prefs.get("salary_ok", "unknown") == "unknown" and llm_salary in ("below", "meets", "exceeds"):
+        prefs["salary_ok"] = llm_salary
+    graph = synonym_graph()
+    for name in ("required", "nice_to_have", "qualifications"):
+        pending = local.get("ambiguous", {}).get(name, [])
+        if not pending:
+            continue
+        llm_matched = set()
+        if llm:
+            llm_matched = {canon(x, graph) for x in (_section(llm, name).get("matched") or []) if isinstance(x, str)}
+        sec = _section(out, name)
+        for item in pending:
+            (sec["matched"] if canon(item, graph) in llm_matched else sec["missing"]).append(item)
+    return out
+
+# ---------- compact features (stored in the job index for matrix scoring) ----------
+def job_features(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Everything the matrix scorer needs from one job, small enough to keep in the index:
+    normalized skill terms (synonyms are applied at ranking time so edits to
+    skill_synonyms.json take effect without re-indexing), content tokens per
+    qualification, work mode and lowercased location.
+    """
+    return {
+        "req": sorted(normalize_set(job.get("required_skills"))),
+        "nice": sorted(normalize_set(job.get("nice_to_have_skills"))),
+        "qual": [sorted(t) for t in (_content_tokens(q) for q in _dedupe(job.get("qualifications"))) if t],
+        "mode": work_mode(job),
+        "loc": (job.get("location") or "").lower(),
+    }
@@ -0,0 +1,260 @@
+# services/skill_matching_agent/matrix_scoring.py
+"""
+Score every saved job against several profile variants in one pass with NumPy.
+
+Job skills are encoded into a shared vocabulary and stored as CSR-style arrays
+(indptr + indices), one per section. For M profiles we build an (M, V) boolean
+"profile has term" matrix once, gather it at the job indices and turn row sums
+into matched counts with a cumulative-sum difference, so the whole N x M grid of
+required / nice-to-have / qualification ratios and preference penalties is plain
+array arithmetic. The formulas mirror compute_scores_from_matches.
+
+Matching rules are the cheap deterministic ones from local_matcher (exact after
+synonym canonicalization, token-set coverage, evidence in experience bullets,
+qualification token coverage). Fuzzy/ambiguous items count as missing, so these
+scores are a ranking aid; the per-job LLM/hybrid match on the job page stays the
+authoritative one.
+"""
+import os, re, json, glob, threading
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from services import job_store
+from utils.file_utils import load_profile, PROFILE_PATH
+from .local_matcher import DEFAULT_CONFIG, synonym_graph, profile_index, preferred_locations, _tokens
+from .skill_match_utils import SCORE_WEIGHTS
+
+PROFILES_DIR = os.path.join("data", "profiles")
+_MODES = {None: 0, "remote": 1, "hybrid": 2, "onsite": 3}
+
+def load_profile_variants() -> Dict[str, Dict[str, Any]]:
+    """{"current": data/profile.json, <name>: data/profiles/<name>.json, ...}"""
+    variants = {"current": load_profile()}
+    for name, path in _variant_files()[1:]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                variants[name] = json.load(f)
+        except Exception as e:
+            print(f"[Matrix Scoring] skipped profile variant {path}: {e}")
+    return variants
+
+def _variant_files() -> List[Tuple[str, str]]:
+    files = [("current", PROFILE_PATH)]
+    for path in sorted(glob.glob(os.path.join(PROFILES_DIR, "*.json"))):
+        files.append((os.path.splitext(os.path.basename(path))[0], path))
+    return files
+
+def variants_version() -> Tuple[Tuple[str, float], ...]:
+    """(name, mtime) per variant file; changes when a variant is added, removed or edited. No file reads."""
+    return tuple((name, os.path.getmtime(path) if os.path.exists(path) else 0.0) for name, path in _variant_files())
+
+class _Vocab:
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.terms: List[str] = []
+
+    def id(self, term: str) -> int:
+        i = self.ids.get(term)
+        if i is None:
+            i = self.ids[term] = len(self.terms)
+            self.terms.append(term)
+        return i
+
+def _csr(rows: List[List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    lengths = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    indices = np.fromiter((i for r in rows for i in r), dtype=np.int32, count=int(indptr[-1]))
+    return indptr, indices
+
+def _row_sums(values: np.ndarray, indptr: np.ndarray) -> np.ndarray:
+    """(M, nnz) -> (M, rows): per-row sums for every profile at once, empty rows give 0."""
+    cs = np.zeros((values.shape[0], values.shape[1] + 1), dtype=np.int32)
+    np.cumsum(values, axis=1, out=cs[:, 1:])
+    return cs[:, indptr[1:]] - cs[:, indptr[:-1]]
+
+class JobMatrix:
+    """Sparse job x term matrices for every indexed job. Rebuilt only when the index changes."""
+
+    def __init__(self, rows: List[Tuple[str, str, str, Dict[str, Any]]]):
+        graph = synonym_graph()
+        canon_cache: Dict[str, str] = {}
+
+        def canon(t: str) -> str:
+            c = canon_cache.get(t)
+            if c is None:
+                c = canon_cache[t] = graph.canonical(t)
+            return c
+
+        self.paths = [r[0] for r in rows]
+        self.titles = [r[1] for r in rows]
+        self.companies = [r[2] for r in rows]
+
+        self.skills = _Vocab()
+        self.tokens = _Vocab()
+        req, nice, qual_items, items_per_job = [], [], [], []
+        modes, locs = [], []
+        for _, _, _, f in rows:
+            req.append(sorted({self.skills.id(canon(t)) for t in f.get("req") or []}))
+            nice.append(sorted({self.skills.id(canon(t)) for t in f.get("nice") or []}))
+            quals = f.get("qual") or []
+            qual_items += [[self.tokens.id(t) for t in q] for q in quals]
+            items_per_job.append(len(quals))
+            modes.append(_MODES.get(f.get("mode"), 0))
+            locs.append(f.get("loc") or "")
+
+        self.req = _csr(req)
+        self.nice = _csr(nice)
+        self.qual = _csr(qual_items)
+        self.qual_jobs = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(np.asarray(items_per_job, dtype=np.int64), out=self.qual_jobs[1:])
+        self.mode = np.asarray(modes, dtype=np.int8)
+        self.loc_values, self.loc_codes = np.unique(np.asarray(locs, dtype=object), return_inverse=True)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    # ----- per-profile lookups, sized by vocabulary (small) rather than jobs -----
+    def _skill_hits(self, profile: Dict[str, Any]) -> np.ndarray:
+        idx = profile_index(profile)
+        hits = np.zeros(len(self.skills.terms), dtype=bool)
+        for i, term in enumerate(self.skills.terms):
+            if term in idx.terms:
+                hits[i] = True
+                continue
+            toks = _tokens(term)
+            if toks and all(t in idx.term_tokens for t in toks):
+                hits[i] = True
+            elif len(term) > 2 and re.search(rf"(?<![a-z0-9]){re.escape(term)}(?![a-z0-9])", idx.evidence_text):
+                hits[i] = True
+        return hits
+
+    def _token_hits(self, profile: Dict[str, Any]) -> np.ndarray:
+        qual_tokens = profile_index(profile).qual_tokens
+        return np.fromiter((t in qual_tokens for t in self.tokens.terms), dtype=bool, count=len(self.tokens.terms))
+
+    def _location_ok(self, profile: Dict[str, Any]) -> np.ndarray:
+        wanted = preferred_locations(profile)
+        if not wanted:
+            return np.ones(len(self), dtype=bool)
+        per_value = np.fromiter(
+            (not loc or any(w in loc for w in wanted) for loc in self.loc_values),
+            dtype=bool, count=len(self.loc_values),
+        )
+        # remote roles are never penalized for location
+        return per_value[self.loc_codes] | (self.mode == _MODES["remote"])
+
+    def _mode_ok(self, profile: Dict[str, Any]) -> np.ndarray:
+        prefs = profile.get("preferences", {}) or {}
+        table = np.array([
+            True,
+            bool(prefs.get("remote", True)),
+            bool(prefs.get("hybrid", True)),
+            bool(prefs.get("onsite", False)),
+        ])
+        return table[self.mode]
+
+    def score(self, profiles: List[Dict[str, Any]], weights: Dict[str, Any] | None = None) -> Dict[str, np.ndarray]:
+        """
+        Returns (M, N) float arrays: skill_score, preference_score, overall_score,
+        plus the raw req/nice/qual ratios (NaN where the job lists nothing).
+        """
+        w = {**SCORE_WEIGHTS, **(weights or {})}
+        pen = w["penalties"]
+        thr = float(DEFAULT_CONFIG["qual_match_threshold"])
+
+        skill_has = np.stack([self._skill_hits(p) for p in profiles]) if self.skills.terms else np.zeros((len(profiles), 0), bool)
+        token_has = np.stack([self._token_hits(p) for p in profiles]) if self.tokens.terms else np.zeros((len(profiles), 0), bool)
+
+        def ratio(indptr: np.ndarray, indices: np.ndarray) -> np.ndarray:
+            total = np.diff(indptr)
+            matched = _row_sums(skill_has[:, indices], indptr)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return np.where(total > 0, matched / np.maximum(total, 1), np.nan)
+
+        r_req = ratio(*self.req)
+        r_nice = ratio(*self.nice)
+
+        # qualifications: token coverage per item, then matched items per job
+        item_len = np.diff(self.qual[0])
+        covered = _row_sums(token_has[:, self.qual[1]], self.qual[0])
+        item_ok = np.where(item_len > 0, covered >= thr * item_len, True)
+        q_total = np.diff(self.qual_jobs)
+        q_matched = _row_sums(item_ok, self.qual_jobs)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r_qual = np.where(q_total > 0, q_matched / np.maximum(q_total, 1), np.nan)
+
+        parts = [(r_req, w["w_required"]), (r_nice, w["w_nice"]), (r_qual, w["w_qual"])]
+        num = sum(np.nan_to_num(r) * wt for r, wt in parts if wt > 0)
+        den = sum((~np.isnan(r)) * wt for r, wt in parts if wt > 0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            skill = np.where(den > 0, 100 * num / np.where(den > 0, den, 1), 0.0)
+        skill = np.round(skill, 1)
+
+        loc_ok = np.stack([self._location_ok(p) for p in profiles])
+        mode_ok = np.stack([self._mode_ok(p) for p in profiles])
+        pref = 100 - pen["location"] * (~loc_ok) - pen["work_mode"] * (~mode_ok)
+        pref = np.clip(pref, 0, 100).astype(float)
+
+        overall = np.round(np.minimum(100, 0.7 * skill + 0.3 * pref), 1)
+        return {
+            "skill_score": skill,
+            "preference_score": pref,
+            "overall_score": overall,
+            "required_ratio": r_req,
+            "nice_ratio": r_nice,
+            "qual_ratio": r_qual,
+        }
+
+_cache_lock = threading.Lock()
+_cache: Tuple[Any, JobMatrix] | None = None
+
+def job_matrix() -> JobMatrix:
+    """The matrix for the current job index, rebuilt only after jobs are written or deleted."""
+    global _cache
+    key = (job_store.index_version(), id(synonym_graph()))
+    with _cache_lock:
+        if _cache and _cache[0] == key:
+            return _cache[1]
+    m = JobMatrix(job_store.load_features())
+    with _cache_lock:
+        _cache = (key, m)
+    return m
+
+def rank_jobs(
+    variants: Dict[str, Dict[str, Any]] | None = None,
+    sort_by: str | None = None,
+    limit: int | None = None,
+) -> List[Dict[str, Any]]:
+    """
+    Rank every saved job against each profile variant.
+    Rows: {"path", "job_title", "company", "scores": {variant: overall_score}, "best": variant}
+    sorted by `sort_by` (default: the best score across variants).
+    """
+    variants = variants if variants is not None else load_profile_variants()
+    names = list(variants)
+    m = job_matrix()
+    if not len(m) or not names:
+        return []
+
+    overall = m.score([variants[n] for n in names])["overall_score"]
+    if sort_by in names:
+        key = overall[names.index(sort_by)]
+    else:
+        key = overall.max(axis=0)
+    order = np.argsort(-key, kind="stable")
+    if limit:
+        order = order[: int(limit)]
+
+    best = overall.argmax(axis=0)
+    return [
+        {
+            "path": m.paths[j],
+            "job_title": m.titles[j],
+            "company": m.companies[j],
+            "scores": {n: float(overall[i, j]) for i, n in enumerate(names)},
+            "best": names[best[j]],
+        }
+        for j in order
+    ]
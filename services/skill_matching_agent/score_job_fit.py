@@ -1,11 +1,17 @@
 # run_chain.py
 import os
 import json, re
-from typing import Dict, Any
-from utils.ai.openai_client import call_gpt
+from typing import Dict, Any, List, Tuple
+from utils.ai.openai_client import call_gpt, acall_gpt
+from utils.ai.cost_logger import job_context
+from utils.ai.model_router import report_outcome
 from utils.prompt_loader import load_prompt
-from .skill_match_utils import prepare_fit_payload, ensure_match_shape, compute_scores_from_matches
-import streamlit as st
+from utils.ai.messages import cacheable_messages
+from .skill_match_utils import prepare_fit_payload, ensure_match_shape, compute_scores_from_matches, profile_hash
+from .local_matcher import DEFAULT_CONFIG, match_locally, has_ambiguous, ambiguous_job, resolve
+from utils.config.settings import load_settings
+from utils.progress import ProgressFn, report
+from utils.tracing import span, event
 
 def _strip_fences(s: str) -> str:
     s = (s or "").strip()
@@ -20,46 +26,151 @@ def _to_json(s: str) -> dict:
     s = _first_json_block(s)
     return json.loads(s)
 
-def score_job_fit(job_data: Dict[str, Any], profile: Dict[str, Any], weights: Dict[str, Any] | None = None) -> Dict[str, Any]:    
+def _fit_messages(job_data: Dict[str, Any], profile: Dict[str, Any], weights: Dict[str, Any] | None) -> List[Dict[str, str]]:
     system_prompt = load_prompt("skill_matching_agent", "skill_match_prompt.txt") + \
         "\n\nRULES: Return ONLY a single valid JSON object. Do not wrap in code fences. No extra text."
-
     payload = prepare_fit_payload(job_data, profile, weights)
+    # weights + profile first so they land in the cached prompt prefix
+    return cacheable_messages(
+        system_prompt,
+        {"weights": payload["weights"], "PROFILE": payload["PROFILE"]},
+        {"JOB_DATA": payload["JOB_DATA"]},
+    )
 
-    try:
-        print(f"🤖 [Skill Matching AI] Scoring skill match..")
-        text, meta = call_gpt(
-            task="skill_match",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": json.dumps(payload)}
-            ],
-            response_format={"type": "json_object"}
-        )
-        
-        print(f"[Skill Matching AI] (tokens)={meta['total_tokens']} (cost)=${meta['cost_usd']} (model)={meta['model']}")
-
-        # Streamlit UI status
-        stage_status = st.empty()
-        stage_status.success("✅ Skill matching complete!")
-
-        # load json
-        data = {}
-        if text.strip():
-            try:
-                data = json.loads(text)
-            except json.JSONDecodeError:
-                # last‑ditch: strip fences or grab the first JSON object if model misbehaves
-                from re import search, DOTALL
-                s = text.strip().strip("```json").strip("```").strip()
-                m = search(r"\{.*\}", s, DOTALL)
-                if m:
-                    data = json.loads(m.group(0))
-
-    except Exception as e:
-        print("[Skill Matching AI] Fatal error:", e)
-        data = {}
+def _parse_fit(text: str) -> Dict[str, Any]:
+    data = {}
+    if text.strip():
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            # last‑ditch: strip fences or grab the first JSON object if model misbehaves
+            from re import search, DOTALL
+            s = text.strip().strip("```json").strip("```").strip()
+            m = search(r"\{.*\}", s, DOTALL)
+            if m:
+                data = json.loads(m.group(0))
+    return data
 
+def _finalize_fit(data: Dict[str, Any], weights: Dict[str, Any] | None) -> Dict[str, Any]:
     data = ensure_match_shape(data or {})
-    data = compute_scores_from_matches(data, (weights or {}))
+    return compute_scores_from_matches(data, (weights or {}))
+
+def _matching_config() -> Dict[str, Any]:
+    return {**DEFAULT_CONFIG, **(load_settings().get("skill_matching") or {})}
+
+def _plan(
+    job_data: Dict[str, Any],
+    profile: Dict[str, Any],
+    weights: Dict[str, Any] | None,
+) -> Tuple[Dict[str, Any] | None, List[Dict[str, str]] | None]:
+    """
+    Decide how much LLM work is needed. Returns (local_result, messages):
+        - mode "llm": (None, full messages), the original behaviour
+        - mode "local"/"hybrid": local matcher first; messages only for the ambiguous
+          remainder in hybrid mode, None when the local matcher decided everything
+    """
+    cfg = _matching_config()
+    if cfg["mode"] == "llm":
+        event("skill_match_plan", mode="llm", llm=True)
+        return None, _fit_messages(job_data, profile, weights)
+
+    with span("local_match"):
+        local = match_locally(job_data, profile, cfg)
+    ambiguous = cfg["mode"] == "hybrid" and has_ambiguous(local)
+    event("skill_match_plan", mode=cfg["mode"], llm=ambiguous)
+    if ambiguous:
+        return local, _fit_messages(ambiguous_job(job_data, local), profile, weights)
+    return local, None
+
+def _combine(
+    local: Dict[str, Any] | None,
+    llm: Dict[str, Any],
+    weights: Dict[str, Any] | None,
+    profile: Dict[str, Any],
+    llm_failed: bool = False,
+) -> Dict[str, Any]:
+    if local is None:
+        data = _finalize_fit(llm, weights)
+        data["method"] = "llm"
+    else:
+        data = _finalize_fit(resolve(local, llm), weights)
+        data["method"] = "hybrid" if llm else "local"
+    # lets bulk re-score find matches computed against an older profile; a match whose
+    # LLM step failed stays unstamped so it is picked up again
+    if not llm_failed:
+        data["profile_hash"] = profile_hash(profile)
     return data
+
+def score_job_fit(
+    job_data: Dict[str, Any],
+    profile: Dict[str, Any],
+    weights: Dict[str, Any] | None = None,
+    progress: ProgressFn | None = None,
+) -> Dict[str, Any]:
+    with span("skill_match", job=job_data.get("url") or ""):
+        return _score_job_fit(job_data, profile, weights, progress)
+
+def _score_job_fit(
+    job_data: Dict[str, Any],
+    profile: Dict[str, Any],
+    weights: Dict[str, Any] | None,
+    progress: ProgressFn | None,
+) -> Dict[str, Any]:
+    local, messages = _plan(job_data, profile, weights)
+    data = {}
+    if messages:
+        try:
+            print(f"🤖 [Skill Matching AI] Scoring skill match..")
+            with job_context(job_data):
+                text, meta = call_gpt(
+                    task="skill_match",
+                    messages=messages,
+                    response_format={"type": "json_object"}
+                )
+            
+            print(f"[Skill Matching AI] (tokens)={meta['total_tokens']} (cost)=${meta['cost_usd']} (model)={meta['model']}")
+
+            # load json
+            with span("json_parse", kind="parse", chars=len(text or "")):
+                data = _parse_fit(text)
+            with job_context(job_data):
+                report_outcome("skill_match", bool(data), "" if data else "empty")
+
+        except Exception as e:
+            print("[Skill Matching AI] Fatal error:", e)
+            with job_context(job_data):
+                report_outcome("skill_match", False, "json_parse")
+            data = {}
+    else:
+        print("[Skill Matching] Decided locally, no LLM call needed.")
+
+    report(progress, "success", "✅ Skill matching complete!")
+    return _combine(local, data, weights, profile, llm_failed=bool(messages) and not data)
+
+async def ascore_job_fit(
+    job_data: Dict[str, Any],
+    profile: Dict[str, Any],
+    weights: Dict[str, Any] | None = None,
+) -> Dict[str, Any]:
+    """Async twin of score_job_fit for fan-out with other agents (see utils/ai/orchestrator.py)."""
+    local, messages = _plan(job_data, profile, weights)
+    data = {}
+    if messages:
+        try:
+            with job_context(job_data):
+                text, meta = await acall_gpt(
+                    task="skill_match",
+                    messages=messages,
+                    response_format={"type": "json_object"}
+                )
+            print(f"[Skill Matching AI] (tokens)={meta['total_tokens']} (cost)=${meta['cost_usd']} (model)={meta['model']}")
+            data = _parse_fit(text)
+            with job_context(job_data):
+                report_outcome("skill_match", bool(data), "" if data else "empty")
+        except Exception as e:
+            print("[Skill Matching AI] Fatal error:", e)
+            with job_context(job_data):
+                report_outcome("skill_match", False, "json_parse")
+            data = {}
+
+    return _combine(local, data, weights, profile, llm_failed=bool(messages) and not data)
@@ -1,4 +1,4 @@
-import re
+import re, copy, json, hashlib
 from typing import Dict, Any, Iterable
 
 ALIASES = {
@@ -33,6 +33,12 @@ def normalize_set(items: Iterable[str] | None) -> set[str]:
             out.add(n)
     return out
 
+def profile_hash(profile: Dict[str, Any]) -> str:
+    """Content hash of everything in the profile that can change a match (contact details excluded)."""
+    relevant = {k: v for k, v in (profile or {}).items() if k != "contact"}
+    blob = json.dumps(relevant, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
 def flatten_experience_bullets(profile: Dict[str, Any]) -> list[str]:
     bullets: list[str] = []
     for w in profile.get("work_experience", []) or []:
@@ -102,9 +108,12 @@ def ensure_match_shape(data: Dict[str, Any]) -> Dict[str, Any]:
     _d("scores", {"skill_score": 0, "preference_score": 0, "overall_score": 0})
     return data
 
+# Weights compute_scores_from_matches falls back to (also used by matrix_scoring)
+SCORE_WEIGHTS = {"w_required": 0.6, "w_nice": 0.2, "w_qual": 0.2,
+    "penalties": {"location": 15, "work_mode": 10, "salary": 8, "seniority": 12}}
+
 def compute_scores_from_matches(result: dict, weights: dict | None = None) -> dict:
-    w = {"w_required": 0.6, "w_nice": 0.2, "w_qual": 0.2,
-        "penalties": {"location": 15, "work_mode": 10, "salary": 8, "seniority": 12}}
+    w = copy.deepcopy(SCORE_WEIGHTS)
     if weights: w.update({k: v for k, v in weights.items() if k in ("w_required","w_nice","w_qual","penalties")})
 
     fit = result.get("fit", {})
@@ -143,6 +152,14 @@ def compute_scores_from_matches(result: dict, weights: dict | None = None) -> di
     }
     return result
 
+def apply_resp_bonus(match: Dict[str, Any], analysis: Dict[str, Any] | None) -> Dict[str, Any]:
+    """Recompute base scores, then add up to 8 points scaled by responsibilities confidence."""
+    m = compute_scores_from_matches(dict(match or {}))
+    conf = ((analysis or {}).get("responsibilities", {}) or {}).get("confidence", 0) or 0
+    bonus = 8 * max(0, min(100, conf)) / 100.0
+    m["scores"]["overall_score"] = min(100.0, round(m["scores"]["overall_score"] + bonus, 1))
+    return m
+
 def ensure_analysis_shape(analysis: Dict[str, Any] | None) -> Dict[str, Any]:
     a = analysis or {}
     a.setdefault("summary", "")
@@ -0,0 +1,186 @@
+# services/task_handlers.py
+"""
+What the background workers (services/task_queue.py) run, by task kind.
+
+Each handler takes (payload, progress) and returns a JSON-serializable result. Handlers
+that work on a saved job re-read it from the job store, update it and write it back, so
+the UI picks the result up from the job file; generated documents are returned in the
+result for the editor to load.
+"""
+import time
+from typing import Any, Callable, Dict
+
+from services import job_store
+from utils.file_utils import load_profile
+from utils.progress import report
+from utils.tracing import span
+
+Handler = Callable[[Dict[str, Any], Any], Dict[str, Any]]
+
+def _add_job(payload: Dict[str, Any], progress) -> Dict[str, Any]:
+    """
+    The Add Job flow: fetch (URL mode), duplicate check, extract, score (+ analysis).
+    Returns {"job_data": ...} for the user to review and save, or {"duplicate": ...}
+    when the posting looks like a saved job (resubmit with ignore_duplicate to go on).
+    """
+    with span("add_job", job=payload.get("url") or ""):
+        return _run_add_job(payload, progress)
+
+def _run_add_job(payload: Dict[str, Any], progress) -> Dict[str, Any]:
+    from services.job_parser import fetch_job_page
+    from services.duplicate_index import fingerprint, find_duplicates
+    from services.job_extraction_agent.preclean import heuristic_preclean
+    from services.job_extraction_agent.run_chain import run_job_extraction_chain
+    from services.skill_matching_agent.score_job_fit import score_job_fit
+    from services.pipeline import score_and_analyze
+
+    text, url = payload.get("text") or "", payload.get("url") or ""
+    trusted, job_posting = bool(payload.get("trusted")), payload.get("job_posting")
+    if payload.get("fetch"):
+        report(progress, "info", "Fetching job content…")
+        page = fetch_job_page(url)
+        text = page["text"] if page else ""
+        if not text:
+            raise ValueError("Could not fetch this URL. If it is blocked, switch to 'Full Text' and paste the content.")
+        trusted, job_posting = page["trusted"], page.get("job_posting")
+
+    with span("preclean"):
+        pre = heuristic_preclean(text)
+    fp = fingerprint(pre)
+    if not payload.get("ignore_duplicate"):
+        with span("duplicate_check"):
+            dups = find_duplicates(fp, url)
+        if dups:
+            return {"duplicate": {
+                "dup": dups[0], "text": text, "url": url, "fp": fp,
+                "trusted": trusted, "job_posting": job_posting,
+            }}
+
+    profile = load_profile()
+    job_data = run_job_extraction_chain(text, url, progress=progress, precleaned=pre,
+                                        trusted_source=trusted, job_posting=job_posting)
+    if payload.get("with_analysis"):
+        report(progress, "info", "Scoring match and running analysis in parallel…")
+        job_data = score_and_analyze(job_data, profile)
+    else:
+        report(progress, "info", "Scoring match against your profile…")
+        job_data["match"] = score_job_fit(job_data, profile, progress=progress)
+    return {"job_data": job_data}
+
+def _ingest_batch(payload: Dict[str, Any], progress) -> Dict[str, Any]:
+    """Batch URL ingest; per-URL rows are published as they finish."""
+    from services.batch_ingest import ingest_urls, DEFAULT_WORKERS, DEFAULT_HOST_INTERVAL_S
+
+    urls = payload.get("urls") or []
+    results = []
+    progress.data(total=len(urls), rows=results)
+    for res in ingest_urls(
+        urls, load_profile(),
+        max_workers=int(payload.get("workers") or DEFAULT_WORKERS),
+        per_host_interval_s=float(payload.get("host_interval", DEFAULT_HOST_INTERVAL_S)),
+    ):
+        results.append(res)
+        progress.data(total=len(urls), rows=results)
+    return {"rows": results}
+
+def _score(payload: Dict[str, Any], progress) -> Dict[str, Any]:
+    """Score a saved job ({"path"}) in place, or an unsaved one ({"job"}) and return the match."""
+    from services.skill_matching_agent.score_job_fit import score_job_fit
+    from services.skill_matching_agent.skill_match_utils import apply_resp_bonus
+
+    if payload.get("job"):
+        return {"match": score_job_fit(payload["job"], load_profile(), progress=progress)}
+    path = payload["path"]
+    job = job_store.read_job(path)
+    job.pop("_source_path", None)
+    match = score_job_fit(job, load_profile(), progress=progress)
+    if not match.get("profile_hash"):
+        raise RuntimeError("skill matching failed; the saved match was left as is")
+    # an analysis may have finished while we scored; only touch what we own
+    job = job_store.read_job(path)
+    job.pop("_source_path", None)
+    if job.get("analysis"):
+        match = apply_resp_bonus(match, job["analysis"])
+    job["match"] = match
+    job_store.write_job(path, job)
+    return {"path": path, "overall_score": (job["match"].get("scores") or {}).get("overall_score")}
+
+def _rescore_stale(payload: Dict[str, Any], progress) -> Dict[str, Any]:
+    """
+    Bulk re-score of every job scored against an older profile ({"force": True} for all
+    jobs, {"skip": [path, ...]} to leave out jobs that have their own score task).
+    """
+    from services.skill_matching_agent.bulk_rescore import run_bulk_rescore, DEFAULT_WORKERS
+
+    cp = run_bulk_rescore(
+        load_profile(),
+        max_workers=int(payload.get("workers") or DEFAULT_WORKERS),
+        force=bool(payload.get("force")),
+        progress=progress,
+        skip=payload.get("skip") or (),
+    )
+    return {"status": cp["status"], "done": len(cp["done"]), "failed": cp["failed"]}
+
+def _analysis(payload: Dict[str, Any], progress) -> Dict[str, Any]:
+    """In-depth analysis, then the responsibilities bonus on the overall score."""
+    from services.analysis_agent.run_analysis import run_in_depth_analysis
+    from services.skill_matching_agent.skill_match_utils import apply_resp_bonus
+
+    path = payload["path"]
+    job = job_store.read_job(path)
+    job.pop("_source_path", None)
+    report(progress, "info", "Analyzing responsibilities, strengths, gaps, and doc recommendations…")
+    a = run_in_depth_analysis(job, load_profile())
+    # the job may have been edited while the analysis ran; only touch what we own
+    job = job_store.read_job(path)
+    job.pop("_source_path", None)
+    job["analysis"] = a
+    if (job.get("match") or {}).get("scores"):
+        job["match"] = apply_resp_bonus(job["match"], a)
+    job_store.write_job(path, job)
+    return {"path": path}
+
+def _stream_into(stream, progress, every_s: float = 0.5) -> str:
+    """Consume a GPTStream, publishing the text so far on the task row for the UI to preview."""
+    parts, last = [], 0.0
+    for delta in stream:
+        parts.append(delta)
+        if time.time() - last >= every_s:
+            progress.data(partial="".join(parts))
+            last = time.time()
+    return (stream.text or "".join(parts)).strip()
+
+def _cover_letter(payload: Dict[str, Any], progress) -> Dict[str, Any]:
+    from services.cover_letter_agent.generate_cover_letter import stream_cover_letter
+
+    job = job_store.read_job(payload["path"])
+    return {"cover_letter": _stream_into(stream_cover_letter(job, load_profile(), prompt_filename=payload.get("prompt")), progress)}
+
+def _resume(payload: Dict[str, Any], progress) -> Dict[str, Any]:
+    from services.resume_agent.generate_resume import stream_resume
+
+    job = job_store.read_job(payload["path"])
+    return {"resume": _stream_into(stream_resume(job, load_profile(), prompt_filename=payload.get("prompt")), progress)}
+
+def _documents(payload: Dict[str, Any], progress) -> Dict[str, Any]:
+    from services.pipeline import generate_documents
+
+    job = job_store.read_job(payload["path"])
+    report(progress, "info", "Generating cover letter and resume…")
+    cl, res = generate_documents(
+        job, load_profile(),
+        cover_letter_prompt=payload.get("cover_letter_prompt"),
+        resume_prompt=payload.get("resume_prompt"),
+    )
+    return {"cover_letter": cl, "resume": res}
+
+HANDLERS: Dict[str, Handler] = {
+    "add_job": _add_job,
+    "ingest_batch": _ingest_batch,
+    "score": _score,
+    "rescore_stale": _rescore_stale,
+    "analysis": _analysis,
+    "cover_letter": _cover_letter,
+    "resume": _resume,
+    "documents": _documents,
+}
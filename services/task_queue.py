@@ -0,0 +1,339 @@
+# services/task_queue.py
+"""
+Persistent background task queue (data/tasks.db) for the slow, LLM-bound work the UI
+used to run inside the Streamlit script thread.
+
+    UI                                   worker pool (python -m jobhunter worker)
+    submit("analysis", {...}) ---->      claim() -> HANDLERS[kind](payload, progress)
+    get(task_id) / latest(...) <----     progress / finish / fail written back to the row
+
+Tasks survive reruns, closed tabs and app restarts: a task stays queued until a worker
+claims it, and a task whose worker died mid-run is re-queued (up to MAX_ATTEMPTS).
+Handlers live in services/task_handlers.py and write their results to the job store
+where there is one (analysis, scores), or to the task's `result` otherwise.
+
+The app starts a worker pool on demand (ensure_worker) if none is alive; it can also be
+run by hand, e.g. on another terminal: `python -m jobhunter worker --processes 4`.
+"""
+import os, sys, json, time, uuid, socket, sqlite3, threading, subprocess, traceback
+import multiprocessing as mp
+from typing import Any, Dict, List, Optional
+
+from utils.config.settings import load_settings
+
+QUEUE_PATH = os.path.join("data", "tasks.db")
+WORKER_LOG = os.path.join("data", "worker.log")
+
+HEARTBEAT_S = 5.0
+LIVE_S = 30.0          # a worker without a heartbeat for this long is considered dead
+POLL_S = 0.5
+MAX_ATTEMPTS = 3
+KEEP_DAYS = 14         # finished tasks older than this are purged when a pool starts
+SPAWN_GRACE_S = 20.0   # don't spawn a second pool while the first one is still starting
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind        TEXT NOT NULL,
+    label       TEXT,
+    job_path    TEXT,
+    payload     TEXT,
+    status      TEXT NOT NULL,
+    progress    TEXT,
+    result      TEXT,
+    error       TEXT,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    worker      TEXT,
+    created_at  REAL,
+    started_at  REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_job ON tasks(job_path, kind, id);
+CREATE TABLE IF NOT EXISTS workers (
+    id         TEXT PRIMARY KEY,
+    pid        INTEGER,
+    host       TEXT,
+    started_at REAL,
+    heartbeat  REAL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_ready = False
+_ready_lock = threading.Lock()
+
+def _connect() -> sqlite3.Connection:
+    global _ready
+    os.makedirs(os.path.dirname(QUEUE_PATH), exist_ok=True)
+    conn = sqlite3.connect(QUEUE_PATH, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if not _ready:
+        with _ready_lock:
+            conn.executescript(_SCHEMA)
+            _ready = True
+    return conn
+
+def queue_config() -> Dict[str, Any]:
+    c = load_settings().get("task_queue") or {}
+    return {
+        "workers": max(1, int(c.get("workers", 2))),
+        "autostart": bool(c.get("autostart", True)),
+        "poll_seconds": float(c.get("poll_seconds", 2)),
+    }
+
+def _row(r: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+    if r is None:
+        return None
+    t = dict(r)
+    for k in ("payload", "progress", "result"):
+        t[k] = json.loads(t[k]) if t[k] else None
+    return t
+
+# ---------- producer side ----------
+def submit(kind: str, payload: Dict[str, Any], label: str = "", job_path: str = "") -> int:
+    """Queue a task. Returns its id."""
+    with _connect() as conn:
+        cur = conn.execute(
+            "INSERT INTO tasks (kind, label, job_path, payload, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (kind, label, job_path or "", json.dumps(payload, ensure_ascii=False), QUEUED, time.time()),
+        )
+        task_id = cur.lastrowid
+    print(f"[TaskQueue] queued #{task_id} {kind} {label}")
+    return task_id
+
+def get(task_id: int) -> Optional[Dict[str, Any]]:
+    with _connect() as conn:
+        return _row(conn.execute("SELECT * FROM tasks WHERE id = ?", (int(task_id),)).fetchone())
+
+def latest(kind: str, job_path: str) -> Optional[Dict[str, Any]]:
+    """Most recent task of `kind` for a saved job, whatever its status."""
+    with _connect() as conn:
+        return _row(conn.execute(
+            "SELECT * FROM tasks WHERE job_path = ? AND kind = ? ORDER BY id DESC LIMIT 1",
+            (job_path, kind),
+        ).fetchone())
+
+def list_tasks(statuses: tuple = (), kinds: tuple = (), limit: int = 50) -> List[Dict[str, Any]]:
+    where, args = [], []
+    if statuses:
+        where.append(f"status IN ({', '.join('?' * len(statuses))})")
+        args += list(statuses)
+    if kinds:
+        where.append(f"kind IN ({', '.join('?' * len(kinds))})")
+        args += list(kinds)
+    sql = "SELECT * FROM tasks" + (f" WHERE {' AND '.join(where)}" if where else "") + " ORDER BY id DESC LIMIT ?"
+    with _connect() as conn:
+        return [_row(r) for r in conn.execute(sql, args + [int(limit)]).fetchall()]
+
+def cancel(task_id: int) -> bool:
+    """Cancel a task that no worker has picked up yet."""
+    with _connect() as conn:
+        cur = conn.execute(
+            "UPDATE tasks SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+            (CANCELLED, time.time(), int(task_id), QUEUED),
+        )
+        return cur.rowcount > 0
+
+def is_finished(task: Optional[Dict[str, Any]]) -> bool:
+    return bool(task) and task["status"] in FINISHED
+
+# ---------- worker side ----------
+def claim(worker_id: str) -> Optional[Dict[str, Any]]:
+    """Atomically take the oldest queued task."""
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        r = conn.execute("SELECT id FROM tasks WHERE status = ? ORDER BY id LIMIT 1", (QUEUED,)).fetchone()
+        if r is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute(
+            "UPDATE tasks SET status = ?, worker = ?, started_at = ?, attempts = attempts + 1 WHERE id = ?",
+            (RUNNING, worker_id, time.time(), r["id"]),
+        )
+        task = _row(conn.execute("SELECT * FROM tasks WHERE id = ?", (r["id"],)).fetchone())
+        conn.execute("COMMIT")
+        return task
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+def _set(task_id: int, **cols) -> None:
+    sets = ", ".join(f"{k} = ?" for k in cols)
+    with _connect() as conn:
+        conn.execute(f"UPDATE tasks SET {sets} WHERE id = ?", (*cols.values(), int(task_id)))
+
+class TaskProgress:
+    """ProgressFn that records the latest stage message on the task row (see utils/progress.py).
+    Handlers with richer progress (batch ingest) also call .data(...)."""
+
+    def __init__(self, task_id: int):
+        self.task_id = task_id
+        self.state: Dict[str, Any] = {}
+
+    def __call__(self, level: str, message: str) -> None:
+        self.state.update(level=level, message=message)
+        _set(self.task_id, progress=json.dumps(self.state, ensure_ascii=False))
+
+    def data(self, **kw) -> None:
+        self.state.update(kw)
+        _set(self.task_id, progress=json.dumps(self.state, ensure_ascii=False, default=str))
+
+def run_task(task: Dict[str, Any]) -> None:
+    from services.task_handlers import HANDLERS
+
+    t0 = time.time()
+    try:
+        handler = HANDLERS.get(task["kind"])
+        if handler is None:
+            raise ValueError(f"Unknown task kind '{task['kind']}'")
+        result = handler(task["payload"] or {}, TaskProgress(task["id"]))
+        _set(task["id"], status=DONE, result=json.dumps(result, ensure_ascii=False, default=str), finished_at=time.time())
+        print(f"[TaskQueue] done #{task['id']} {task['kind']} ({time.time() - t0:.1f}s)")
+    except Exception as e:
+        traceback.print_exc()
+        _set(task["id"], status=FAILED, error=str(e) or type(e).__name__, finished_at=time.time())
+        print(f"[TaskQueue] failed #{task['id']} {task['kind']}: {e}")
+
+def _heartbeat(worker_id: str) -> None:
+    with _connect() as conn:
+        conn.execute("UPDATE workers SET heartbeat = ? WHERE id = ?", (time.time(), worker_id))
+
+def live_workers() -> int:
+    with _connect() as conn:
+        return conn.execute("SELECT COUNT(*) FROM workers WHERE heartbeat >= ?", (time.time() - LIVE_S,)).fetchone()[0]
+
+def requeue_orphans() -> int:
+    """Put tasks whose worker stopped heart-beating back in the queue (or fail them after MAX_ATTEMPTS)."""
+    with _connect() as conn:
+        alive = "SELECT id FROM workers WHERE heartbeat >= ?"
+        cutoff = time.time() - LIVE_S
+        n = conn.execute(
+            f"UPDATE tasks SET status = ?, worker = NULL WHERE status = ? AND attempts < ? AND worker NOT IN ({alive})",
+            (QUEUED, RUNNING, MAX_ATTEMPTS, cutoff),
+        ).rowcount
+        conn.execute(
+            f"UPDATE tasks SET status = ?, error = ?, finished_at = ? WHERE status = ? AND worker NOT IN ({alive})",
+            (FAILED, "Worker stopped while running this task.", time.time(), RUNNING, cutoff),
+        )
+        conn.execute("DELETE FROM workers WHERE heartbeat < ?", (cutoff,))
+    if n:
+        print(f"[TaskQueue] re-queued {n} task(s) from stopped workers")
+    return n
+
+def purge(keep_days: float = KEEP_DAYS) -> int:
+    with _connect() as conn:
+        return conn.execute(
+            f"DELETE FROM tasks WHERE status IN ({', '.join('?' * len(FINISHED))}) AND finished_at < ?",
+            (*FINISHED, time.time() - keep_days * 86400),
+        ).rowcount
+
+def run_worker(stop: Optional[threading.Event] = None) -> None:
+    """One worker: claim and run tasks until `stop` is set (or forever)."""
+    stop = stop or threading.Event()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    with _connect() as conn:
+        conn.execute(
+            "INSERT INTO workers (id, pid, host, started_at, heartbeat) VALUES (?, ?, ?, ?, ?)",
+            (worker_id, os.getpid(), socket.gethostname(), time.time(), time.time()),
+        )
+
+    # heart-beat from a side thread so long LLM calls don't look like a dead worker
+    def _beat():
+        while not stop.wait(HEARTBEAT_S):
+            try:
+                _heartbeat(worker_id)
+            except Exception as e:
+                print(f"[TaskQueue] heartbeat failed: {e}")
+    threading.Thread(target=_beat, name="task-heartbeat", daemon=True).start()
+
+    print(f"[TaskQueue] worker {worker_id} started")
+    try:
+        while not stop.is_set():
+            task = claim(worker_id)
+            if task is None:
+                stop.wait(POLL_S)
+                continue
+            print(f"[TaskQueue] running #{task['id']} {task['kind']} {task['label'] or ''}")
+            run_task(task)
+    finally:
+        with _connect() as conn:
+            conn.execute("DELETE FROM workers WHERE id = ?", (worker_id,))
+
+def _worker_main() -> None:
+    try:
+        run_worker()
+    except KeyboardInterrupt:
+        pass
+
+def run_pool(processes: int) -> None:
+    """Supervise `processes` worker processes: restart any that die, re-queue their tasks."""
+    requeue_orphans()
+    purged = purge()
+    if purged:
+        print(f"[TaskQueue] purged {purged} old finished task(s)")
+
+    procs: List[mp.Process] = []
+    print(f"[TaskQueue] starting {processes} worker process(es), queue at {QUEUE_PATH}")
+    try:
+        while True:
+            procs = [p for p in procs if p.is_alive()]
+            for _ in range(processes - len(procs)):
+                p = mp.Process(target=_worker_main, name="task-worker", daemon=True)
+                p.start()
+                procs.append(p)
+            time.sleep(LIVE_S / 3)
+            requeue_orphans()
+    except KeyboardInterrupt:
+        print("[TaskQueue] stopping workers")
+    finally:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            p.join(timeout=5)
+
+def ensure_worker() -> bool:
+    """
+    Start a background worker pool if none is alive. Returns True if one is running or
+    starting. The pool runs detached from the Streamlit process, so tasks keep going
+    when the tab is closed; its output goes to data/worker.log.
+    """
+    if live_workers():
+        return True
+    cfg = queue_config()
+    if not cfg["autostart"]:
+        return False
+
+    with _connect() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        r = conn.execute("SELECT value FROM meta WHERE key = 'spawned_at'").fetchone()
+        if r and time.time() - float(r["value"]) < SPAWN_GRACE_S:
+            conn.execute("COMMIT")
+            return True
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('spawned_at', ?)", (str(time.time()),))
+        conn.execute("COMMIT")
+
+    log = open(WORKER_LOG, "a", encoding="utf-8")
+    kwargs: Dict[str, Any] = {"cwd": os.getcwd(), "stdout": log, "stderr": subprocess.STDOUT, "stdin": subprocess.DEVNULL}
+    if os.name == "nt":
+        kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS
+    else:
+        kwargs["start_new_session"] = True
+    subprocess.Popen(
+        [sys.executable, "-u", "-m", "jobhunter", "worker", "--processes", str(cfg["workers"])],
+        **kwargs,
+    )
+    log.close()
+    print(f"[TaskQueue] started a worker pool ({cfg['workers']} process(es)), log at {WORKER_LOG}")
+    return True
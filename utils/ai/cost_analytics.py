@@ -0,0 +1,191 @@
+# utils/ai/cost_analytics.py
+"""
+Read side of data/gpt_calls.csv (written by cost_logger.log_call) for the Usage & Cost view.
+
+Rows are copied into a compact SQLite store (data/gpt_stats.db) incrementally: the byte
+offset of the last ingested CSV row is kept, so a refresh only parses what was logged
+since (pandas on the tail of the file). If the CSV is rewritten (header migration,
+manual edit) the store is rebuilt from scratch.
+
+Sums and counts run in SQLite on indexed columns; p50/p95 latency are computed with
+pandas over just the latency column of the selected range.
+"""
+import io, os, sqlite3, threading, time
+from typing import Optional
+
+import pandas as pd
+
+from utils.ai.cost_logger import CSV_PATH
+
+STATS_PATH = os.path.join("data", "gpt_stats.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    ts                INTEGER NOT NULL,
+    task              TEXT,
+    model             TEXT,
+    prompt_tokens     INTEGER,
+    completion_tokens INTEGER,
+    cached_tokens     INTEGER,
+    cost_usd          REAL,
+    latency_s         REAL,
+    cache_hit         INTEGER,
+    job               TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_calls_ts ON calls(ts);
+CREATE INDEX IF NOT EXISTS idx_calls_task_model ON calls(task, model, ts);
+CREATE INDEX IF NOT EXISTS idx_calls_job ON calls(job);
+CREATE TABLE IF NOT EXISTS ingest (
+    id         INTEGER PRIMARY KEY CHECK (id = 1),
+    csv_offset INTEGER NOT NULL,
+    csv_header TEXT NOT NULL
+);
+"""
+
+_COLUMNS = ["ts", "task", "model", "prompt_tokens", "completion_tokens", "cached_tokens",
+            "cost_usd", "latency_s", "cache_hit", "job"]
+_NUMERIC = ["prompt_tokens", "completion_tokens", "cached_tokens", "cost_usd", "latency_s"]
+
+_lock = threading.Lock()
+
+def _connect() -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(STATS_PATH), exist_ok=True)
+    conn = sqlite3.connect(STATS_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+def _to_rows(chunk: bytes, header: list) -> pd.DataFrame:
+    df = pd.read_csv(io.BytesIO(chunk), names=header, header=None, dtype=str, keep_default_na=False)
+    out = pd.DataFrame({
+        "ts": pd.to_datetime(df["timestamp"], errors="coerce"),
+        "task": df.get("task", ""),
+        "model": df.get("model", ""),
+    })
+    for c in _NUMERIC:
+        out[c] = pd.to_numeric(df[c], errors="coerce").fillna(0) if c in df else 0
+    out["cache_hit"] = (df["notes"] == "cache_hit").astype(int) if "notes" in df else 0
+    out["job"] = df["job"] if "job" in df else ""
+    out = out.dropna(subset=["ts"])
+    # naive local timestamps, as log_call writes them
+    out["ts"] = ((out["ts"] - pd.Timestamp("1970-01-01")) // pd.Timedelta(seconds=1)).astype(int)
+    return out[_COLUMNS]
+
+def refresh() -> int:
+    """Ingest rows appended to the CSV since the last refresh. Returns how many were added."""
+    if not os.path.exists(CSV_PATH):
+        return 0
+    t0 = time.time()
+    with _lock, _connect() as conn:
+        with open(CSV_PATH, "rb") as f:
+            header_line = f.readline()
+            header = header_line.decode("utf-8").strip()
+            state = conn.execute("SELECT csv_offset, csv_header FROM ingest WHERE id = 1").fetchone()
+            size = os.fstat(f.fileno()).st_size
+            offset = state[0] if state else 0
+            if not state or state[1] != header or offset > size:
+                conn.execute("DELETE FROM calls")
+                offset = len(header_line)
+            f.seek(offset)
+            chunk = f.read()
+        # leave a row that is still being written for the next refresh
+        end = chunk.rfind(b"\n") + 1
+        chunk = chunk[:end]
+        added = 0
+        if chunk.strip():
+            rows = _to_rows(chunk, header.split(","))
+            conn.executemany(
+                f"INSERT INTO calls ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                rows.itertuples(index=False, name=None),
+            )
+            added = len(rows)
+        conn.execute(
+            "INSERT OR REPLACE INTO ingest (id, csv_offset, csv_header) VALUES (1, ?, ?)",
+            (offset + end, header),
+        )
+    if added:
+        print(f"[CostAnalytics] ingested {added} calls ({time.time() - t0:.2f}s)")
+    return added
+
+def since_days(days: Optional[float]) -> Optional[int]:
+    """`since` value for the queries below: `days` ago, on the same naive-local clock as the log."""
+    if not days:
+        return None
+    return int(pd.Timestamp.now().timestamp() - days * 86400)
+
+def _since_clause(since: Optional[int]) -> tuple:
+    return ("WHERE ts >= ?", (int(since),)) if since else ("", ())
+
+def _with_percentiles(agg: pd.DataFrame, lat: pd.DataFrame, keys: list) -> pd.DataFrame:
+    if lat.empty:
+        agg["p50_latency_s"] = agg["p95_latency_s"] = float("nan")
+        return agg
+    q = lat.groupby(keys)["latency_s"].quantile([0.5, 0.95]).unstack()
+    q.columns = ["p50_latency_s", "p95_latency_s"]
+    return agg.merge(q.reset_index(), on=keys, how="left")
+
+def summary(since: Optional[int] = None) -> pd.DataFrame:
+    """One row per (task, model): calls, tokens, cost, p50/p95 latency and cache rates."""
+    where, args = _since_clause(since)
+    with _connect() as conn:
+        agg = pd.read_sql_query(
+            f"""SELECT task, model, COUNT(*) AS calls,
+                       SUM(prompt_tokens) AS prompt_tokens, SUM(completion_tokens) AS completion_tokens,
+                       SUM(cached_tokens) AS cached_tokens, SUM(cost_usd) AS cost_usd,
+                       AVG(cache_hit) AS response_cache_hit_rate
+                FROM calls {where} GROUP BY task, model ORDER BY cost_usd DESC""",
+            conn, params=args,
+        )
+        # cache hits return instantly; keep them out of the latency percentiles
+        lat = pd.read_sql_query(
+            f"SELECT task, model, latency_s FROM calls {where or 'WHERE 1'} AND cache_hit = 0", conn, params=args
+        )
+    agg["prompt_cached_share"] = (agg["cached_tokens"] / agg["prompt_tokens"].where(agg["prompt_tokens"] > 0)).fillna(0)
+    return _with_percentiles(agg, lat, ["task", "model"])
+
+def timeseries(since: Optional[int] = None, freq: str = "day") -> pd.DataFrame:
+    """Per period and task: calls, tokens, cost and p50/p95 latency. `freq`: "hour" | "day" | "week"."""
+    fmt = {"hour": "%Y-%m-%d %H:00", "day": "%Y-%m-%d", "week": "%Y-W%W"}[freq]
+    where, args = _since_clause(since)
+    period = f"strftime('{fmt}', ts, 'unixepoch')"
+    with _connect() as conn:
+        agg = pd.read_sql_query(
+            f"""SELECT {period} AS period, task, COUNT(*) AS calls,
+                       SUM(prompt_tokens + completion_tokens) AS tokens, SUM(cost_usd) AS cost_usd
+                FROM calls {where} GROUP BY period, task ORDER BY period""",
+            conn, params=args,
+        )
+        lat = pd.read_sql_query(
+            f"SELECT {period} AS period, task, latency_s FROM calls {where or 'WHERE 1'} AND cache_hit = 0",
+            conn, params=args,
+        )
+    return _with_percentiles(agg, lat, ["period", "task"])
+
+def per_job(since: Optional[int] = None, limit: int = 50) -> pd.DataFrame:
+    """Cost rollup per job (calls attributed with cost_logger.job_context), most expensive first."""
+    where, args = _since_clause(since)
+    cond = f"{where} AND job != ''" if where else "WHERE job != ''"
+    with _connect() as conn:
+        return pd.read_sql_query(
+            f"""SELECT job, COUNT(*) AS calls, GROUP_CONCAT(DISTINCT task) AS tasks,
+                       SUM(prompt_tokens + completion_tokens) AS tokens, SUM(cost_usd) AS cost_usd,
+                       datetime(MAX(ts), 'unixepoch') AS last_call
+                FROM calls {cond} GROUP BY job ORDER BY cost_usd DESC LIMIT ?""",
+            conn, params=args + (int(limit),),
+        )
+
+def totals(since: Optional[int] = None) -> dict:
+    where, args = _since_clause(since)
+    with _connect() as conn:
+        row = conn.execute(
+            f"""SELECT COUNT(*), COALESCE(SUM(cost_usd), 0), COALESCE(SUM(prompt_tokens + completion_tokens), 0),
+                       COALESCE(AVG(cache_hit), 0), COALESCE(SUM(cached_tokens), 0), COALESCE(SUM(prompt_tokens), 0)
+                FROM calls {where}""",
+            args,
+        ).fetchone()
+    calls, cost, tokens, hit_rate, cached, prompt = row
+    return {
+        "calls": calls, "cost_usd": cost, "tokens": tokens,
+        "response_cache_hit_rate": hit_rate,
+        "prompt_cached_share": (cached / prompt) if prompt else 0.0,
+    }
@@ -1,22 +1,76 @@
 # utils/ai/cost_logger.py
-import csv, os, time
-from typing import Optional, Dict, Any
+import csv, os, time, tempfile, threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, Iterator
 
 CSV_PATH = "data/gpt_calls.csv"
 CSV_HEADERS = [
     "timestamp", "task", "model", "prompt_tokens", "completion_tokens",
-    "total_tokens", "cost_usd", "latency_s", "notes"
+    "total_tokens", "cached_tokens", "cost_usd", "latency_s", "notes", "job"
 ]
 
+# Which job the current LLM calls are for (per thread / asyncio task), for per-job cost rollups
+_current_job: ContextVar[str] = ContextVar("gpt_call_job", default="")
+
+def job_label(job: Any) -> str:
+    """Stable label for a job: its URL, else "company | title". Strings pass through."""
+    if isinstance(job, str) or job is None:
+        return job or ""
+    url = (job.get("url") or "").strip()
+    if url:
+        return url
+    parts = [str(job.get(k) or "").strip() for k in ("company", "job_title")]
+    return " | ".join(p for p in parts if p)
+
+@contextmanager
+def job_context(job: Any) -> Iterator[None]:
+    """Attribute every call_gpt inside the block to `job` (a job dict or a label)."""
+    token = _current_job.set(job_label(job))
+    try:
+        yield
+    finally:
+        _current_job.reset(token)
+
+def current_job() -> str:
+    return _current_job.get()
+
+_lock = threading.Lock()
+_checked = False
+
+def _migrate_header() -> None:
+    """Rewrite a log written with an older column set under CSV_HEADERS (new columns left blank)."""
+    with open(CSV_PATH, "r", newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f), None)
+    if header == CSV_HEADERS or not header:
+        return
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(CSV_PATH), suffix=".csv")
+    try:
+        with open(CSV_PATH, "r", newline="", encoding="utf-8") as src, \
+             os.fdopen(fd, "w", newline="", encoding="utf-8") as dst:
+            writer = csv.DictWriter(dst, fieldnames=CSV_HEADERS, extrasaction="ignore")
+            writer.writeheader()
+            for row in csv.DictReader(src):
+                writer.writerow(row)
+        os.replace(tmp, CSV_PATH)
+        print(f"[CostLogger] migrated {CSV_PATH} header to {len(CSV_HEADERS)} columns")
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
 def _ensure_csv():
+    global _checked
     os.makedirs("data", exist_ok=True)
     if not os.path.exists(CSV_PATH):
         with open(CSV_PATH, "w", newline="", encoding="utf-8") as f:
             writer = csv.DictWriter(f, fieldnames=CSV_HEADERS)
             writer.writeheader()
+    elif not _checked:
+        _migrate_header()
+    _checked = True
 
-def log_call(task: str, meta: Dict[str, Any], notes: Optional[str] = ""):
-    _ensure_csv()
+def log_call(task: str, meta: Dict[str, Any], notes: Optional[str] = "", job: Optional[str] = None):
     row = {
         "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
         "task": task,
@@ -24,9 +78,13 @@ def log_call(task: str, meta: Dict[str, Any], notes: Optional[str] = ""):
         "prompt_tokens": meta.get("prompt_tokens", 0),
         "completion_tokens": meta.get("completion_tokens", 0),
         "total_tokens": meta.get("total_tokens", 0),
+        "cached_tokens": meta.get("cached_tokens", 0),
         "cost_usd": meta.get("cost_usd", 0.0),
         "latency_s": meta.get("latency_s", 0.0),
         "notes": notes or "",
+        "job": current_job() if job is None else job,
     }
-    with open(CSV_PATH, "a", newline="", encoding="utf-8") as f:
-        csv.DictWriter(f, fieldnames=CSV_HEADERS).writerow(row)
+    with _lock:
+        _ensure_csv()
+        with open(CSV_PATH, "a", newline="", encoding="utf-8") as f:
+            csv.DictWriter(f, fieldnames=CSV_HEADERS).writerow(row)
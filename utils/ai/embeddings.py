@@ -0,0 +1,94 @@
+# utils/ai/embeddings.py
+"""
+Local text embedders for semantic job search. Nothing here calls an API.
+
+    - HashingEmbedder: dependency-free stub (hashed word unigrams + bigrams). Always
+      available offline; good at "shares vocabulary", weaker at true paraphrase.
+    - SentenceTransformerEmbedder: a local sentence-transformers model, used when the
+      package and the model files are present.
+
+Both return L2-normalized float32 rows, so cosine similarity is a dot product.
+Pick one with settings["semantic_search"]["backend"]: "auto" | "hashing" | "sentence-transformers".
+"""
+import re, zlib, math, threading
+from typing import List, Optional
+
+import numpy as np
+
+from utils.config.settings import load_settings
+
+DEFAULT_CONFIG = {
+    "enabled": True,
+    "backend": "auto",
+    "model": "sentence-transformers/all-MiniLM-L6-v2",
+    "hash_dim": 512,
+}
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+def _normalize_rows(m: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (m / norms).astype(np.float32)
+
+class HashingEmbedder:
+    """Signed feature hashing of word unigrams and bigrams with sublinear tf."""
+
+    def __init__(self, dim: int = 512):
+        self.dim = int(dim)
+        self.name = f"hashing-{self.dim}"
+
+    def _features(self, text: str) -> List[str]:
+        words = [w.rstrip(".") for w in _WORD.findall((text or "").lower())]
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            counts = {}
+            for f in self._features(text):
+                counts[f] = counts.get(f, 0) + 1
+            for f, c in counts.items():
+                h = zlib.crc32(f.encode("utf-8"))
+                sign = 1.0 if (h >> 31) & 1 else -1.0
+                out[i, h % self.dim] += sign * (1.0 + math.log(c))
+        return _normalize_rows(out)
+
+class SentenceTransformerEmbedder:
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer  # optional dependency
+        self.model = SentenceTransformer(model_name, local_files_only=True)
+        self.dim = int(self.model.get_sentence_embedding_dimension())
+        self.name = f"st-{model_name}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vecs = self.model.encode(list(texts), batch_size=32, show_progress_bar=False, normalize_embeddings=True)
+        return np.asarray(vecs, dtype=np.float32)
+
+def semantic_config() -> dict:
+    return {**DEFAULT_CONFIG, **(load_settings().get("semantic_search") or {})}
+
+_lock = threading.Lock()
+_embedder = None
+_embedder_key: Optional[tuple] = None
+
+def get_embedder():
+    """The configured embedder, loaded once per process. Falls back to hashing in "auto" mode."""
+    global _embedder, _embedder_key
+    cfg = semantic_config()
+    key = (cfg["backend"], cfg["model"], cfg["hash_dim"])
+    with _lock:
+        if _embedder is not None and _embedder_key == key:
+            return _embedder
+        emb = None
+        if cfg["backend"] in ("auto", "sentence-transformers"):
+            try:
+                emb = SentenceTransformerEmbedder(cfg["model"])
+            except Exception as e:
+                if cfg["backend"] == "sentence-transformers":
+                    raise
+                print(f"[Embeddings] local model unavailable ({e.__class__.__name__}); using hashing embedder")
+        if emb is None:
+            emb = HashingEmbedder(cfg["hash_dim"])
+        _embedder, _embedder_key = emb, key
+        return emb
@@ -0,0 +1,27 @@
+# utils/ai/messages.py
+"""
+Message layout for provider-side prompt caching.
+
+OpenAI caches the longest identical prefix of a request (from 1024 tokens up), so
+every agent sends, in this order:
+
+    1) system: the task prompt                     (same for every call of the task)
+    2) user:   the stable block, e.g. the profile  (same bytes for every job)
+    3) user:   the per-job block
+
+Blocks are serialized canonically (sorted keys, fixed separators), so the same
+profile always produces the same bytes. Hits show up as `cached_tokens` in
+data/gpt_calls.csv.
+"""
+import json
+from typing import Any, Dict, List
+
+def canonical_json(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+
+def cacheable_messages(system_prompt: str, stable: Dict[str, Any] | None, variable: Dict[str, Any]) -> List[Dict[str, str]]:
+    messages = [{"role": "system", "content": system_prompt}]
+    if stable:
+        messages.append({"role": "user", "content": canonical_json(stable)})
+    messages.append({"role": "user", "content": canonical_json(variable)})
+    return messages
@@ -1,12 +1,212 @@
 # utils/ai/model_router.py
-from typing import Literal, Dict
-from utils.config.settings import load_settings
+"""
+Picks the model for each LLM call.
 
-Task = Literal["extract", "summarize", "cover_letter", "resume", "generic", "review_extracted_job", "analysis", "clean_job_text"]
+Tasks in model_routing.adaptive_tasks move along a ladder of tiers (nano < mini < full,
+see model_routing.tiers), starting from the task's model in preferred_models:
+    - input size: a prompt under small_input_tokens steps down a tier, one over
+      large_input_tokens steps up
+    - page structure (route_hints): text that came from JSON-LD / a site selector, or
+      only a few fields left to extract, steps down
+    - history: per task, input size bucket and tier, the share of recent calls that
+      worked the first time (callers report it with report_outcome: JSON parse failures,
+      a follow-up being needed after extract, ...). A tier below target_success escalates;
+      a cheaper tier that meets it is used instead. A cheaper tier with no history yet is
+      tried now and then (explore_rate) so it can earn one.
+Other tasks (cover letter, resume, analysis) keep their preferred model, and developer
+mode still sends everything to the cheap fallback. Outcomes live in data/model_routing.db.
+"""
+import os, random, sqlite3, threading, time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Literal, Optional
 
-def choose_model(task: Task) -> str:
+from utils.ai.cost_logger import current_job
+from utils.config.settings import load_settings, DEFAULTS
+
+Task = Literal[
+    "extract", "summarize", "cover_letter", "resume", "generic", "review_extracted_job",
+    "analysis", "analysis_mini", "clean_job_text", "skill_match", "cheap_fallback",
+]
+
+ROUTING_PATH = os.path.join("data", "model_routing.db")
+TIERS = ("nano", "mini", "full")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outcomes (
+    id     INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts     REAL,
+    task   TEXT,
+    bucket TEXT,
+    tier   TEXT,
+    model  TEXT,
+    ok     INTEGER,
+    reason TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_outcomes_task ON outcomes(task, bucket, tier, id);
+"""
+
+_lock = threading.Lock()
+_ready = False
+# (task, job) -> route of the last call not yet reported on; bounded, oldest dropped
+_pending: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_MAX_PENDING = 256
+_hints: ContextVar[Dict[str, Any]] = ContextVar("route_hints", default={})
+
+def routing_config() -> Dict[str, Any]:
+    return {**DEFAULTS["model_routing"], **(load_settings().get("model_routing") or {})}
+
+def _connect() -> sqlite3.Connection:
+    global _ready
+    os.makedirs(os.path.dirname(ROUTING_PATH), exist_ok=True)
+    conn = sqlite3.connect(ROUTING_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    if not _ready:
+        conn.executescript(_SCHEMA)
+        _ready = True
+    return conn
+
+@contextmanager
+def route_hints(**hints) -> Iterator[None]:
+    """
+    Tell the router about the input of the calls inside the block, e.g.
+        with route_hints(structured=True): ...   # text from JSON-LD / a site selector
+    """
+    token = _hints.set({**_hints.get(), **hints})
+    try:
+        yield
+    finally:
+        _hints.reset(token)
+
+def _bucket(tokens: int, cfg: Dict[str, Any]) -> str:
+    if tokens < int(cfg["small_input_tokens"]):
+        return "small"
+    if tokens > int(cfg["large_input_tokens"]):
+        return "large"
+    return "medium"
+
+def tier_stats(task: str, bucket: str, window: int) -> Dict[str, tuple]:
+    """{tier: (calls, first-time successes)} over the newest `window` outcomes per tier."""
+    if not os.path.exists(ROUTING_PATH):
+        return {}
+    with _connect() as conn:
+        rows = conn.execute(
+            """SELECT tier, COUNT(*), SUM(ok) FROM (
+                   SELECT tier, ok, ROW_NUMBER() OVER (PARTITION BY tier ORDER BY id DESC) AS rn
+                   FROM outcomes WHERE task = ? AND bucket = ?)
+               WHERE rn <= ? GROUP BY tier""",
+            (task, bucket, int(window)),
+        ).fetchall()
+    return {t: (n, ok or 0) for t, n, ok in rows}
+
+def route(task: Task, messages: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+    """
+    The routing decision for one call:
+        {"model", "tier", "bucket", "tokens", "reasons", "candidates"}   (tier None = not adaptive)
+    "candidates" lists the model picked, the one picked without exploration and the
+    preferred model, for callers that can reuse an earlier answer from any of them.
+    """
     s = load_settings()
+    models: Dict[str, str] = s.get("preferred_models", {})
     if s.get("developer_mode"):
-        return s["preferred_models"].get("cheap_fallback", "gpt-5-nano")
-    m: Dict[str, str] = s.get("preferred_models", {})
-    return m.get(task, m.get("summarize", "gpt-5-mini"))
+        model = models.get("cheap_fallback", "gpt-5-nano")
+        return {"model": model, "tier": None, "bucket": "", "tokens": 0, "reasons": ["developer_mode"], "candidates": [model]}
+    preferred = models.get(task, models.get("summarize", "gpt-5-mini"))
+    out = {"model": preferred, "tier": None, "bucket": "", "tokens": 0, "reasons": [], "candidates": [preferred]}
+
+    cfg = routing_config()
+    tier_models: Dict[str, str] = cfg["tiers"]
+    by_model = {m: t for t, m in tier_models.items()}
+    if not cfg["enabled"] or task not in cfg["adaptive_tasks"] or preferred not in by_model or messages is None:
+        return out
+
+    # ~4 chars per token is plenty to pick a bucket
+    tokens = sum(len(str(m.get("content") or "")) for m in messages) // 4
+    bucket = _bucket(tokens, cfg)
+    ladder = [t for t in TIERS if t in tier_models]
+    i = ladder.index(by_model[preferred])
+    reasons = []
+    if bucket == "small" and i > 0:
+        i -= 1
+        reasons.append("small input")
+    elif bucket == "large" and i < len(ladder) - 1:
+        i += 1
+        reasons.append("large input")
+    hints = _hints.get()
+    if (hints.get("structured") or hints.get("partial")) and i > 0:
+        i -= 1
+        reasons.append("structured page")
+
+    stats = tier_stats(task, bucket, cfg["window"])
+
+    def rate(t: str) -> Optional[float]:
+        n, ok = stats.get(t, (0, 0))
+        return ok / n if n >= int(cfg["min_samples"]) else None
+
+    target = float(cfg["target_success"])
+    # cheaper tiers that have proven themselves on this kind of input
+    while i > 0 and (r := rate(ladder[i - 1])) is not None and r >= target:
+        i -= 1
+        reasons.append(f"{ladder[i]} succeeds {r:.0%}")
+    # tiers that keep needing a second pass
+    while i < len(ladder) - 1 and (r := rate(ladder[i])) is not None and r < target:
+        reasons.append(f"{ladder[i]} succeeds only {r:.0%}")
+        i += 1
+    settled = tier_models[ladder[i]]
+    if i > 0 and rate(ladder[i - 1]) is None and random.random() < float(cfg["explore_rate"]):
+        i -= 1
+        reasons.append(f"trying {ladder[i]}")
+
+    model = tier_models[ladder[i]]
+    candidates = list(dict.fromkeys([model, settled, preferred]))
+    out.update(model=model, tier=ladder[i], bucket=bucket, tokens=tokens, reasons=reasons, candidates=candidates)
+    return out
+
+def choose_model(task: Task, messages: Optional[List[Dict[str, str]]] = None) -> str:
+    return route(task, messages)["model"]
+
+# ---------- outcomes ----------
+def track(task: str, decision: Optional[Dict[str, Any]]) -> None:
+    """Remember an adaptive call so the caller's report_outcome can be attributed to it (None forgets)."""
+    key = (task, current_job())
+    with _lock:
+        _pending.pop(key, None)
+        if decision and decision.get("tier"):
+            _pending[key] = decision
+            while len(_pending) > _MAX_PENDING:
+                _pending.popitem(last=False)
+
+def report_outcome(task: str, ok: bool, reason: str = "") -> None:
+    """
+    Record whether the last `task` call for the current job (see cost_logger.job_context)
+    did its job the first time. Only the first report per call counts.
+    """
+    with _lock:
+        decision = _pending.pop((task, current_job()), None)
+    if decision is None:
+        return
+    try:
+        with _lock, _connect() as conn:
+            conn.execute(
+                "INSERT INTO outcomes (ts, task, bucket, tier, model, ok, reason) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), task, decision["bucket"], decision["tier"], decision["model"], int(bool(ok)), reason),
+            )
+    except Exception as e:
+        print(f"[Router] could not record outcome for {task}: {e}")
+
+def outcome_summary(window: int = 200) -> List[Dict[str, Any]]:
+    """Per task, input size and tier over the newest `window` outcomes: calls and first-time success rate."""
+    if not os.path.exists(ROUTING_PATH):
+        return []
+    with _connect() as conn:
+        rows = conn.execute(
+            """SELECT task, bucket, tier, model, COUNT(*), AVG(ok) FROM (
+                   SELECT *, ROW_NUMBER() OVER (PARTITION BY task, bucket, tier ORDER BY id DESC) AS rn FROM outcomes)
+               WHERE rn <= ? GROUP BY task, bucket, tier ORDER BY task, bucket, tier""",
+            (int(window),),
+        ).fetchall()
+    return [
+        {"task": t, "input": b, "tier": tier, "model": m, "calls": n, "first_try_success": round(r or 0.0, 3)}
+        for t, b, tier, m, n, r in rows
+    ]
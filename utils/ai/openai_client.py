@@ -1,61 +1,255 @@
 # utils/ai/openai_client.py
-import os, time
-from typing import Dict, Any, List, Tuple
-from openai import OpenAI
-from utils.ai.model_router import choose_model, Task
+import os, time, asyncio
+from typing import Dict, Any, Iterator, List, Tuple
+from openai import OpenAI, AsyncOpenAI
+from utils.ai import model_router
+from utils.ai.model_router import Task
 from utils.config.pricing import compute_cost
-from utils.ai.cost_logger import log_call
+from utils.ai.cost_logger import log_call, current_job
+from utils.ai import response_cache
 from dotenv import load_dotenv
-from utils.config.settings import load_settings, save_settings
+from utils.config.settings import load_settings
+from utils.config import credit_ledger
+from utils import tracing
 
 # Load .env file
 load_dotenv()
 _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-def call_gpt(
+def _cache_config() -> Dict[str, Any]:
+    c = load_settings().get("llm_cache") or {}
+    return {
+        "enabled": bool(c.get("enabled", True)),
+        "ttl_s": float(c.get("ttl_hours", 168)) * 3600.0,
+        "max_bytes": int(float(c.get("max_mb", 200)) * 1024 * 1024),
+    }
+
+# Rough pre-flight estimate used for the credit reservation; settled with real usage after.
+_EST_COMPLETION_TOKENS = 2000
+
+def _estimate_cost(model: str, messages: List[Dict[str, str]], kwargs: Dict[str, Any]) -> float:
+    chars = sum(len(str(m.get("content") or "")) for m in messages)
+    completion = int(kwargs.get("max_completion_tokens") or _EST_COMPLETION_TOKENS)
+    return compute_cost(model, chars // 4, completion)
+
+def _prepare(
     task: Task,
     messages: List[Dict[str, str]],
-    **kwargs
-) -> Tuple[str, Dict[str, Any]]:
+    use_cache: bool,
+    kwargs: Dict[str, Any],
+    reserve: bool = True,
+) -> Dict[str, Any]:
     """
-    Returns (text, meta). meta includes model, tokens, cost, latency.
+    Everything before the network call: pick the model, check the response cache,
+    reserve credit (unless reserve=False; see _reserve). If the cache answers,
+    ctx["hit"] holds the (text, meta) result.
     """
-    model = choose_model(task)
-    t0 = time.time()
+    route = model_router.route(task, messages)
+    model = route["model"]
+    ctx: Dict[str, Any] = {"task": task, "model": model, "t0": time.time(), "cache": _cache_config(),
+                           "cache_key": None, "hold": None, "hit": None, "job": current_job(), "route": route}
+
+    cache = ctx["cache"]
+    if use_cache and cache["enabled"]:
+        ctx["cache_key"] = response_cache.make_key(model, messages, kwargs)
+        # an exploratory or re-routed pick should not miss an answer already paid for
+        cached = None
+        for m in route.get("candidates") or [model]:
+            cached = response_cache.get(response_cache.make_key(m, messages, kwargs), cache["ttl_s"])
+            if cached is not None:
+                model = ctx["model"] = m
+                break
+        if cached is not None:
+            meta = {
+                "model": model,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "total_tokens": 0,
+                "cached_tokens": 0,
+                "cost_usd": 0.0,
+                "latency_s": round(time.time() - ctx["t0"], 3),
+                "cache_hit": True,
+            }
+            print(f"[GPT] (task)={task} (model)={model} cache hit")
+            # nothing was generated, so there is no outcome to learn from
+            model_router.track(task, None)
+            log_call(task, meta, notes="cache_hit", job=ctx["job"])
+            tracing.record(f"llm:{task}", ctx["t0"], time.time(), kind="llm", **meta)
+            ctx["hit"] = (cached, meta)
+            return ctx
+
+    if reserve:
+        _reserve(ctx, messages, kwargs)
+    return ctx
 
-    resp = _client.chat.completions.create(
-        model=model,
-        messages=messages,
-        **kwargs
+def _reserve(ctx: Dict[str, Any], messages: List[Dict[str, str]], kwargs: Dict[str, Any]) -> None:
+    # === Reserve credit before the call, settle with actual cost after ===
+    strict = bool(load_settings().get("enforce_credit_balance", False))
+    ctx["hold"] = credit_ledger.reserve(
+        _estimate_cost(ctx["model"], messages, kwargs), task=ctx["task"], model=ctx["model"], strict=strict
     )
 
-    text = resp.choices[0].message.content or ""
-    usage = getattr(resp, "usage", None)
+def _finish(ctx: Dict[str, Any], text: str, usage: Any) -> Tuple[str, Dict[str, Any]]:
+    """Everything after the network call: usage, cost, ledger settlement, caching, logging."""
+    task, model, cache = ctx["task"], ctx["model"], ctx["cache"]
+
     prompt_toks = getattr(usage, "prompt_tokens", 0) if usage else 0
     completion_toks = getattr(usage, "completion_tokens", 0) if usage else 0
     total_toks = getattr(usage, "total_tokens", prompt_toks + completion_toks)
-    cost = compute_cost(model, prompt_toks, completion_toks)
-    latency = round(time.time() - t0, 3)
+    # prompt-prefix tokens the provider served from its cache (see utils/ai/messages.py)
+    details = getattr(usage, "prompt_tokens_details", None) if usage else None
+    cached_toks = int(getattr(details, "cached_tokens", 0) or 0)
+    cost = compute_cost(model, prompt_toks, completion_toks, cached_toks)
+    latency = round(time.time() - ctx["t0"], 3)
 
-    # === Deduct from settings balance ===
-    settings = load_settings()
-    current = float(settings.get("credit_balance", 0.0))
-    remaining = max(0.0, round(current - cost, 6))
-    settings["credit_balance"] = remaining
-    save_settings(settings)
+    credit_ledger.settle(ctx["hold"], cost, task=task, model=model)
 
     meta = {
         "model": model,
         "prompt_tokens": prompt_toks,
         "completion_tokens": completion_toks,
         "total_tokens": total_toks,
+        "cached_tokens": cached_toks,
         "cost_usd": cost,
         "latency_s": latency,
+        "cache_hit": False,
+        "route": ", ".join(ctx["route"]["reasons"]),
     }
+    model_router.track(task, ctx["route"])
+
+    if ctx["cache_key"] and text:
+        response_cache.put(ctx["cache_key"], model, text, cache["max_bytes"], cache["ttl_s"])
 
     # Console log for quick dev feedback
-    print(f"[GPT] (task)={task} (model)={model} (tokens)={total_toks} (cost)=${cost} (latency)={latency}s")
+    route = f" (route)={meta['route']}" if meta["route"] else ""
+    print(f"[GPT] (task)={task} (model)={model}{route} (tokens)={total_toks} (cached)={cached_toks} (cost)=${cost} (latency)={latency}s")
     # Persist to CSV
-    log_call(task, meta)
+    log_call(task, meta, job=ctx["job"])
+    tracing.record(f"llm:{task}", ctx["t0"], time.time(), kind="llm", **meta)
 
     return text, meta
+
+class GPTStream:
+    """
+    Iterate to receive text deltas as they arrive. Once exhausted, `.text` and
+    `.meta` hold the full completion and the same meta call_gpt returns.
+    Usage comes from the final chunk (stream_options.include_usage) for cost logging.
+    Credit is reserved when iteration starts, so a stream that is never consumed
+    holds nothing.
+    """
+
+    def __init__(self, ctx: Dict[str, Any], messages: List[Dict[str, str]], kwargs: Dict[str, Any]):
+        self._ctx = ctx
+        self._messages = messages
+        self._kwargs = kwargs
+        self.text = ""
+        self.meta: Dict[str, Any] = {}
+
+    def __iter__(self) -> Iterator[str]:
+        ctx = self._ctx
+        if ctx["hit"]:
+            self.text, self.meta = ctx["hit"]
+            yield self.text
+            return
+
+        _reserve(ctx, self._messages, self._kwargs)
+        parts: List[str] = []
+        usage = None
+        done = False
+        try:
+            stream = _client.chat.completions.create(
+                model=ctx["model"],
+                messages=self._messages,
+                stream=True,
+                stream_options={"include_usage": True},
+                **self._kwargs
+            )
+            for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                if chunk.choices:
+                    delta = chunk.choices[0].delta.content or ""
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+            done = True
+        finally:
+            if done:
+                self.text, self.meta = _finish(ctx, "".join(parts), usage)
+            elif parts:
+                # Consumer stopped early (e.g. page left mid-stream): the tokens were still
+                # generated, so charge an estimate instead of dropping the hold.
+                est = compute_cost(ctx["model"], sum(len(str(m.get("content") or "")) for m in self._messages) // 4,
+                                   len("".join(parts)) // 4)
+                credit_ledger.settle(ctx["hold"], est, task=ctx["task"], model=ctx["model"], note="stream aborted")
+            else:
+                credit_ledger.release(ctx["hold"])
+
+def call_gpt(
+    task: Task,
+    messages: List[Dict[str, str]],
+    use_cache: bool = True,
+    stream: bool = False,
+    **kwargs
+) -> Tuple[str, Dict[str, Any]] | GPTStream:
+    """
+    Returns (text, meta). meta includes model, tokens, cost, latency.
+    Exact repeats (same model, messages and request params) are served from the
+    on-disk response cache unless use_cache=False.
+    With stream=True, returns a GPTStream to iterate for incremental text instead.
+    """
+    ctx = _prepare(task, messages, use_cache, kwargs, reserve=not stream)
+    if stream:
+        return GPTStream(ctx, messages, kwargs)
+    if ctx["hit"]:
+        return ctx["hit"]
+
+    try:
+        resp = _client.chat.completions.create(
+            model=ctx["model"],
+            messages=messages,
+            **kwargs
+        )
+    except Exception:
+        credit_ledger.release(ctx["hold"])
+        raise
+
+    return _finish(ctx, resp.choices[0].message.content or "", getattr(resp, "usage", None))
+
+# One AsyncOpenAI client (and so one HTTP connection pool) per event loop.
+# utils/ai/orchestrator.py runs a single long-lived loop, so in practice this is one shared pool.
+_async_clients: Dict[int, AsyncOpenAI] = {}
+
+def _get_async_client() -> AsyncOpenAI:
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(id(loop))
+    if client is None:
+        client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        _async_clients[id(loop)] = client
+    return client
+
+async def acall_gpt(
+    task: Task,
+    messages: List[Dict[str, str]],
+    use_cache: bool = True,
+    **kwargs
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Async twin of call_gpt (same caching, credit and logging behaviour).
+    Bookkeeping runs in a worker thread so the event loop only waits on the network.
+    """
+    ctx = await asyncio.to_thread(_prepare, task, messages, use_cache, kwargs)
+    if ctx["hit"]:
+        return ctx["hit"]
+
+    try:
+        resp = await _get_async_client().chat.completions.create(
+            model=ctx["model"],
+            messages=messages,
+            **kwargs
+        )
+    except Exception:
+        await asyncio.to_thread(credit_ledger.release, ctx["hold"])
+        raise
+
+    return await asyncio.to_thread(_finish, ctx, resp.choices[0].message.content or "", getattr(resp, "usage", None))
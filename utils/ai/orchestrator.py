@@ -0,0 +1,39 @@
+# utils/ai/orchestrator.py
+import asyncio, threading
+from typing import Any, Awaitable, Dict
+
+# A single background event loop shared by every caller (Streamlit reruns, CLI,
+# batch threads). Keeping one loop alive means the AsyncOpenAI client and its
+# connection pool are reused across calls instead of rebuilt per asyncio.run().
+_loop: asyncio.AbstractEventLoop | None = None
+_lock = threading.Lock()
+
+def _ensure_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="llm-loop", daemon=True).start()
+        return _loop
+
+def run(coro: Awaitable[Any]) -> Any:
+    """Run a coroutine on the shared loop and block until it finishes."""
+    return asyncio.run_coroutine_threadsafe(coro, _ensure_loop()).result()
+
+def fan_out(**coros: Awaitable[Any]) -> Dict[str, Any]:
+    """
+    Run independent agent coroutines concurrently and return {name: result}.
+    A failed agent does not cancel the others: its entry holds the exception instead.
+    """
+    names = list(coros)
+
+    async def _gather():
+        return await asyncio.gather(*coros.values(), return_exceptions=True)
+
+    results = run(_gather())
+    out: Dict[str, Any] = {}
+    for name, res in zip(names, results):
+        if isinstance(res, BaseException):
+            print(f"[Orchestrator] {name} failed: {res}")
+        out[name] = res
+    return out
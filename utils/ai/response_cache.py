@@ -0,0 +1,89 @@
+# utils/ai/response_cache.py
+import os, json, time, hashlib, sqlite3, threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+CACHE_PATH = os.path.join("data", "llm_cache.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key         TEXT PRIMARY KEY,
+    model       TEXT,
+    text        TEXT,
+    size        INTEGER,
+    created     REAL,
+    last_access REAL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access);
+"""
+
+_lock = threading.Lock()
+_ready = False
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    """One transaction (commit, or rollback on error); the connection is closed after."""
+    global _ready
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    conn = sqlite3.connect(CACHE_PATH, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        if not _ready:
+            with _lock:
+                conn.executescript(_SCHEMA)
+                _ready = True
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+def make_key(model: str, messages: List[Dict[str, Any]], params: Dict[str, Any]) -> str:
+    """Content address for a request: model + messages + request params (response_format etc.)."""
+    blob = json.dumps(
+        {"model": model, "messages": messages, "params": params},
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+def get(key: str, ttl_s: float) -> Optional[str]:
+    now = time.time()
+    with _connect() as conn:
+        row = conn.execute("SELECT text, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if not row:
+            return None
+        text, created = row
+        if ttl_s and now - created > ttl_s:
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            return None
+        conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        return text
+
+def put(key: str, model: str, text: str, max_bytes: int, ttl_s: float) -> None:
+    now = time.time()
+    size = len((text or "").encode("utf-8"))
+    with _connect() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, model, text, size, created, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, model, text, size, now, now),
+        )
+        _evict(conn, max_bytes, ttl_s, now)
+
+def _evict(conn: sqlite3.Connection, max_bytes: int, ttl_s: float, now: float) -> None:
+    """Drop expired entries, then least-recently-used ones until under the size cap."""
+    if ttl_s:
+        conn.execute("DELETE FROM responses WHERE created < ?", (now - ttl_s,))
+    if not max_bytes:
+        return
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    if total <= max_bytes:
+        return
+    target = int(max_bytes * 0.9)  # leave headroom so we don't evict on every put
+    for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall():
+        if total <= target:
+            break
+        conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+        total -= size
+
+def clear() -> None:
+    with _connect() as conn:
+        conn.execute("DELETE FROM responses")
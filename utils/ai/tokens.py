@@ -0,0 +1,35 @@
+# utils/ai/tokens.py
+"""
+Token counting for prompt budgets. Uses tiktoken when installed (optional, not in
+requirements.txt); otherwise ~4 characters per token, which is close enough for
+English JSON payloads to keep a budget honest.
+"""
+import json, math, threading
+from typing import Any
+
+_lock = threading.Lock()
+_encoding = None
+_loaded = False
+
+def _get_encoding():
+    global _encoding, _loaded
+    with _lock:
+        if not _loaded:
+            _loaded = True
+            try:
+                import tiktoken  # optional dependency
+                _encoding = tiktoken.get_encoding("o200k_base")
+            except Exception:
+                _encoding = None
+        return _encoding
+
+def count_tokens(text: str) -> int:
+    text = text or ""
+    enc = _get_encoding()
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+def count_json_tokens(obj: Any) -> int:
+    """Tokens of `obj` as it is sent: json.dumps(..., ensure_ascii=False)."""
+    return count_tokens(json.dumps(obj, ensure_ascii=False))
@@ -0,0 +1,205 @@
+# utils/config/credit_ledger.py
+import os, time, sqlite3, threading
+from typing import Optional
+
+from utils.config.settings import load_settings
+
+LEDGER_PATH = os.path.join("data", "credits.db")
+
+# Holds older than this are treated as abandoned (crashed worker, killed tab).
+RESERVATION_TTL_S = 15 * 60
+# Fold the journal tail into the snapshot once it grows past this many rows.
+COMPACT_EVERY = 500
+
+# Append-only journal. A "set" row fixes the balance (initial value or a manual
+# top-up from App Settings); "charge" rows are negative deltas from API calls.
+# `snapshot` is the compacted view: the balance as of journal row `upto_id`,
+# so reading the balance only sums the short tail after it.
+# `reservations` are open holds taken before a call and settled after it.
+#
+# Every write runs inside BEGIN IMMEDIATE, which takes SQLite's file lock, so
+# threads and separate processes (UI, CLI, workers) serialize safely.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ledger (
+    id     INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts     REAL NOT NULL,
+    kind   TEXT NOT NULL,
+    amount REAL NOT NULL,
+    task   TEXT,
+    model  TEXT,
+    note   TEXT
+);
+CREATE TABLE IF NOT EXISTS snapshot (
+    id      INTEGER PRIMARY KEY CHECK (id = 1),
+    upto_id INTEGER NOT NULL,
+    amount  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reservations (
+    id     INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts     REAL NOT NULL,
+    amount REAL NOT NULL,
+    task   TEXT,
+    model  TEXT
+);
+"""
+
+class InsufficientCreditError(RuntimeError):
+    pass
+
+_lock = threading.Lock()
+_ready = False
+
+def _connect() -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(LEDGER_PATH), exist_ok=True)
+    conn = sqlite3.connect(LEDGER_PATH, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    _ensure_seeded(conn)
+    return conn
+
+class _Tx:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK on a fresh connection."""
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn = _connect()
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.conn.close()
+        return False
+
+def _ensure_seeded(conn: sqlite3.Connection) -> None:
+    """First run: create the tables and carry over credit_balance from settings.json."""
+    global _ready
+    if _ready:
+        return
+    with _lock:
+        if _ready:
+            return
+        conn.executescript(_SCHEMA)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT COUNT(*) FROM ledger").fetchone()[0] == 0:
+                start = float(load_settings().get("credit_balance", 0.0) or 0.0)
+                conn.execute(
+                    "INSERT INTO ledger (ts, kind, amount, note) VALUES (?, 'set', ?, ?)",
+                    (time.time(), start, "imported from settings.json"),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        _ready = True
+
+def _balance(conn: sqlite3.Connection) -> tuple[float, int]:
+    """(balance, tail_rows) computed from the snapshot plus the journal tail."""
+    snap = conn.execute("SELECT upto_id, amount FROM snapshot WHERE id = 1").fetchone()
+    upto, base = (snap[0], snap[1]) if snap else (0, 0.0)
+
+    last_set = conn.execute(
+        "SELECT id, amount FROM ledger WHERE kind = 'set' AND id > ? ORDER BY id DESC LIMIT 1", (upto,)
+    ).fetchone()
+    if last_set:
+        upto, base = last_set
+
+    total, rows = conn.execute(
+        "SELECT COALESCE(SUM(amount), 0), COUNT(*) FROM ledger WHERE id > ?", (upto,)
+    ).fetchone()
+    return float(base) + float(total), int(rows)
+
+def _held(conn: sqlite3.Connection) -> float:
+    cutoff = time.time() - RESERVATION_TTL_S
+    return float(conn.execute(
+        "SELECT COALESCE(SUM(amount), 0) FROM reservations WHERE ts >= ?", (cutoff,)
+    ).fetchone()[0])
+
+def get_balance() -> float:
+    conn = _connect()
+    try:
+        bal, _ = _balance(conn)
+    finally:
+        conn.close()
+    return max(0.0, round(bal, 6))
+
+def available_balance() -> float:
+    """Balance minus open reservations. Cheap enough for pre-flight checks."""
+    conn = _connect()
+    try:
+        bal, _ = _balance(conn)
+        held = _held(conn)
+    finally:
+        conn.close()
+    return max(0.0, round(bal - held, 6))
+
+def can_afford(amount: float) -> bool:
+    return available_balance() >= float(amount or 0.0)
+
+def reserve(amount: float, task: Optional[str] = None, model: Optional[str] = None, strict: bool = False) -> int:
+    """
+    Hold `amount` before an API call. Returns a reservation id for settle()/release().
+    With strict=True, raises InsufficientCreditError instead of over-committing.
+    """
+    amount = max(0.0, float(amount or 0.0))
+    with _Tx() as conn:
+        if strict:
+            bal, _ = _balance(conn)
+            available = bal - _held(conn)
+            if amount > available:
+                raise InsufficientCreditError(
+                    f"Estimated ${amount:.4f} for {task or 'call'} exceeds available credit ${max(0.0, available):.4f}"
+                )
+        cur = conn.execute(
+            "INSERT INTO reservations (ts, amount, task, model) VALUES (?, ?, ?, ?)",
+            (time.time(), amount, task, model),
+        )
+        return int(cur.lastrowid)
+
+def settle(reservation_id: Optional[int], cost: float, task: Optional[str] = None, model: Optional[str] = None, note: str = "") -> None:
+    """Replace a hold with the actual charge in one transaction."""
+    with _Tx() as conn:
+        if reservation_id is not None:
+            conn.execute("DELETE FROM reservations WHERE id = ?", (reservation_id,))
+        if cost:
+            conn.execute(
+                "INSERT INTO ledger (ts, kind, amount, task, model, note) VALUES (?, 'charge', ?, ?, ?, ?)",
+                (time.time(), -abs(float(cost)), task, model, note),
+            )
+        _, tail = _balance(conn)
+        if tail >= COMPACT_EVERY:
+            _compact(conn)
+
+def release(reservation_id: Optional[int]) -> None:
+    """Drop a hold without charging (the call failed before any usage)."""
+    if reservation_id is None:
+        return
+    with _Tx() as conn:
+        conn.execute("DELETE FROM reservations WHERE id = ?", (reservation_id,))
+
+def record_charge(cost: float, task: Optional[str] = None, model: Optional[str] = None, note: str = "") -> None:
+    """Append one charge without a prior reservation."""
+    if cost:
+        settle(None, cost, task=task, model=model, note=note)
+
+def set_balance(amount: float, note: str = "manual") -> None:
+    """Reset the balance (e.g. after topping up the OpenAI account)."""
+    with _Tx() as conn:
+        conn.execute(
+            "INSERT INTO ledger (ts, kind, amount, note) VALUES (?, 'set', ?, ?)",
+            (time.time(), float(amount), note),
+        )
+
+def _compact(conn: sqlite3.Connection) -> None:
+    bal, _ = _balance(conn)
+    upto = conn.execute("SELECT COALESCE(MAX(id), 0) FROM ledger").fetchone()[0]
+    conn.execute(
+        "INSERT OR REPLACE INTO snapshot (id, upto_id, amount) VALUES (1, ?, ?)", (upto, bal)
+    )
+    conn.execute("DELETE FROM reservations WHERE ts < ?", (time.time() - RESERVATION_TTL_S,))
+
+def compact() -> None:
+    """Fold the journal into the snapshot now. The journal itself is kept for auditing."""
+    with _Tx() as conn:
+        _compact(conn)
@@ -1,15 +1,18 @@
 # utils/config/pricing.py
 PRICES = {
-    # prices per 1,000,000 tokens
-    "gpt-5":      {"input_per_million": 1.25, "output_per_million": 10.00},
-    "gpt-5-mini": {"input_per_million": 0.25, "output_per_million":  2.00},
-    "gpt-5-nano": {"input_per_million": 0.05, "output_per_million":  0.40},
+    # prices per 1,000,000 tokens; cached input is prompt-prefix tokens served from the provider cache
+    "gpt-5":      {"input_per_million": 1.25, "cached_input_per_million": 0.125, "output_per_million": 10.00},
+    "gpt-5-mini": {"input_per_million": 0.25, "cached_input_per_million": 0.025, "output_per_million":  2.00},
+    "gpt-5-nano": {"input_per_million": 0.05, "cached_input_per_million": 0.005, "output_per_million":  0.40},
 }
 
-def compute_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+def compute_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    """`cached_tokens` is the part of `prompt_tokens` billed at the cached-input rate."""
     p = PRICES.get(model)
     if not p:
         return 0.0
+    cached = min(max(int(cached_tokens or 0), 0), prompt_tokens)
     per_in  = p["input_per_million"]  / 1_000_000.0
+    per_cached = p.get("cached_input_per_million", p["input_per_million"]) / 1_000_000.0
     per_out = p["output_per_million"] / 1_000_000.0
-    return round(prompt_tokens * per_in + completion_tokens * per_out, 6)
+    return round((prompt_tokens - cached) * per_in + cached * per_cached + completion_tokens * per_out, 6)
@@ -1,6 +1,6 @@
 # utils/config/settings.py
-import json, os
-from typing import Any, Dict
+import json, os, copy, tempfile, threading
+from typing import Any, Dict, Optional, Tuple
 
 SETTINGS_PATH = os.path.join("data", "settings.json")
 
@@ -18,25 +18,97 @@ DEFAULTS: Dict[str, Any] = {
         "clean_job_text": "gpt-5-nano",
         "skill_match": "gpt-5-mini"
     },
-    "credit_balance": 10
+    "credit_balance": 10,
+    "enforce_credit_balance": False,
+    "llm_cache": {
+        "enabled": True,
+        "ttl_hours": 168,
+        "max_mb": 200
+    },
+    "skill_matching": {
+        "mode": "hybrid",
+        "fuzzy_threshold": 0.9,
+        "ambiguous_threshold": 0.6,
+        "qual_match_threshold": 0.75
+    },
+    "semantic_search": {
+        "enabled": True,
+        "backend": "auto",
+        "model": "sentence-transformers/all-MiniLM-L6-v2",
+        "hash_dim": 512
+    },
+    "http_cache": {
+        "enabled": True,
+        "fresh_for_minutes": 60,
+        "max_mb": 200
+    },
+    "payload_budget": {
+        "cover_letter": 2500,
+        "resume": 3500
+    },
+    "task_queue": {
+        "workers": 2,
+        "autostart": True,
+        "poll_seconds": 2
+    },
+    "tracing": {
+        "enabled": True,
+        "keep_runs": 500
+    },
+    "model_routing": {
+        "enabled": True,
+        "tiers": {"nano": "gpt-5-nano", "mini": "gpt-5-mini", "full": "gpt-5"},
+        "adaptive_tasks": ["clean_job_text", "extract", "review_extracted_job", "skill_match"],
+        "small_input_tokens": 1500,
+        "large_input_tokens": 6000,
+        "target_success": 0.85,
+        "min_samples": 10,
+        "window": 50,
+        "explore_rate": 0.05
+    }
 }
 
+# In-process cache, invalidated when the file's (mtime, size) changes.
+# Lets hot paths (model routing on every LLM call, sidebar reruns) skip disk reads.
+_lock = threading.Lock()
+_cached: Optional[Tuple[Tuple[int, int], Dict[str, Any]]] = None
+
 def _ensure_data_dir():
     os.makedirs("data", exist_ok=True)
 
+def _stamp() -> Tuple[int, int]:
+    st = os.stat(SETTINGS_PATH)
+    return (st.st_mtime_ns, st.st_size)
+
 def load_settings() -> Dict[str, Any]:
+    global _cached
     _ensure_data_dir()
     if not os.path.exists(SETTINGS_PATH):
         save_settings(DEFAULTS)
-        return DEFAULTS.copy()
+        return copy.deepcopy(DEFAULTS)
+
+    stamp = _stamp()
+    with _lock:
+        if _cached and _cached[0] == stamp:
+            return copy.deepcopy(_cached[1])
+
     with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
         disk = json.load(f)
     # merge to keep new keys if you upgrade DEFAULTS later
-    merged = DEFAULTS.copy()
+    merged = copy.deepcopy(DEFAULTS)
     merged.update(disk)
-    return merged
+
+    with _lock:
+        _cached = (stamp, merged)
+    return copy.deepcopy(merged)
 
 def save_settings(s: Dict[str, Any]) -> None:
+    global _cached
     _ensure_data_dir()
-    with open(SETTINGS_PATH, "w", encoding="utf-8") as f:
+    # write-then-rename so readers never see a half-written file
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(SETTINGS_PATH), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
         json.dump(s, f, indent=2)
+    with _lock:
+        os.replace(tmp, SETTINGS_PATH)
+        _cached = None
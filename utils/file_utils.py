@@ -0,0 +1,11 @@
+# utils/file_utils.py
+import os, json
+from typing import Any, Dict
+
+PROFILE_PATH = os.path.join("data", "profile.json")
+
+def load_profile(path: str = PROFILE_PATH) -> Dict[str, Any]:
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
@@ -0,0 +1,14 @@
+# utils/progress.py
+from typing import Callable, Optional
+
+# (level, message) where level is one of "info", "success", "warning", "error".
+# Services report stages through this instead of calling Streamlit directly,
+# so the same pipeline runs from the UI, the CLI, or a background thread.
+ProgressFn = Callable[[str, str], None]
+
+def report(progress: Optional[ProgressFn], level: str, message: str) -> None:
+    if progress:
+        progress(level, message)
+
+def print_progress(level: str, message: str) -> None:
+    print(f"[{level}] {message}")
@@ -0,0 +1,223 @@
+# utils/tracing.py
+"""
+Lightweight spans for the ingest pipeline: where wall time and money go per run.
+
+    with span("extract_chain", job=url):        # outermost span opens a run (new run_id)
+        with span("preclean"):
+            ...
+        event("looks_clean_enough", value=True)  # which conditional branch fired
+        ...                                      # call_gpt records an "llm" span per call
+
+Spans of a run are buffered in memory and written to data/traces.db in one transaction
+when the run's root span closes, so tracing costs a few microseconds per span and one
+small write per job. The context travels with contextvars: nested calls, asyncio tasks
+and asyncio.to_thread inherit it; plain thread pools start their own runs.
+
+Disable with settings["tracing"]["enabled"] = false. Only the newest `keep_runs` runs
+are kept. The waterfall view is in App Settings > Traces (developer mode).
+"""
+import os, json, time, uuid, sqlite3, threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from utils.config.settings import load_settings
+
+TRACE_PATH = os.path.join("data", "traces.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      TEXT PRIMARY KEY,
+    name        TEXT,
+    job         TEXT,
+    started_at  REAL,
+    duration_ms REAL,
+    llm_calls   INTEGER,
+    cost_usd    REAL,
+    status      TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started ON runs(started_at);
+CREATE TABLE IF NOT EXISTS spans (
+    run_id    TEXT NOT NULL,
+    span_id   TEXT NOT NULL,
+    parent_id TEXT,
+    name      TEXT,
+    kind      TEXT,
+    start     REAL,
+    end       REAL,
+    attrs     TEXT,
+    error     TEXT,
+    PRIMARY KEY (run_id, span_id)
+);
+"""
+
+class _Run:
+    def __init__(self, name: str):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.spans: List[Dict[str, Any]] = []
+        self.lock = threading.Lock()
+
+    def add(self, s: Dict[str, Any]) -> None:
+        with self.lock:
+            self.spans.append(s)
+
+# (run, current span dict) for this thread / asyncio task
+_current: ContextVar[Optional[tuple]] = ContextVar("trace_span", default=None)
+_write_lock = threading.Lock()
+_ready = False
+
+def _config() -> Dict[str, Any]:
+    c = load_settings().get("tracing") or {}
+    return {"enabled": bool(c.get("enabled", True)), "keep_runs": int(c.get("keep_runs", 500))}
+
+def _connect() -> sqlite3.Connection:
+    global _ready
+    os.makedirs(os.path.dirname(TRACE_PATH), exist_ok=True)
+    conn = sqlite3.connect(TRACE_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    if not _ready:
+        conn.executescript(_SCHEMA)
+        _ready = True
+    return conn
+
+def _new_span(run: _Run, parent: Optional[Dict[str, Any]], name: str, kind: str, attrs: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "span_id": uuid.uuid4().hex[:8],
+        "parent_id": parent["span_id"] if parent else None,
+        "name": name, "kind": kind, "start": time.time(), "end": None,
+        "attrs": dict(attrs), "error": None,
+    }
+
+@contextmanager
+def span(name: str, kind: str = "stage", **attrs) -> Iterator[Optional[Dict[str, Any]]]:
+    """
+    Time the block as a child of the current span, or as the root of a new run.
+    Yields the span dict (add to span["attrs"] to annotate it), or None when tracing is off.
+    """
+    cur = _current.get()
+    if cur is None and not _config()["enabled"]:
+        yield None
+        return
+    run, parent = cur if cur else (_Run(name), None)
+    s = _new_span(run, parent, name, "run" if parent is None else kind, attrs)
+    token = _current.set((run, s))
+    try:
+        yield s
+    except BaseException as e:
+        s["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        s["end"] = time.time()
+        _current.reset(token)
+        run.add(s)
+        if parent is None:
+            _flush(run, s)
+
+def event(name: str, **attrs) -> None:
+    """A zero-length marker in the current run (e.g. a branch decision and its inputs)."""
+    cur = _current.get()
+    if cur is None:
+        return
+    run, parent = cur
+    s = _new_span(run, parent, name, "event", attrs)
+    s["end"] = s["start"]
+    run.add(s)
+
+def record(name: str, start: float, end: float, kind: str = "stage", **attrs) -> None:
+    """Add an already-timed span under the current span (used for LLM calls, see openai_client)."""
+    cur = _current.get()
+    if cur is None:
+        return
+    run, parent = cur
+    s = _new_span(run, parent, name, kind, attrs)
+    s["start"], s["end"] = start, end
+    run.add(s)
+
+def annotate(**attrs) -> None:
+    """Merge attributes into the current span."""
+    cur = _current.get()
+    if cur is not None:
+        cur[1]["attrs"].update(attrs)
+
+def current_run_id() -> str:
+    cur = _current.get()
+    return cur[0].run_id if cur else ""
+
+def _flush(run: _Run, root: Dict[str, Any]) -> None:
+    llm = [s for s in run.spans if s["kind"] == "llm"]
+    try:
+        with _write_lock, _connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run.run_id, run.name, str(root["attrs"].get("job") or ""), root["start"],
+                    (root["end"] - root["start"]) * 1000.0, len(llm),
+                    sum(float(s["attrs"].get("cost_usd") or 0) for s in llm),
+                    "error" if root["error"] else "ok",
+                ),
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO spans VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (run.run_id, s["span_id"], s["parent_id"], s["name"], s["kind"], s["start"], s["end"],
+                     json.dumps(s["attrs"], ensure_ascii=False, default=str), s["error"])
+                    for s in run.spans
+                ],
+            )
+            keep = _config()["keep_runs"]
+            old = "SELECT run_id FROM runs ORDER BY started_at DESC LIMIT -1 OFFSET ?"
+            conn.execute(f"DELETE FROM spans WHERE run_id IN ({old})", (keep,))
+            conn.execute(f"DELETE FROM runs WHERE run_id IN ({old})", (keep,))
+    except Exception as e:
+        # tracing must never break the pipeline
+        print(f"[Tracing] could not write run {run.run_id}: {e}")
+
+# ---------- read side (App Settings > Traces) ----------
+def list_runs(limit: int = 100) -> List[Dict[str, Any]]:
+    if not os.path.exists(TRACE_PATH):
+        return []
+    with _connect() as conn:
+        return [dict(r) for r in conn.execute("SELECT * FROM runs ORDER BY started_at DESC LIMIT ?", (int(limit),))]
+
+def run_spans(run_id: str) -> List[Dict[str, Any]]:
+    """Spans of a run in start order, each with depth, offset_ms and duration_ms for a waterfall."""
+    with _connect() as conn:
+        rows = [dict(r) for r in conn.execute("SELECT * FROM spans WHERE run_id = ? ORDER BY start", (run_id,))]
+    if not rows:
+        return []
+    by_id = {r["span_id"]: r for r in rows}
+    t0 = min(r["start"] for r in rows)
+    for r in rows:
+        r["attrs"] = json.loads(r["attrs"] or "{}")
+        depth, p = 0, r["parent_id"]
+        while p in by_id:
+            depth, p = depth + 1, by_id[p]["parent_id"]
+        r["depth"] = depth
+        r["offset_ms"] = (r["start"] - t0) * 1000.0
+        r["duration_ms"] = (r["end"] - r["start"]) * 1000.0
+    return rows
+
+def stage_summary(limit: int = 200) -> List[Dict[str, Any]]:
+    """Per span name over the newest `limit` runs: count, mean / p95 ms, total LLM cost."""
+    if not os.path.exists(TRACE_PATH):
+        return []
+    with _connect() as conn:
+        rows = conn.execute(
+            """SELECT name, kind, (end - start) * 1000.0 AS ms, attrs FROM spans
+               WHERE kind != 'event' AND run_id IN (SELECT run_id FROM runs ORDER BY started_at DESC LIMIT ?)""",
+            (int(limit),),
+        ).fetchall()
+    groups: Dict[tuple, List[tuple]] = {}
+    for r in rows:
+        groups.setdefault((r["name"], r["kind"]), []).append((r["ms"], json.loads(r["attrs"] or "{}").get("cost_usd") or 0))
+    out = []
+    for (name, kind), vals in groups.items():
+        ms = sorted(v[0] for v in vals)
+        out.append({
+            "name": name, "kind": kind, "count": len(ms),
+            "mean_ms": sum(ms) / len(ms), "p95_ms": ms[min(len(ms) - 1, int(0.95 * len(ms)))],
+            "cost_usd": sum(float(v[1]) for v in vals),
+        })
+    return sorted(out, key=lambda r: -r["mean_ms"] * r["count"])